@@ -0,0 +1,102 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Benchmark:
+    """
+    Collects the latency samples and processed item count of one component.
+
+    Memory is reported as the growth of the process's peak RSS during this component's
+    own samples. The absolute peak would carry over from whichever component ran
+    before, since all components share one process.
+    """
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.samples: List[float] = []
+        self.items = 0
+        self.peak_rss_growth = 0.0
+
+    @contextmanager
+    def measure(self, items: int = 1):
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        yield
+        self.samples.append(time.perf_counter() - start)
+        self.items += items
+        self.peak_rss_growth += peak_rss_mb() - peak_before
+
+    def result(self) -> dict:
+        samples = np.asarray(self.samples or [0.0])
+        total = float(samples.sum())
+        return {
+            "unit": self.unit,
+            "samples": len(self.samples),
+            "items": self.items,
+            "total_seconds": round(total, 4),
+            "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 3),
+            "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 3),
+            "throughput_per_s": round(self.items / total, 2) if total else 0.0,
+            "peak_rss_growth_mb": round(self.peak_rss_growth, 1),
+        }
+
+
+# metric -> True when a larger value is worse
+_COMPARED_METRICS = {"p50_ms": True, "p95_ms": True, "throughput_per_s": False, "peak_rss_growth_mb": True}
+# smaller RSS changes are allocator noise, whatever their relative size
+_MIN_RSS_CHANGE_MB = 8.0
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.15) -> List[Dict]:
+    """
+    Compare two result files benchmark by benchmark.
+
+    Returns one row per metric with the relative change; rows whose change is worse than
+    `tolerance` (e.g. 0.15 = 15%) are marked as regressions.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_worse in _COMPARED_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change if higher_is_worse else -change
+            if metric == "peak_rss_growth_mb" and abs(new - old) < _MIN_RSS_CHANGE_MB:
+                worse = 0.0
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": worse > tolerance,
+            })
+    return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'benchmark':<16} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['benchmark']:<16} {row['metric']:<18} {row['baseline']:>12} {row['current']:>12} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
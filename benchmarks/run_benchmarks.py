@@ -0,0 +1,181 @@
+"""
+Component benchmarks for the ingestion and retrieval hot paths.
+
+Runs offline against synthetic PDFs in a scratch directory and writes a JSON report with
+p50/p95 latency, throughput and peak RSS growth per component:
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results.json
+    python -m benchmarks.run_benchmarks --output new.json --baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare new.json benchmarks/baseline.json
+
+The embedding model has to be in the local HuggingFace cache (run the app or ingestion
+once); the LLM behind rag_query_tool is replaced by llama-index's MockLLM.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import Benchmark, compare, format_comparison
+from benchmarks.synthetic_pdfs import VOCABULARY, generate_pdfs
+
+
+def _configure_environment(work_dir: str, backend: str) -> None:
+    """Point every setting at the scratch directory before the src modules read them."""
+    os.environ.update({
+        "DOCUMENTS_DIR": os.path.join(work_dir, "documents"),
+        "VECTOR_STORE_DIR": os.path.join(work_dir, "vector_store"),
+        "COLLECTION_NAME": "benchmark",
+        "VECTOR_BACKEND": backend,
+        "GROQ_API_KEY": "benchmark",
+        "MODEL_NAME": "benchmark",
+        "MODEL_TEMPERATURE": "0",
+    })
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.makedirs(os.environ["DOCUMENTS_DIR"], exist_ok=True)
+
+
+def run(args, work_dir: str) -> dict:
+    from llama_index.core import Document, VectorStoreIndex
+    from llama_index.core.llms.mock import MockLLM
+    from llama_index.core.node_parser import SimpleNodeParser
+    from llama_index.core.schema import MetadataMode
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    import src.agents_src.retrieval.engine as retrieval_engine
+    from src.agents_src.tools.rag_qa_tool import rag_query_tool
+    from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+    from src.rag_doc_ingestion.embeddings import get_embed_model
+    from src.rag_doc_ingestion.pdf_extraction import extract_pdf_pages
+    from src.rag_doc_ingestion.sparse_index import get_sparse_index
+    from src.rag_doc_ingestion.vector_store import get_vector_store
+
+    settings = DocIngestionSettings()
+    benchmarks = {}
+
+    pdf_paths = generate_pdfs(os.environ["DOCUMENTS_DIR"], count=args.pdfs, pages=args.pages, seed=args.seed)
+
+    bench = benchmarks["extract"] = Benchmark("extract", "pages")
+    documents = []
+    for path in pdf_paths:
+        with bench.measure(items=args.pages):
+            pages = extract_pdf_pages([path])[0]
+        text = "\n".join(page_text for _, page_text in pages if page_text)
+        documents.append(Document(text=text, metadata={"file_path": path, "file_name": os.path.basename(path)}))
+
+    bench = benchmarks["chunk"] = Benchmark("chunk", "chunks")
+    parser = SimpleNodeParser.from_defaults(chunk_size=1024, chunk_overlap=50)
+    nodes = []
+    for document in documents:
+        with bench.measure(items=0):
+            document_nodes = parser.get_nodes_from_documents([document])
+        bench.items += len(document_nodes)
+        nodes.extend(document_nodes)
+
+    bench = benchmarks["embed"] = Benchmark("embed", "embeddings")
+    embed_model = HuggingFaceEmbedding(model_name=settings.EMBED_MODEL_NAME)
+    embed_model.get_text_embedding_batch(["warm up"])
+    batch_size = settings.EMBED_BATCH_SIZE
+    for start in range(0, len(nodes), batch_size):
+        batch = nodes[start:start + batch_size]
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        with bench.measure(items=len(batch)):
+            embeddings = embed_model.get_text_embedding_batch(texts)
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+
+    bench = benchmarks["upsert"] = Benchmark("upsert", "upserts")
+    vector_store = get_vector_store(settings)
+    sparse_bench = benchmarks["sparse_index"] = Benchmark("sparse_index", "chunks")
+    sparse_index = get_sparse_index()
+    for start in range(0, len(nodes), settings.UPSERT_BATCH_SIZE):
+        batch = nodes[start:start + settings.UPSERT_BATCH_SIZE]
+        with bench.measure(items=len(batch)):
+            vector_store.add(batch)
+        with sparse_bench.measure(items=len(batch)):
+            sparse_index.add_nodes(batch)
+
+    bench = benchmarks["index_load"] = Benchmark("index_load", "loads")
+    for _ in range(args.repeats):
+        with bench.measure():
+            VectorStoreIndex.from_vector_store(vector_store=get_vector_store(settings), embed_model=embed_model)
+
+    bench = benchmarks["retrieval"] = Benchmark("retrieval", "queries")
+    engine = retrieval_engine.RetrievalEngine()
+    engine._llm = MockLLM(max_tokens=32)  # no network: the engine only creates Groq when unset
+    retrieval_engine._engine = engine
+    engine.warm_up()
+    get_embed_model().get_query_embedding("warm up")
+    rng = random.Random(args.seed)
+    for _ in range(args.queries):
+        query = "What does the paper say about " + " ".join(rng.sample(VOCABULARY, 3)) + "?"
+        with bench.measure():
+            rag_query_tool.run(query=query)
+
+    return {name: bench.result() for name, bench in benchmarks.items()}
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark the ingestion and retrieval components.")
+    arg_parser.add_argument("--output", default="benchmarks/results.json", help="Where to write the JSON report.")
+    arg_parser.add_argument("--baseline", help="Compare the new report against this saved report.")
+    arg_parser.add_argument("--compare", nargs=2, metavar=("CURRENT", "BASELINE"),
+                            help="Only compare two saved reports.")
+    arg_parser.add_argument("--tolerance", type=float, default=0.15,
+                            help="Relative change counted as a regression (default 0.15).")
+    arg_parser.add_argument("--pdfs", type=int, default=10)
+    arg_parser.add_argument("--pages", type=int, default=8)
+    arg_parser.add_argument("--queries", type=int, default=50)
+    arg_parser.add_argument("--repeats", type=int, default=5, help="Index loads to time.")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--backend", default="chroma", choices=["chroma", "numpy"])
+    arg_parser.add_argument("--work-dir", help="Scratch directory (default: a new temp dir).")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            current = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        work_dir = args.work_dir or tempfile.mkdtemp(prefix="rag-benchmarks-")
+        _configure_environment(work_dir, args.backend)
+        started = time.time()
+        current = {
+            "created_at": started,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": {
+                "pdfs": args.pdfs, "pages": args.pages, "queries": args.queries,
+                "repeats": args.repeats, "seed": args.seed, "backend": args.backend,
+            },
+            "benchmarks": run(args, work_dir),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(json.dumps(current["benchmarks"], indent=2))
+        print(f"Results written to {args.output}")
+        if not args.baseline:
+            return 0
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    rows = compare(current, baseline, tolerance=args.tolerance)
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import random
+from typing import List
+
+import fitz  # PyMuPDF
+
+VOCABULARY = (
+    "attention transformer encoder decoder layer embedding token sequence model training loss gradient "
+    "optimizer dataset benchmark evaluation accuracy baseline ablation retrieval generation language vision "
+    "convolution residual network parameter inference latency throughput memory scaling distillation "
+    "quantization pruning sparse dense vector index query document corpus retrieval-augmented fine-tuning "
+    "pretraining objective contrastive supervised unsupervised reinforcement policy reward agent planning"
+).split()
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(8, 20))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+
+def generate_pdfs(out_dir: str, count: int = 10, pages: int = 8, words_per_page: int = 450, seed: int = 0) -> List[str]:
+    """
+    Write `count` synthetic text PDFs of `pages` pages each into `out_dir`.
+
+    Content is deterministic for a given seed so runs are comparable. Returns the paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(out_dir, f"synthetic_{i:03d}.pdf")
+        doc = fitz.open()
+        for page_number in range(pages):
+            page = doc.new_page()
+            text = f"Synthetic paper {i}, section {page_number + 1}\n\n" + _paragraph(rng, words_per_page)
+            page.insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=8)
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+import httpx
+import numpy as np
+
+# Multi-turn conversations replayed by the virtual users; each turn is sent with the
+# history built up so far (previous questions plus the backend's answers).
+CONVERSATIONS: List[List[str]] = [
+    [
+        "What is the attention mechanism in transformers?",
+        "How does multi-head attention differ from single-head attention?",
+        "Why is the dot product scaled by the square root of the key dimension?",
+    ],
+    [
+        "Fetch the paper Attention Is All You Need",
+        "Summarize the main contributions of the paper",
+        "What datasets were used in the experiments?",
+    ],
+    [
+        "Explain retrieval-augmented generation",
+        "What are the trade-offs between sparse and dense retrieval?",
+        "How is the retrieved context passed to the generator?",
+        "Which evaluation metrics are reported?",
+    ],
+    [
+        "What is knowledge distillation?",
+        "Compare it with quantization for model compression",
+    ],
+]
+
+
+class LevelResult:
+    """Latencies and outcomes of one load level."""
+
+    def __init__(self, concurrency: int, rate: Optional[float]):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_counts = {}
+        self.started = time.perf_counter()
+        self.finished = self.started
+
+    def record(self, latency: float, status: str) -> None:
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if status == "200":
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        elapsed = max(self.finished - self.started, 1e-9)
+        requests = len(self.latencies) + self.errors
+        latencies = np.asarray(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "concurrency": self.concurrency,
+            "rate_rps": self.rate,
+            "requests": requests,
+            "ok": len(self.latencies),
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0.0,
+            "status_counts": self.status_counts,
+            "throughput_rps": round(len(self.latencies) / elapsed, 3),
+            "latency_ms": {
+                "mean": round(float(latencies.mean()), 1),
+                "p50": round(float(np.percentile(latencies, 50)), 1),
+                "p90": round(float(np.percentile(latencies, 90)), 1),
+                "p95": round(float(np.percentile(latencies, 95)), 1),
+                "p99": round(float(np.percentile(latencies, 99)), 1),
+                "max": round(float(latencies.max()), 1),
+            },
+            "elapsed_seconds": round(elapsed, 2),
+        }
+
+
+async def _send(client: httpx.AsyncClient, url: str, history: List[dict], use_cache: bool,
+                result: LevelResult, scheduled: float) -> Optional[str]:
+    try:
+        response = await client.post(url, json={"chat_history": history, "use_cache": use_cache})
+        status = str(response.status_code)
+        answer = response.json().get("answer", "") if response.status_code == 200 else None
+    except httpx.HTTPError as e:
+        status, answer = type(e).__name__, None
+    # measured from the scheduled send time, so queueing in front of a saturated
+    # backend shows up in the latencies
+    result.record(time.perf_counter() - scheduled, status)
+    return answer
+
+
+async def _virtual_user(client: httpx.AsyncClient, url: str, deadline: float, use_cache: bool,
+                        result: LevelResult, rng: random.Random) -> None:
+    while time.perf_counter() < deadline:
+        history: List[dict] = []
+        for question in rng.choice(CONVERSATIONS):
+            if time.perf_counter() >= deadline:
+                return
+            history.append({"role": "user", "content": question})
+            answer = await _send(client, url, list(history), use_cache, result, time.perf_counter())
+            if answer is None:
+                break
+            history.append({"role": "assistant", "content": answer})
+
+
+def _sampled_history(rng: random.Random) -> List[dict]:
+    """A conversation cut at a random turn, with placeholder answers for earlier turns."""
+    conversation = rng.choice(CONVERSATIONS)
+    turns = rng.randint(1, len(conversation))
+    history = []
+    for question in conversation[:turns - 1]:
+        history.append({"role": "user", "content": question})
+        history.append({"role": "assistant", "content": f"Earlier answer about: {question}"})
+    history.append({"role": "user", "content": conversation[turns - 1]})
+    return history
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, rate: Optional[float] = None,
+                    use_cache: bool = False, timeout: float = 300.0, seed: int = 0) -> dict:
+    """
+    Drive POST /chat/answer for `duration` seconds and summarise the outcome.
+
+    Without `rate` this is a closed loop: `concurrency` virtual users each replay whole
+    conversations back to back. With `rate` (requests per second) requests arrive on a
+    Poisson schedule and at most `concurrency` are in flight.
+    """
+    url = base_url.rstrip("/") + "/chat/answer"
+    rng = random.Random(seed)
+    result = LevelResult(concurrency, rate)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        if rate is None:
+            await asyncio.gather(*[
+                _virtual_user(client, url, deadline, use_cache, result, random.Random(rng.random()))
+                for _ in range(concurrency)
+            ])
+        else:
+            in_flight = asyncio.Semaphore(concurrency)
+            tasks = []
+
+            async def one(history: List[dict], scheduled: float) -> None:
+                async with in_flight:
+                    await _send(client, url, history, use_cache, result, scheduled)
+
+            next_send = time.perf_counter()
+            while next_send < deadline:
+                await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+                tasks.append(asyncio.create_task(one(_sampled_history(rng), next_send)))
+                next_send += rng.expovariate(rate)
+            await asyncio.gather(*tasks)
+    result.finished = time.perf_counter()
+    return result.summary()
+
+
+def find_saturation(levels: List[dict], min_gain: float = 0.1, max_error_rate: float = 0.01,
+                    latency_slo_ms: Optional[float] = None) -> dict:
+    """
+    Locate the saturation point in results ordered by increasing load.
+
+    The backend counts as saturated at the first level whose throughput improves by
+    less than `min_gain` over the best so far, whose error rate exceeds
+    `max_error_rate`, or whose p95 latency exceeds `latency_slo_ms`.
+    """
+    best = None
+    for level in levels:
+        reasons = []
+        if level["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {level['error_rate']:.1%}")
+        if latency_slo_ms is not None and level["latency_ms"]["p95"] > latency_slo_ms:
+            reasons.append(f"p95 {level['latency_ms']['p95']}ms over {latency_slo_ms}ms")
+        if best is not None and level["throughput_rps"] < best["throughput_rps"] * (1 + min_gain):
+            reasons.append(f"throughput gain under {min_gain:.0%}")
+        if reasons:
+            return {
+                "saturated_at_concurrency": level["concurrency"],
+                "saturated_at_rate_rps": level["rate_rps"],
+                "reasons": reasons,
+                "max_throughput_rps": max(l["throughput_rps"] for l in levels),
+            }
+        best = level if best is None or level["throughput_rps"] > best["throughput_rps"] else best
+    return {
+        "saturated_at_concurrency": None,
+        "saturated_at_rate_rps": None,
+        "reasons": ["not saturated at the highest level tested"],
+        "max_throughput_rps": max((l["throughput_rps"] for l in levels), default=0.0),
+    }
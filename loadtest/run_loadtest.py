@@ -0,0 +1,163 @@
+"""
+End-to-end load test for POST /chat/answer.
+
+Starts the stub LLM and stub arXiv servers, optionally starts the backend with uvicorn
+pointed at them, then steps through increasing load levels and reports throughput,
+latency percentiles, error rates and the saturation point:
+
+    python -m loadtest.run_loadtest --levels 1,2,4,8,16 --duration 30
+    python -m loadtest.run_loadtest --rates 0.5,1,2,4 --concurrency 32 --workers 2
+    python -m loadtest.run_loadtest --target http://localhost:8000 --levels 1,4  # running backend
+
+A backend started elsewhere must be configured with the LLM_BASE_URL, ARXIV_API_URL and
+ARXIV_PDF_BASE_URL printed at startup.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+
+from loadtest.load_generator import find_saturation, run_level
+from loadtest.stub_arxiv import StubArxivServer
+from loadtest.stub_llm import StubLLMServer
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+def _start_backend(port: int, workers: int, stub_llm: StubLLMServer, stub_arxiv: StubArxivServer,
+                   log_path: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        LLM_BASE_URL=stub_llm.base_url,
+        ARXIV_API_URL=f"{stub_arxiv.base_url}/api/query",
+        ARXIV_PDF_BASE_URL=stub_arxiv.base_url,
+        GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "stub"),
+    )
+    command = [sys.executable, "-m", "uvicorn", "src.backend_src.main:app",
+               "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)]
+    logger.info(f"Starting backend: {' '.join(command)} (log: {log_path})")
+    log_file = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def _wait_until_ready(base_url: str, timeout: float, workers: int = 1) -> None:
+    """
+    Poll /readyz until the backend has finished warming up.
+
+    Each poll is a new connection, so with several workers different workers answer;
+    waiting for a run of consecutive 200s makes it likely that every worker is warm.
+    """
+    deadline = time.time() + timeout
+    needed = 2 * max(1, workers)
+    streak = 0
+    while time.time() < deadline:
+        try:
+            response = httpx.get(base_url.rstrip("/") + "/readyz", timeout=2)
+            if response.status_code == 200:
+                streak += 1
+                if streak >= needed:
+                    return
+                continue
+            streak = 0
+            if response.json().get("state") == "failed":
+                raise RuntimeError(f"Backend warm-up failed: {response.text}")
+        except (httpx.HTTPError, ValueError):
+            streak = 0
+        time.sleep(1)
+    raise RuntimeError(f"Backend at {base_url} was not ready within {timeout:.0f}s")
+
+
+def _parse_list(value: Optional[str], cast) -> List:
+    return [cast(v) for v in value.split(",") if v.strip()] if value else []
+
+
+def _print_table(levels: List[dict]) -> None:
+    print(f"{'conc':>5} {'rate':>6} {'reqs':>6} {'err%':>6} {'rps':>8} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9}")
+    for level in levels:
+        latency = level["latency_ms"]
+        rate = f"{level['rate_rps']:.2f}" if level["rate_rps"] is not None else "-"
+        print(
+            f"{level['concurrency']:>5} {rate:>6} {level['requests']:>6} {level['error_rate']:>6.1%} "
+            f"{level['throughput_rps']:>8.3f} {latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f}"
+        )
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Load test POST /chat/answer against local stand-ins.")
+    arg_parser.add_argument("--target", help="Base URL of an already running backend.")
+    arg_parser.add_argument("--port", type=int, default=8800, help="Port for the backend started here.")
+    arg_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the backend started here.")
+    arg_parser.add_argument("--levels", default="1,2,4,8", help="Closed-loop concurrency levels.")
+    arg_parser.add_argument("--rates", help="Open-loop arrival rates (req/s); replaces --levels.")
+    arg_parser.add_argument("--concurrency", type=int, default=32, help="In-flight cap for --rates.")
+    arg_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per level.")
+    arg_parser.add_argument("--use-cache", action="store_true", help="Allow answer cache hits.")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.3, help="Stub LLM time to first token (s).")
+    arg_parser.add_argument("--llm-tokens-per-s", type=float, default=200.0, help="Stub LLM token rate.")
+    arg_parser.add_argument("--arxiv-latency", type=float, default=0.2, help="Stub arXiv response delay (s).")
+    arg_parser.add_argument("--latency-slo-ms", type=float, help="p95 above this counts as saturated.")
+    arg_parser.add_argument("--startup-timeout", type=float, default=180.0)
+    arg_parser.add_argument("--output", default="loadtest_results.json")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    stub_llm = StubLLMServer(first_token_latency=args.llm_latency, tokens_per_second=args.llm_tokens_per_s).start()
+    stub_arxiv = StubArxivServer(latency=args.arxiv_latency).start()
+    print(f"LLM_BASE_URL={stub_llm.base_url}")
+    print(f"ARXIV_API_URL={stub_arxiv.base_url}/api/query")
+    print(f"ARXIV_PDF_BASE_URL={stub_arxiv.base_url}")
+
+    backend = None
+    base_url = args.target
+    try:
+        if base_url is None:
+            backend = _start_backend(args.port, args.workers, stub_llm, stub_arxiv, "loadtest_backend.log")
+            base_url = f"http://127.0.0.1:{args.port}"
+        _wait_until_ready(base_url, args.startup_timeout, args.workers if backend is not None else 1)
+
+        rates = _parse_list(args.rates, float)
+        plan = [(args.concurrency, rate) for rate in rates] or [(c, None) for c in _parse_list(args.levels, int)]
+        levels = []
+        for concurrency, rate in plan:
+            logger.info(f"Running level: concurrency={concurrency} rate={rate} for {args.duration:.0f}s")
+            llm_requests_before = stub_llm.requests
+            level = asyncio.run(run_level(base_url, concurrency, args.duration, rate=rate, use_cache=args.use_cache))
+            level["llm_requests"] = stub_llm.requests - llm_requests_before
+            levels.append(level)
+            _print_table([level])
+
+        report = {
+            "target": base_url,
+            "workers": args.workers if backend is not None else None,
+            "stub_llm": {"first_token_latency": args.llm_latency, "tokens_per_second": args.llm_tokens_per_s},
+            "stub_arxiv": {"latency": args.arxiv_latency},
+            "duration_per_level": args.duration,
+            "levels": levels,
+            "saturation": find_saturation(levels, latency_slo_ms=args.latency_slo_ms),
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print()
+        _print_table(levels)
+        print(f"Saturation: {report['saturation']}")
+        print(f"Report written to {args.output}")
+        return 0
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=30)
+        stub_llm.stop()
+        stub_arxiv.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
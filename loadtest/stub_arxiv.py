@@ -0,0 +1,123 @@
+"""
+Local stand-in for the arXiv export API and PDF host.
+
+GET /api/query returns an Atom feed with one entry whose title echoes the searched
+title; GET /pdf/<id> returns a small generated PDF after a configurable delay. Point
+the backend at it with ARXIV_API_URL=<base>/api/query and ARXIV_PDF_BASE_URL=<base>.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+import fitz  # PyMuPDF
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+_TITLE_QUERY = re.compile(r'ti:"([^"]+)"')
+
+_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"
+      xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>arXiv Query</title>
+  <id>http://arxiv.org/api/stub</id>
+  <updated>2024-01-01T00:00:00Z</updated>
+  <opensearch:totalResults>1</opensearch:totalResults>
+  <opensearch:startIndex>0</opensearch:startIndex>
+  <opensearch:itemsPerPage>1</opensearch:itemsPerPage>
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}v1</id>
+    <updated>2024-01-01T00:00:00Z</updated>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>{title}</title>
+    <summary>Synthetic abstract for {title}.</summary>
+    <author><name>Load Test</name></author>
+    <link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="https://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+</feed>
+"""
+
+
+def _arxiv_id(title: str) -> str:
+    digest = int(hashlib.sha256(title.lower().encode("utf-8")).hexdigest(), 16)
+    return f"2401.{digest % 100000:05d}"
+
+
+def _pdf_bytes(arxiv_id: str, pages: int) -> bytes:
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(
+            fitz.Rect(50, 50, 545, 792),
+            f"Stub paper {arxiv_id}, page {page_number + 1}.\n\n" + "Synthetic content for load testing. " * 60,
+            fontsize=9,
+        )
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+class StubArxivServer:
+    """Threaded HTTP server imitating the arXiv API and PDF downloads."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2, pdf_pages: int = 4):
+        self.latency = latency
+        self.pdf_pages = pdf_pages
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, content: bytes, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency)
+                url = urlsplit(self.path)
+                if url.path.endswith("/api/query"):
+                    query = parse_qs(url.query).get("search_query", [""])[0]
+                    match = _TITLE_QUERY.search(query)
+                    title = match.group(1) if match else "Synthetic Paper"
+                    feed = _FEED.format(arxiv_id=_arxiv_id(title), title=escape(title))
+                    self._send(feed.encode("utf-8"), "application/atom+xml")
+                elif url.path.startswith("/pdf/"):
+                    self._send(_pdf_bytes(url.path.rsplit("/", 1)[-1], stub.pdf_pages), "application/pdf")
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def start(self) -> "StubArxivServer":
+        threading.Thread(target=self._server.serve_forever, name="stub-arxiv", daemon=True).start()
+        logger.info(f"Stub arXiv listening at {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,172 @@
+"""
+Local stand-in for the Groq / OpenAI-compatible chat completions API.
+
+Answers POST .../chat/completions (streaming and non-streaming) after a configurable
+time to first token, then emits tokens at a configurable rate. Replies are shaped so
+the crew completes a normal run:
+
+- Check Intent Agent: a Final Answer with an IntentOutput JSON that asks for RAG.
+- Question Answer Agent: one rag_query_tool action, then a Final Answer with an
+  AnswerStructure JSON once the observation is in the prompt.
+- llama-index response synthesis (inside rag_query_tool): a plain-text answer.
+"""
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+_USER_QUERY = re.compile(r'user query "(.*?)"', re.DOTALL)
+
+
+def _prompt_text(messages: List[dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def build_reply(messages: List[dict]) -> str:
+    """Pick a reply that moves the crew forward, based on what the prompt asks for."""
+    prompt = _prompt_text(messages)
+    match = _USER_QUERY.search(prompt)
+    user_query = match.group(1) if match else "the question"
+
+    if "Context information is below" in prompt:
+        return f"Based on the retrieved context, here is what the documents say about {user_query}."
+    if "Check Intent" in prompt:
+        intent = {"fetch": False, "use_rag": True, "papers": [], "user_query": user_query, "chat_history": []}
+        return "Thought: The user is asking a question; no paper needs to be fetched.\nFinal Answer: " + json.dumps(intent)
+    if "rag_query_tool" in prompt and "Observation:" not in prompt:
+        return (
+            "Thought: I should retrieve context from the document store.\n"
+            "Action: rag_query_tool\n"
+            f"Action Input: {json.dumps({'query': user_query})}"
+        )
+    answer = {
+        "answer": f"The documents describe {user_query} in detail.",
+        "sources": [],
+        "tool_used": "rag_query_tool",
+        "rationale": "Answer grounded in the retrieved context.",
+    }
+    return "Thought: I now know the final answer.\nFinal Answer: " + json.dumps(answer)
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+class StubLLMServer:
+    """Threaded HTTP server imitating an OpenAI-compatible chat completions endpoint."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 first_token_latency: float = 0.3, tokens_per_second: float = 200.0):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                reply = build_reply(body.get("messages", []))
+                time.sleep(stub.first_token_latency)
+                if body.get("stream"):
+                    self._stream(body, reply)
+                else:
+                    self._complete(body, reply)
+
+            def _usage(self, body: dict, reply: str) -> dict:
+                prompt_tokens = len(_prompt_text(body.get("messages", [])).split())
+                completion_tokens = len(_tokens(reply))
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens}
+
+            def _complete(self, body: dict, reply: str) -> None:
+                time.sleep(len(_tokens(reply)) / stub.tokens_per_second)
+                payload = json.dumps({
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": reply},
+                                 "finish_reason": "stop"}],
+                    "usage": self._usage(body, reply),
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body: dict, reply: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+                def send(delta: dict, finish_reason=None, usage=None) -> None:
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    if usage is not None:
+                        chunk["usage"] = usage
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                for token in _tokens(reply):
+                    time.sleep(1.0 / stub.tokens_per_second)
+                    send({"content": token})
+                send({}, finish_reason="stop", usage=self._usage(body, reply))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub LLM listening at {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,13 +1,13 @@
 from pprint import pprint
 
-from src.agents_src.crew import qa_crew
+from src.agents_src.crew import get_qa_crew
 
 input_data = {
     "user_query": "Can you fetch Local Interpretable Model Agnostic Shap Explanations for machine learning models",
     "chat_history": {}
 }
 
-result = qa_crew.kickoff(input_data)
+result = get_qa_crew().kickoff(input_data)
 
 result_dict = result.to_dict()
 
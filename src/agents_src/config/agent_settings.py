@@ -1,3 +1,5 @@
+from typing import Optional
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -13,6 +15,41 @@ class AgentSettings(BaseSettings):
     MODEL_NAME: str
     MODEL_TEMPERATURE: float
 
+    # OpenAI-compatible endpoint replacing the Groq API, e.g. a local stand-in for load tests
+    LLM_BASE_URL: Optional[str] = None
+
+    # How often request paths check whether another worker changed the vector store
+    STORE_VERSION_CHECK_SECONDS: float = 1.0
+
+    # Local intent router ahead of the Check Intent Agent
+    INTENT_ROUTER_ENABLED: bool = True
+    INTENT_ROUTER_CONFIDENCE: float = 0.8
+
+    # Hybrid dense + BM25 retrieval
+    HYBRID_RETRIEVAL_ENABLED: bool = True
+    HYBRID_DENSE_WEIGHT: float = 0.5
+    HYBRID_SPARSE_WEIGHT: float = 0.5
+    HYBRID_CANDIDATES: int = 10  # candidates taken from each retriever before fusion
+
+    # Restrict retrieval to the papers a conversation touched, with fallback to the whole index
+    SCOPED_RETRIEVAL_ENABLED: bool = True
+    SCOPED_RETRIEVAL_MIN_HITS: int = 1
+
+    # rag_query_tool: "synthesize" answers with a nested LLM call, "retrieval" returns
+    # ranked chunks within RAG_TOOL_CONTEXT_TOKENS for the agent to answer from
+    RAG_TOOL_MODE: str = "synthesize"
+    RAG_TOOL_CONTEXT_TOKENS: int = 1500
+
+    # Batch question answering (POST /chat/batch and src.agents_src.retrieval.batch)
+    BATCH_MAX_CONCURRENCY: int = 4  # concurrent LLM synthesis calls
+    BATCH_MAX_QUESTIONS: int = 1000
+
+    # Crew agent LLM response cache: "off", "on" (record and reuse) or "replay" (cached
+    # responses only; a miss raises instead of calling the API)
+    LLM_CACHE_MODE: str = "off"
+    LLM_CACHE_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/llm_cache.sqlite3
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,14 +1,52 @@
+import threading
+from typing import Optional
+
 from crewai import Crew, Process
 
-from src.agents_src.agents.check_intent_agent import intent_agent
-from src.agents_src.tasks.check_intent_task import intent_task
-from src.agents_src.agents.question_answer_agent import qa_agent
-from src.agents_src.tasks.question_answer_task import qa_task
+from src.agents_src.progress import install_crewai_handlers
+
+# Crews, and the agents, tasks, tools and LLM clients behind them, are built on first
+# use instead of when this module is imported.
+_qa_crew: Optional[Crew] = None
+_routed_qa_crew: Optional[Crew] = None
+_crew_lock = threading.Lock()
+
+
+def get_qa_crew() -> Crew:
+    """Return the process-wide crew that checks intent and then answers."""
+    global _qa_crew
+    if _qa_crew is None:
+        with _crew_lock:
+            if _qa_crew is None:
+                from src.agents_src.agents.check_intent_agent import intent_agent
+                from src.agents_src.tasks.check_intent_task import intent_task
+                from src.agents_src.agents.question_answer_agent import qa_agent
+                from src.agents_src.tasks.question_answer_task import qa_task
+
+                install_crewai_handlers()
+                _qa_crew = Crew(
+                    agents=[intent_agent, qa_agent],
+                    tasks=[intent_task, qa_task],
+                    process=Process.sequential,
+                    verbose=True,
+                )
+    return _qa_crew
+
 
+def get_routed_qa_crew() -> Crew:
+    """Return the process-wide crew that answers turns whose intent the local intent router decided."""
+    global _routed_qa_crew
+    if _routed_qa_crew is None:
+        with _crew_lock:
+            if _routed_qa_crew is None:
+                from src.agents_src.agents.question_answer_agent import qa_agent
+                from src.agents_src.tasks.question_answer_task import routed_qa_task
 
-qa_crew = Crew(
-    agents=[intent_agent,qa_agent],
-    tasks=[intent_task,qa_task],
-    process=Process.sequential,
-    verbose=True,
-)
+                install_crewai_handlers()
+                _routed_qa_crew = Crew(
+                    agents=[qa_agent],
+                    tasks=[routed_qa_task],
+                    process=Process.sequential,
+                    verbose=True,
+                )
+    return _routed_qa_crew
@@ -0,0 +1,212 @@
+import logging
+import re
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.tasks.check_intent_task import ChatMessage, IntentOutput
+from src.agents_src.tools.fetch_paper_tool import IntentUse, fetch_papers
+from src.agents_src.progress import emit_progress
+from src.rag_doc_ingestion.embeddings import get_embed_model
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Verbs that only ever mean "bring this paper in"; everyday verbs like get/find/add
+# ("get the paper's key findings") are left to the Check Intent Agent
+_FETCH_VERBS = r"(?:fetch|download|grab|retrieve|ingest|import)"
+_WEAK_FETCH_VERBS = r"(?:get|pull|find|load|add)"
+_PAPER_NOUNS = r"(?:paper|article|publication|preprint|arxiv)s?"
+# "fetch the paper ...", "download the arxiv article ...", "retrieve papers on ..."
+_FETCH_REQUEST = re.compile(rf"\b{_FETCH_VERBS}\b(?:\s+\w+){{0,4}}?\s+{_PAPER_NOUNS}\b", re.IGNORECASE)
+_ANY_FETCH_HINT = re.compile(rf"\b(?:{_FETCH_VERBS}|{_WEAK_FETCH_VERBS}|{_PAPER_NOUNS})\b", re.IGNORECASE)
+# A matching pair of quotes that opens and closes on a word boundary, so the
+# apostrophes in "paper's" or "authors' results" are not taken for quotes
+_QUOTED_TITLE = re.compile(r"(?<!\w)(?:\"([^\"]{4,})\"|“([^”]{4,})”|'([^']{4,})')(?!\w)")
+_TITLE_AFTER_NOUN = re.compile(
+    rf"\b(?:{_PAPER_NOUNS}\s+)*{_PAPER_NOUNS}\b\s*(?P<marker>titled|called|named|on|about|:)?\s*(?P<title>.+)",
+    re.IGNORECASE,
+)
+# Where a trailing question starts in "fetch X and explain Y"
+_QUESTION_SPLIT = re.compile(
+    r"(?:\?|\s+and\s+|[.;,]\s*)(?=(?:then\s+)?(?:explain|describe|summari[sz]e|tell|what|how|why|which|who|"
+    r"when|where|compare|give|list|can|could|does|is|are)\b)",
+    re.IGNORECASE,
+)
+
+_FETCH_EXAMPLES = [
+    "Fetch the paper Attention Is All You Need",
+    "Can you download the arxiv paper on diffusion models",
+    "Get me the paper titled Deep Residual Learning for Image Recognition",
+    "Please retrieve the article BERT: Pre-training of Deep Bidirectional Transformers",
+    "Find papers about graph neural networks and add them",
+]
+_QUESTION_EXAMPLES = [
+    "What is the attention mechanism?",
+    "Explain this in more detail",
+    "How does the model handle long sequences?",
+    "Summarize the main contributions",
+    "What datasets were used in the experiments?",
+    "Compare the two approaches",
+]
+
+
+class IntentDecision:
+    """Outcome of local routing: an IntentOutput when confident, otherwise None."""
+
+    def __init__(self, label: str, confidence: float, fetch_title: Optional[str] = None,
+                 question: Optional[str] = None, reason: str = ""):
+        self.label = label
+        self.confidence = confidence
+        self.fetch_title = fetch_title
+        self.question = question
+        self.reason = reason
+
+
+class IntentRouter:
+    """
+    CPU-only intent router that runs before the Check Intent Agent.
+
+    Rules spot explicit fetch requests and plain follow-up questions; a nearest-centroid
+    classifier over the shared embedding model confirms them. Only decisions at or above
+    `confidence_threshold` skip the LLM agent.
+    """
+
+    def __init__(self, confidence_threshold: float = 0.8):
+        self.confidence_threshold = confidence_threshold
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._stats = {"decisions": 0, "fast_path": 0, "fallbacks": 0}
+
+    def _class_centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    embed_model = get_embed_model()
+                    centroids = []
+                    for examples in (_FETCH_EXAMPLES, _QUESTION_EXAMPLES):
+                        vectors = np.asarray(embed_model.get_text_embedding_batch(examples), dtype=np.float32)
+                        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                        centroid = vectors.mean(axis=0)
+                        centroids.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = np.stack(centroids)
+        return self._centroids
+
+    def warm_up(self) -> None:
+        """Embed the class examples ahead of the first decision."""
+        self._class_centroids()
+
+    def _classify(self, text: str) -> Tuple[float, float]:
+        """Return (p_fetch, p_question) from similarity to the class centroids."""
+        query = np.asarray(get_embed_model().get_query_embedding(text), dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        logits = (self._class_centroids() @ query) * 20.0
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        return float(probs[0]), float(probs[1])
+
+    @staticmethod
+    def _split_fetch_request(user_query: str) -> Tuple[Optional[str], Optional[str]]:
+        """Split "fetch <title> and explain <question>" into (title, question)."""
+        quoted = _QUOTED_TITLE.search(user_query)
+        if quoted:
+            rest = (user_query[:quoted.start()] + " " + user_query[quoted.end():]).strip()
+            split = _QUESTION_SPLIT.search(rest)
+            question = rest[split.end():].strip() if split else None
+            title = next(group for group in quoted.groups() if group is not None)
+            return title.strip(), question or None
+
+        match = _TITLE_AFTER_NOUN.search(user_query[_FETCH_REQUEST.search(user_query).start():])
+        if not match:
+            return None, None
+        tail = match.group("title")
+        split = _QUESTION_SPLIT.search(tail)
+        title = (tail[:split.start()] if split else tail).strip(" .?!,;:")
+        question = tail[split.end():].strip() if split else None
+        # without quotes or "titled/on/about", only a capitalised span reads as a title
+        title_like = match.group("marker") or title[:1].isupper() or title[:1].isdigit()
+        if len(title.split()) < 2 or not title_like:
+            return None, question
+        return title, question or None
+
+    def decide(self, user_query: str) -> IntentDecision:
+        text = user_query.strip()
+        p_fetch, p_question = self._classify(text)
+
+        if _FETCH_REQUEST.search(text):
+            title, question = self._split_fetch_request(text)
+            if not title:
+                return IntentDecision("fetch", 0.5, reason="fetch request without a recognisable title")
+            # the rule match is strong evidence; the classifier can still veto it
+            return IntentDecision("fetch", 0.5 + 0.5 * p_fetch, fetch_title=title, question=question,
+                                  reason="explicit fetch request")
+
+        if not _ANY_FETCH_HINT.search(text):
+            return IntentDecision("question", p_question, question=text, reason="no fetch verb or paper mention")
+
+        return IntentDecision("question", min(p_question, 0.5), question=text,
+                              reason="mentions papers or fetch verbs without a clear request")
+
+    def route(self, user_query: str, chat_history: List[dict]) -> Optional[IntentOutput]:
+        """
+        Produce an IntentOutput locally when confident, fetching papers if requested.
+
+        Returns None when the Check Intent Agent should decide instead.
+        """
+        decision = self.decide(user_query)
+        confident = decision.confidence >= self.confidence_threshold
+        with self._lock:
+            self._stats["decisions"] += 1
+            self._stats["fast_path" if confident else "fallbacks"] += 1
+            fallback_rate = self._stats["fallbacks"] / self._stats["decisions"]
+        logger.info(
+            f"Intent router: {decision.label} confidence={decision.confidence:.2f} "
+            f"({decision.reason}) -> {'fast path' if confident else 'LLM fallback'}; "
+            f"fallback rate {fallback_rate:.1%}"
+        )
+        if not confident:
+            return None
+
+        papers: List[str] = []
+        if decision.label == "fetch":
+            # no category filter: the agent would pick one, the router cannot
+            fetched = fetch_papers(IntentUse(title=decision.fetch_title, category=None))
+            if isinstance(fetched, dict):
+                papers = fetched.get("papers", [])
+            elif fetched:
+                papers = list(fetched)
+            if not papers:
+                logger.info(f"Intent router found no paper for '{decision.fetch_title}', falling back to the agent")
+                return None
+
+        intent = IntentOutput(
+            fetch=bool(papers),
+            use_rag=bool(decision.question),
+            papers=papers,
+            user_query=decision.question or user_query,
+            chat_history=[ChatMessage(role=m["role"], content=m["content"]) for m in chat_history],
+        )
+        emit_progress("intent_decided", fetch=intent.fetch, use_rag=intent.use_rag, papers=intent.papers)
+        return intent
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["fallback_rate"] = stats["fallbacks"] / stats["decisions"] if stats["decisions"] else 0.0
+        return stats
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Return the process-wide intent router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter(confidence_threshold=AgentSettings().INTENT_ROUTER_CONFIDENCE)
+    return _router
@@ -1,13 +1,94 @@
+import logging
+
 from crewai import LLM
 
+from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.llm.llm_cache import LLMCacheMiss, LLMResponseCache, get_llm_cache, prompt_key
 from src.agents_src.llm.llm_configuration import LLM_CONFIG
+from src.agents_src.progress import emit_progress
+from src.observability.metrics import LLM_CACHE_LOOKUPS
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+class CachedLLM(LLM):
+    """
+    crewai LLM that answers repeated prompts from the on-disk LLMResponseCache.
+
+    Only deterministic calls are cached: temperature 0 and no tools executed inside
+    the call. With `replay=True` a prompt without a recorded response raises
+    LLMCacheMiss instead of calling the API, so crews can run without network access.
+    """
+
+    def __init__(self, agent_name: str, cache: LLMResponseCache, replay: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.agent_name = agent_name
+        self.cache = cache
+        self.replay = replay
+
+    def _cache_key(self, messages, tools) -> str:
+        params = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens,
+            "max_completion_tokens": self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "seed": self.seed,
+            "response_format": self.response_format,
+            "base_url": self.base_url or self.api_base,
+        }
+        return prompt_key(params, messages, tools)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        if available_functions or self.temperature:
+            # tool results and sampled completions are not reproducible
+            self.cache.record_bypass(self.agent_name)
+            LLM_CACHE_LOOKUPS.inc(agent=self.agent_name, result="bypass")
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        key = self._cache_key(messages, tools)
+        cached = self.cache.get(key, self.agent_name)
+        LLM_CACHE_LOOKUPS.inc(agent=self.agent_name, result="hit" if cached is not None else "miss")
+        if cached is not None:
+            if self.stream:
+                # streaming clients get the recorded answer in one chunk
+                emit_progress("token", text=cached, agent=getattr(from_agent, "role", None))
+            return cached
+        if self.replay:
+            raise LLMCacheMiss(f"No recorded LLM response for agent '{self.agent_name}' (key {key[:12]}).")
+
+        response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str) and response:
+            self.cache.put(key, self.agent_name, self.model, response)
+        return response
 
 
 def get_llm_for_agent(agent_name):
     model = LLM_CONFIG.get(agent_name, {}).get("model", "groq/llama-3.3-70b-versatile")
     temperature = LLM_CONFIG.get(agent_name, {}).get("temperature", 0.0)
+    stream = LLM_CONFIG.get(agent_name, {}).get("stream", False)
+    settings = AgentSettings()
+    if settings.LLM_CACHE_MODE in ("on", "replay"):
+        return CachedLLM(
+            agent_name=agent_name,
+            cache=get_llm_cache(),
+            replay=settings.LLM_CACHE_MODE == "replay",
+            model=model,
+            temperature=temperature,
+            stream=stream,
+            base_url=settings.LLM_BASE_URL,
+        )
+    if settings.LLM_CACHE_MODE != "off":
+        logger.warning(f"Unknown LLM_CACHE_MODE '{settings.LLM_CACHE_MODE}', LLM response cache disabled.")
     llm = LLM(
         model=model,
         temperature=temperature,
+        stream=stream,
+        base_url=settings.LLM_BASE_URL,
     )
     return llm
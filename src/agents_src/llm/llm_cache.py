@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from src.agents_src.config.agent_settings import AgentSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Completion parameters that change the response; all of them are part of the cache key
+_KEY_PARAMS = (
+    "model", "temperature", "top_p", "n", "stop", "max_tokens", "max_completion_tokens",
+    "presence_penalty", "frequency_penalty", "seed", "response_format", "base_url", "api_base",
+)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        # whitespace differences (indentation, trailing newlines) do not change the prompt
+        return " ".join(content.split())
+    return content
+
+
+def prompt_key(params: Dict[str, Any], messages: Union[str, List[Dict[str, Any]]],
+               tools: Optional[List[dict]] = None) -> str:
+    """Hash of the model parameters, the normalized messages and the tool schemas."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    payload = {
+        "params": {name: params.get(name) for name in _KEY_PARAMS if params.get(name) is not None},
+        "messages": [
+            {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+            for message in messages
+        ],
+        "tools": tools or [],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM completions keyed by prompt_key.
+
+    Responses are stored in SQLite with their size and access time; once the stored
+    responses exceed `max_bytes` the least recently used ones are evicted. Lookups are
+    counted per agent, so hit rates can be compared across agents.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " agent TEXT,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, agent: str, event: str) -> None:
+        counts = self._stats.setdefault(agent, {"hits": 0, "misses": 0, "stores": 0, "bypassed": 0})
+        counts[event] += 1
+
+    def get(self, key: str, agent: str) -> Optional[str]:
+        """Return the recorded response for `key`, refreshing its access time."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            self._count(agent, "hits" if row is not None else "misses")
+        return row[0] if row is not None else None
+
+    def put(self, key: str, agent: str, model: str, response: str) -> None:
+        """Record a response and evict the least recently used ones beyond `max_bytes`."""
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, model, response, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, agent, model, response, size, now, now),
+            )
+            (total,) = self._conn.execute("SELECT TOTAL(size) FROM responses").fetchone()
+            evicted = 0
+            while total > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM responses WHERE key != ? ORDER BY last_access LIMIT 1", (key,)
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+                total -= row[1]
+                evicted += 1
+            self._conn.commit()
+            self._count(agent, "stores")
+        if evicted:
+            logger.info(f"Evicted {evicted} least recently used LLM responses from cache.")
+
+    def record_bypass(self, agent: str) -> None:
+        """Count a call that was not eligible for caching (tool execution, sampling)."""
+        with self._lock:
+            self._count(agent, "bypassed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            agents = {agent: dict(counts) for agent, counts in self._stats.items()}
+            entries, size = self._conn.execute("SELECT COUNT(*), TOTAL(size) FROM responses").fetchone()
+        for counts in agents.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        return {"entries": entries, "size_bytes": int(size), "max_bytes": self.max_bytes, "agents": agents}
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache stored next to the vector store."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                settings = AgentSettings()
+                path = settings.LLM_CACHE_PATH or os.path.join(settings.VECTOR_STORE_DIR, "llm_cache.sqlite3")
+                logger.info(f"Using LLM response cache at: {path}")
+                _llm_cache = LLMResponseCache(path, max_bytes=settings.LLM_CACHE_MAX_BYTES)
+    return _llm_cache
@@ -3,6 +3,8 @@ LLM_CONFIG = {
     "Question Answer Agent": {
         "model": "groq/llama-3.3-70b-versatile",
         "temperature": 0.0,
+        # stream tokens so /chat/answer/stream can forward them as they are generated
+        "stream": True,
     },
     "Check Intent Agent": {
         "model": "groq/llama-3.3-70b-versatile",
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from src.observability.metrics import LLM_CALL_SECONDS, STAGE_ERRORS, record_stage
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+ProgressListener = Callable[[str, dict], None]
+
+# Listener for the crew run in the current context (set per request by the backend).
+_listener: ContextVar[Optional[ProgressListener]] = ContextVar("progress_listener", default=None)
+
+
+def emit_progress(event: str, **data) -> None:
+    """Report a progress event to the listener of the current crew run, if any."""
+    listener = _listener.get()
+    if listener is None:
+        return
+    try:
+        listener(event, data)
+    except Exception as e:
+        logger.warning(f"Progress listener failed for event '{event}': {e}")
+
+
+@contextmanager
+def progress_listener(listener: ProgressListener):
+    """Route progress events emitted in this context to `listener`."""
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def _forward_llm_stream_chunk(source, event) -> None:
+    # crewai emits events on the thread that runs the LLM call, so the listener of
+    # the current crew run is visible here.
+    if event.chunk:
+        emit_progress("token", text=event.chunk, agent=event.agent_role)
+
+
+
+# LLM calls start and finish on the same thread, so their start times are kept per thread.
+_llm_call_started = threading.local()
+
+
+def _llm_call_started_handler(source, event) -> None:
+    _llm_call_started.at = time.perf_counter()
+
+
+def _llm_call_finished_handler(source, event) -> None:
+    started = getattr(_llm_call_started, "at", None)
+    if started is None:
+        return
+    _llm_call_started.at = None
+    seconds = time.perf_counter() - started
+    LLM_CALL_SECONDS.observe(seconds, agent=event.agent_role or "none")
+    record_stage("llm_call", seconds)
+    if event.type == "llm_call_failed":
+        STAGE_ERRORS.inc(stage="llm_call")
+
+
+_handlers_installed = False
+_handlers_lock = threading.Lock()
+
+
+def install_crewai_handlers() -> None:
+    """
+    Register the token streaming and LLM timing handlers on the crewai event bus.
+
+    Called when the first crew is built, so importing this module does not import
+    crewai; later calls do nothing.
+    """
+    global _handlers_installed
+    with _handlers_lock:
+        if _handlers_installed:
+            return
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+        from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, _forward_llm_stream_chunk)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, _llm_call_started_handler)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, _llm_call_finished_handler)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, _llm_call_finished_handler)
+        _handlers_installed = True
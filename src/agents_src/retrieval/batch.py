@@ -0,0 +1,151 @@
+"""
+Batch question answering straight against the retrieval engine, without crew runs.
+
+    python -m src.agents_src.retrieval.batch questions.txt --output answers.jsonl --concurrency 8
+
+The input has one question per line, or JSONL with a "question" field. One JSON line is
+written per answer as soon as it is ready, followed by a summary line.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional
+
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.retrieval.context import estimate_tokens, merge_overlapping_chunks
+from src.agents_src.retrieval.engine import RetrievalEngine, get_retrieval_engine
+from src.observability.metrics import span
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+def answer_batch(questions: List[str], max_concurrency: Optional[int] = None,
+                 engine: Optional[RetrievalEngine] = None) -> Iterator[dict]:
+    """
+    Answer many questions and yield one result per question as it finishes.
+
+    All questions are embedded in one batch and retrieved against a single snapshot of
+    the index. Repeated questions are answered once, chunks retrieved by several
+    questions are shared, and overlapping chunks of the same document are merged
+    before synthesis, which runs on up to `max_concurrency` threads. Each result has
+    the question's `index` in the input; the last item yielded is a `summary` dict,
+    including the context tokens the merging saved.
+    """
+    start = time.perf_counter()
+    engine = engine or get_retrieval_engine()
+    max_concurrency = max_concurrency or AgentSettings().BATCH_MAX_CONCURRENCY
+
+    positions = {}
+    for index, question in enumerate(questions):
+        positions.setdefault(question, []).append(index)
+    unique_questions = list(positions)
+
+    query_engine, retrieved = engine.retrieve_batch(unique_questions)
+    retrieval_seconds = time.perf_counter() - start
+
+    # one node object per chunk, however many questions retrieved it
+    shared_nodes = {}
+    total_chunks = context_tokens = merged_tokens = 0
+    contexts: List[List[NodeWithScore]] = []
+
+    def tokens(nodes: List[NodeWithScore]) -> int:
+        return sum(estimate_tokens(hit.node.get_content(metadata_mode=MetadataMode.NONE)) for hit in nodes)
+
+    for hits in retrieved:
+        total_chunks += len(hits)
+        hits = [
+            NodeWithScore(node=shared_nodes.setdefault(hit.node.node_id, hit.node), score=hit.score)
+            for hit in hits
+        ]
+        merged = merge_overlapping_chunks(hits)
+        context_tokens += tokens(hits)
+        merged_tokens += tokens(merged)
+        contexts.append(merged)
+
+    def synthesize(question: str, nodes: List[NodeWithScore]) -> dict:
+        synthesis_start = time.perf_counter()
+        with span("batch_synthesis"):
+            response = query_engine.synthesize(QueryBundle(question), nodes)
+        return {
+            "answer": response.response,
+            "source_files": sorted({hit.node.metadata.get("file_name") for hit in nodes} - {None}),
+            "synthesis_ms": round((time.perf_counter() - synthesis_start) * 1000, 1),
+        }
+
+    answered = failed = 0
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch-qa") as pool:
+        futures = {
+            pool.submit(synthesize, question, nodes): question
+            for question, nodes in zip(unique_questions, contexts)
+        }
+        for future in as_completed(futures):
+            question = futures[future]
+            try:
+                result = future.result()
+                answered += 1
+            except Exception as e:
+                logger.error(f"Batch synthesis failed for '{question}': {e}", exc_info=True)
+                result = {"error": str(e)}
+                failed += 1
+            for index in positions[question]:
+                yield {"index": index, "question": question, **result}
+
+    summary = {
+        "questions": len(questions),
+        "unique_questions": len(unique_questions),
+        "answered": answered,
+        "failed": failed,
+        "retrieved_chunks": total_chunks,
+        "unique_chunks": len(shared_nodes),
+        "context_tokens": merged_tokens,
+        "context_tokens_saved": context_tokens - merged_tokens,
+        "retrieval_seconds": round(retrieval_seconds, 3),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "max_concurrency": max_concurrency,
+    }
+    logger.info(f"Batch answered: {summary}")
+    yield {"summary": summary}
+
+
+def _read_questions(path: str) -> List[str]:
+    questions = []
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line)["question"]
+            questions.append(line)
+    return questions
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Answer a file of questions against the document store.")
+    arg_parser.add_argument("input", help="Questions, one per line or JSONL with a 'question' field ('-' for stdin).")
+    arg_parser.add_argument("--output", default="-", help="JSONL output file ('-' for stdout).")
+    arg_parser.add_argument("--concurrency", type=int, help="Concurrent LLM synthesis calls.")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    questions = _read_questions(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in answer_batch(questions, max_concurrency=args.concurrency):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    # estimate_tokens is used by the chat sessions, which should not import llama_index
+    from llama_index.core.schema import NodeWithScore
+
+# Below this many tokens a truncated chunk is not worth sending
+_MIN_PARTIAL_CHUNK_TOKENS = 50
+
+# Source metadata copied from a chunk into the tool output
+_SOURCE_KEYS = ("file_name", "page_label", "title", "arxiv_id")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def pack_chunks(nodes: List["NodeWithScore"], token_budget: int) -> Tuple[List[dict], int]:
+    """
+    Turn ranked retrieval hits into tool-ready chunks that fit in `token_budget`.
+
+    Chunks are taken in rank order; the first one that does not fit is cut to the
+    remaining budget (if enough is left to be useful) and the rest are left out.
+    Returns the chunks and the number of hits that were dropped.
+    """
+    from llama_index.core.schema import MetadataMode
+
+    chunks = []
+    remaining = token_budget
+    for rank, hit in enumerate(nodes, start=1):
+        text = hit.node.get_content(metadata_mode=MetadataMode.NONE).strip()
+        tokens = estimate_tokens(text)
+        truncated = tokens > remaining
+        if truncated:
+            if remaining < _MIN_PARTIAL_CHUNK_TOKENS:
+                break
+            text = text[:remaining * 4].rsplit(" ", 1)[0] + " ..."
+            tokens = estimate_tokens(text)
+        chunk = {"rank": rank, "score": round(hit.score, 4) if hit.score is not None else None}
+        chunk.update({key: hit.node.metadata[key] for key in _SOURCE_KEYS if key in hit.node.metadata})
+        chunk["text"] = text
+        chunks.append(chunk)
+        remaining -= tokens
+        if truncated or remaining <= 0:
+            break
+    return chunks, len(nodes) - len(chunks)
+
+
+def merge_overlapping_chunks(nodes: List["NodeWithScore"]) -> List["NodeWithScore"]:
+    """
+    Join hits that repeat text from the same source document.
+
+    Chunks are cut with an overlap, so neighbouring hits from one page share text.
+    Hits of the same document whose character ranges overlap or touch become one
+    chunk covering their union, scored as the best of them; a hit whose text is
+    contained in another hit's is dropped. Results keep the order of each group's
+    best-ranked hit.
+    """
+    from llama_index.core.schema import MetadataMode, NodeWithScore
+
+    # [best rank, best score, node, start, end, text] per merged chunk
+    merged = []
+    spans = {}
+    for rank, hit in enumerate(nodes):
+        node = hit.node
+        text = node.get_content(metadata_mode=MetadataMode.NONE)
+        start, end = node.start_char_idx, node.end_char_idx
+        if node.ref_doc_id is not None and start is not None and end is not None and end - start == len(text):
+            spans.setdefault(node.ref_doc_id, []).append((start, end, rank, hit, text))
+        else:
+            merged.append([rank, hit.score, node, start, end, text])
+
+    for doc_spans in spans.values():
+        doc_spans.sort(key=lambda span: span[:2])
+        current = None
+        for start, end, rank, hit, text in doc_spans:
+            if current is not None and start <= current[4]:
+                if end > current[4]:
+                    current[5] += text[current[4] - start:]
+                    current[4] = end
+                if rank < current[0]:
+                    current[0], current[2] = rank, hit.node
+                if hit.score is not None and (current[1] is None or hit.score > current[1]):
+                    current[1] = hit.score
+                continue
+            current = [rank, hit.score, hit.node, start, end, text]
+            merged.append(current)
+
+    # longest first, so a chunk contained in another is folded into it
+    kept = []
+    for chunk in sorted(merged, key=lambda chunk: (-len(chunk[5]), chunk[0])):
+        container = next((other for other in kept if chunk[5] in other[5]), None)
+        if container is None:
+            kept.append(chunk)
+            continue
+        container[0] = min(container[0], chunk[0])
+        if chunk[1] is not None and (container[1] is None or chunk[1] > container[1]):
+            container[1] = chunk[1]
+
+    results = []
+    for rank, score, node, start, end, text in sorted(kept, key=lambda chunk: chunk[0]):
+        if text != node.get_content(metadata_mode=MetadataMode.NONE):
+            node = node.model_copy()
+            node.set_content(text)
+            node.start_char_idx, node.end_char_idx = start, end
+        results.append(NodeWithScore(node=node, score=score))
+    return results
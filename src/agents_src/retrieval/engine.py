@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from llama_index.core import VectorStoreIndex, StorageContext
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters
+from llama_index.llms.groq import Groq
+
+from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.retrieval.hybrid import HybridRetriever
+from src.agents_src.retrieval.scope import note_global_retrieval, scope_paper_ids
+from src.observability.metrics import span
+from src.rag_doc_ingestion.dedup import get_dedup_index
+from src.rag_doc_ingestion.embeddings import get_embed_model
+from src.rag_doc_ingestion.sparse_index import get_sparse_index
+from src.rag_doc_ingestion.store_version import StoreVersionWatcher, written_by_this_process
+from src.rag_doc_ingestion.vector_store import get_vector_store
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+class RetrievalEngine:
+    """
+    Long-lived owner of the vector store, index and query engine used by rag_query_tool.
+
+    The embedding model and LLM are created once per process. The vector store, index and
+    query engine are rebuilt only when ingestion bumps the store version, so new documents
+    become searchable without a restart. With HYBRID_RETRIEVAL_ENABLED the query engine
+    fuses dense results with the BM25 sparse index.
+    """
+
+    def __init__(self, settings: Optional[AgentSettings] = None, similarity_top_k: int = 3):
+        self.settings = settings or AgentSettings()
+        self.similarity_top_k = similarity_top_k
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._embed_model = None
+        self._llm = None
+        self._index = None
+        self._retriever = None
+        self._candidate_k = similarity_top_k
+        self._query_engine = None
+        self._store_version = None
+        self._version_watcher = StoreVersionWatcher(
+            self.settings.VECTOR_STORE_DIR, interval=self.settings.STORE_VERSION_CHECK_SECONDS
+        )
+        self._stats = {
+            "constructions": 0,
+            "construction_seconds_total": 0.0,
+            "last_construction_seconds": 0.0,
+            "queries": 0,
+            "query_seconds_total": 0.0,
+            "last_query_seconds": 0.0,
+            "retrievals": 0,
+            "retrieval_seconds_total": 0.0,
+            "scoped_retrievals": 0,
+            "scope_fallbacks": 0,
+        }
+
+    def _build(self, store_version: str) -> None:
+        start = time.perf_counter()
+        if self._embed_model is None:
+            # shared embedding model; repeated questions hit its query embedding LRU
+            self._embed_model = get_embed_model()
+        if self._llm is None:
+            groq_kwargs = {"api_base": self.settings.LLM_BASE_URL} if self.settings.LLM_BASE_URL else {}
+            self._llm = Groq(
+                model=self.settings.MODEL_NAME,
+                temperature=self.settings.MODEL_TEMPERATURE,
+                api_key=self.settings.GROQ_API_KEY,
+                **groq_kwargs,
+            )
+
+        # Chroma or the memory-mapped numpy store, per VECTOR_BACKEND. On a rebuild for a
+        # version another worker wrote, reopen storage instead of reusing cached handles.
+        fresh = self._store_version is not None and not written_by_this_process(store_version)
+        vector_store = get_vector_store(fresh=fresh)
+        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        index = VectorStoreIndex.from_vector_store(
+            vector_store=vector_store,
+            storage_context=storage_context,
+            embed_model=self._embed_model
+        )
+        self._index = index
+        if self.settings.HYBRID_RETRIEVAL_ENABLED:
+            candidate_k = max(self.settings.HYBRID_CANDIDATES, self.similarity_top_k)
+            self._candidate_k = candidate_k
+            self._retriever = HybridRetriever(
+                vector_retriever=index.as_retriever(similarity_top_k=candidate_k),
+                vector_store=vector_store,
+                sparse_index=get_sparse_index(),
+                similarity_top_k=self.similarity_top_k,
+                candidate_k=candidate_k,
+                dense_weight=self.settings.HYBRID_DENSE_WEIGHT,
+                sparse_weight=self.settings.HYBRID_SPARSE_WEIGHT,
+            )
+            self._query_engine = RetrieverQueryEngine.from_args(self._retriever, llm=self._llm)
+        else:
+            self._retriever = None
+            self._query_engine = index.as_query_engine(similarity_top_k=self.similarity_top_k, llm=self._llm)
+        self._store_version = store_version
+
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._stats["constructions"] += 1
+            self._stats["construction_seconds_total"] += elapsed
+            self._stats["last_construction_seconds"] = elapsed
+        logger.info(f"Retrieval engine built in {elapsed:.3f}s (store version: {store_version or 'none'})")
+
+    def _current_query_engine(self):
+        store_version = self._version_watcher.current()
+        query_engine = self._query_engine
+        if query_engine is not None and store_version == self._store_version:
+            return query_engine
+        with self._lock:
+            if self._query_engine is None or store_version != self._store_version:
+                with span("engine_build"):
+                    self._build(store_version)
+            return self._query_engine
+
+    def warm_up(self) -> None:
+        """Build the engine ahead of the first query."""
+        self._current_query_engine()
+
+    def _retrieve_nodes(self, query_engine, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """
+        Retrieve for the current retrieval scope, falling back to the whole index.
+
+        When the conversation has touched papers, only their chunks are searched (a
+        paper_id metadata filter on the vector store and the sparse index). If that
+        finds fewer than SCOPED_RETRIEVAL_MIN_HITS chunks, e.g. because the question is
+        about something else, the query runs against the global index. Papers holding the
+        kept copies of a scoped paper's near-duplicate chunks are searched as well.
+        """
+        paper_ids = scope_paper_ids()
+        if paper_ids and self.settings.SCOPED_RETRIEVAL_ENABLED:
+            paper_ids = paper_ids + get_dedup_index().paper_aliases(paper_ids)
+            filters = MetadataFilters(
+                filters=[MetadataFilter(key="paper_id", value=paper_ids, operator=FilterOperator.IN)]
+            )
+            if self._retriever is not None:
+                vector_retriever = self._index.as_retriever(similarity_top_k=self._candidate_k, filters=filters)
+                retriever = self._retriever.scoped(vector_retriever, paper_ids)
+            else:
+                retriever = self._index.as_retriever(similarity_top_k=self.similarity_top_k, filters=filters)
+            with span("retrieval_scoped"):
+                nodes = retriever.retrieve(query_bundle)
+            with self._stats_lock:
+                self._stats["scoped_retrievals"] += 1
+            if len(nodes) >= self.settings.SCOPED_RETRIEVAL_MIN_HITS:
+                return nodes
+            with self._stats_lock:
+                self._stats["scope_fallbacks"] += 1
+            logger.info(f"Scoped retrieval over {len(paper_ids)} papers found {len(nodes)} chunks; using global index")
+        note_global_retrieval()
+        with span("retrieval"):
+            return query_engine.retrieve(query_bundle)
+
+    def query(self, query: str):
+        """Run a query against the current index and record its latency."""
+        query_engine = self._current_query_engine()
+        start = time.perf_counter()
+        # retrieve and synthesize separately so each shows up as its own stage
+        query_bundle = QueryBundle(query)
+        nodes = self._retrieve_nodes(query_engine, query_bundle)
+        with span("synthesis"):
+            response = query_engine.synthesize(query_bundle, nodes)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._stats["queries"] += 1
+            self._stats["query_seconds_total"] += elapsed
+            self._stats["last_query_seconds"] = elapsed
+        logger.info(f"Retrieval query answered in {elapsed:.3f}s")
+        return response
+
+    def retrieve(self, query: str) -> List[NodeWithScore]:
+        """Return the ranked chunks for a query, without LLM synthesis."""
+        query_engine = self._current_query_engine()
+        start = time.perf_counter()
+        nodes = self._retrieve_nodes(query_engine, QueryBundle(query))
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._stats["retrievals"] += 1
+            self._stats["retrieval_seconds_total"] += elapsed
+        logger.info(f"Retrieved {len(nodes)} chunks in {elapsed:.3f}s")
+        return nodes
+
+    def retrieve_batch(self, queries: List[str]) -> Tuple[object, List[List[NodeWithScore]]]:
+        """
+        Retrieve context for many queries against one snapshot of the index.
+
+        The queries are embedded in a single batch. Returns the query engine that was
+        used, so the answers can be synthesized against the same index, and the
+        retrieved nodes per query.
+        """
+        query_engine = self._current_query_engine()
+        with span("batch_query_embedding"):
+            if hasattr(self._embed_model, "get_query_embedding_batch"):
+                embeddings = self._embed_model.get_query_embedding_batch(queries)
+            else:
+                embeddings = [self._embed_model.get_query_embedding(query) for query in queries]
+        results = []
+        with span("batch_retrieval"):
+            for query, embedding in zip(queries, embeddings):
+                results.append(query_engine.retrieve(QueryBundle(query, embedding=embedding)))
+        return query_engine, results
+
+    def stats(self) -> dict:
+        """Return construction vs query timing counters."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_query_seconds"] = (
+            stats["query_seconds_total"] / stats["queries"] if stats["queries"] else 0.0
+        )
+        stats["avg_retrieval_seconds"] = (
+            stats["retrieval_seconds_total"] / stats["retrievals"] if stats["retrievals"] else 0.0
+        )
+        stats["store_version"] = self._store_version
+        if hasattr(self._embed_model, "stats"):
+            stats["embedding_cache"] = self._embed_model.stats()
+        if self._retriever is not None:
+            stats["hybrid"] = self._retriever.stats()
+        return stats
+
+
+_engine: Optional[RetrievalEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_retrieval_engine() -> RetrievalEngine:
+    """Return the process-wide retrieval engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RetrievalEngine()
+    return _engine
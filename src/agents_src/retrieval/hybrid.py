@@ -0,0 +1,103 @@
+import copy
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from src.rag_doc_ingestion.sparse_index import SparseIndex
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fuses dense (vector) and sparse (BM25) retrieval.
+
+    Both retrievers return `candidate_k` hits. Each result list is scaled by its best
+    score, and a chunk's fused score is the weighted sum of its scaled dense and sparse
+    scores. Chunks found only by the sparse index are loaded from the vector store.
+    """
+
+    def __init__(
+        self,
+        vector_retriever: BaseRetriever,
+        vector_store,
+        sparse_index: SparseIndex,
+        similarity_top_k: int = 3,
+        candidate_k: int = 10,
+        dense_weight: float = 0.5,
+        sparse_weight: float = 0.5,
+    ):
+        super().__init__()
+        self._vector_retriever = vector_retriever
+        self._vector_store = vector_store
+        self._sparse_index = sparse_index
+        self._similarity_top_k = similarity_top_k
+        self._candidate_k = candidate_k
+        self._dense_weight = dense_weight
+        self._sparse_weight = sparse_weight
+        self._paper_ids: Optional[List[str]] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"queries": 0, "sparse_seconds_total": 0.0, "sparse_only_hits": 0}
+
+    def scoped(self, vector_retriever: BaseRetriever, paper_ids: Sequence[str]) -> "HybridRetriever":
+        """
+        A retriever restricted to `paper_ids`, sharing this one's settings and stats.
+
+        `vector_retriever` must already filter on the same papers.
+        """
+        retriever = copy.copy(self)
+        retriever._vector_retriever = vector_retriever
+        retriever._paper_ids = list(paper_ids)
+        return retriever
+
+    @staticmethod
+    def _scaled(scores: Dict[str, float]) -> Dict[str, float]:
+        best = max(scores.values(), default=0.0)
+        return {node_id: score / best for node_id, score in scores.items()} if best > 0 else {}
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        dense = self._vector_retriever.retrieve(query_bundle)
+
+        start = time.perf_counter()
+        sparse = self._sparse_index.search(
+            query_bundle.query_str, top_k=self._candidate_k, paper_ids=self._paper_ids
+        )
+        sparse_seconds = time.perf_counter() - start
+
+        nodes = {hit.node.node_id: hit.node for hit in dense}
+        dense_scores = self._scaled({hit.node.node_id: hit.score or 0.0 for hit in dense})
+        sparse_scores = self._scaled(dict(sparse))
+        fused = {
+            node_id: self._dense_weight * dense_scores.get(node_id, 0.0)
+            + self._sparse_weight * sparse_scores.get(node_id, 0.0)
+            for node_id in set(nodes) | set(sparse_scores)
+        }
+        top = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:self._similarity_top_k]
+
+        missing = [node_id for node_id, _ in top if node_id not in nodes]
+        if missing:
+            for node in self._vector_store.get_nodes(node_ids=missing):
+                nodes[node.node_id] = node
+
+        with self._stats_lock:
+            self._stats["queries"] += 1
+            self._stats["sparse_seconds_total"] += sparse_seconds
+            self._stats["sparse_only_hits"] += len(missing)
+        logger.info(
+            f"Hybrid retrieval: {len(dense)} dense, {len(sparse)} sparse candidates, "
+            f"{len(missing)} sparse-only in top {len(top)}; sparse lookup {sparse_seconds * 1000:.2f}ms"
+        )
+        return [NodeWithScore(node=nodes[node_id], score=score) for node_id, score in top if node_id in nodes]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_sparse_ms"] = (
+            stats["sparse_seconds_total"] * 1000 / stats["queries"] if stats["queries"] else 0.0
+        )
+        return stats
@@ -0,0 +1,71 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, List, Optional
+
+
+class RetrievalScope:
+    """
+    The papers (by paper_id) a conversation has touched.
+
+    Set for a crew run with `retrieval_scope`; the paper fetch tool adds the papers it
+    finds, and retrieval in the same run is restricted to them. `used_global` records
+    that a scoped search fell back to the whole corpus.
+    """
+
+    def __init__(self, paper_ids: Iterable[str] = ()):
+        self._paper_ids = list(dict.fromkeys(paper_ids))
+        self._lock = threading.Lock()
+        self.used_global = False
+
+    def add(self, paper_ids: Iterable[str]) -> None:
+        with self._lock:
+            for paper_id in paper_ids:
+                if paper_id not in self._paper_ids:
+                    self._paper_ids.append(paper_id)
+
+    @property
+    def paper_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._paper_ids)
+
+
+# Scope of the crew run in the current context (set per request by the backend).
+_scope: ContextVar[Optional[RetrievalScope]] = ContextVar("retrieval_scope", default=None)
+
+
+@contextmanager
+def retrieval_scope(scope: Optional[RetrievalScope] = None):
+    """Restrict retrieval in this context to the scope's papers (an empty scope means global)."""
+    scope = scope if scope is not None else RetrievalScope()
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def scope_paper_ids() -> List[str]:
+    """Paper ids of the current scope; empty when retrieval is global."""
+    scope = _scope.get()
+    return scope.paper_ids if scope is not None else []
+
+
+def add_scope_papers(paper_ids: Iterable[str]) -> None:
+    """Record papers the current conversation touched, if a scope is active."""
+    scope = _scope.get()
+    if scope is not None:
+        scope.add(paper_ids)
+
+
+def note_global_retrieval() -> None:
+    """Record that retrieval in the current scope searched the whole corpus."""
+    scope = _scope.get()
+    if scope is not None:
+        scope.used_global = True
+
+
+def used_global_retrieval() -> bool:
+    """Whether retrieval in the current scope searched the whole corpus."""
+    scope = _scope.get()
+    return scope is not None and scope.used_global
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List
 
 from src.agents_src.agents.check_intent_agent import intent_agent
+from src.agents_src.progress import emit_progress
 
 class ChatMessage(BaseModel):
     role: str
@@ -20,6 +21,12 @@ class IntentOutput(BaseModel):
     chat_history: List[ChatMessage]
 
 
+def _report_intent(output) -> None:
+    intent = output.pydantic
+    if intent is not None:
+        emit_progress("intent_decided", fetch=intent.fetch, use_rag=intent.use_rag, papers=intent.papers)
+
+
 intent_task = Task(
     agent=intent_agent,
     name="Check Intent Task",
@@ -51,6 +58,7 @@ intent_task = Task(
     }
     """,
     output_pydantic=IntentOutput,
+    callback=_report_intent,
 )
 
 if __name__ == "__main__":
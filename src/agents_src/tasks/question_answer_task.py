@@ -22,10 +22,7 @@ class IntentOutput(BaseModel):
     user_query: str
     chat_history: List[ChatMessage]
 
-qa_task = Task(
-    agent=qa_agent,
-    name="Question Answering Task",
-    description="""
+QA_TASK_DESCRIPTION = """
     Answer the user query "{user_query}" using a Retrieval-Augmented Generation (RAG) pipeline.
     chat_history: "{chat_history}" only if "use_rag" is true. 
     Use "papers" as metadata if it is not None or empty to append to your answer that these documents have been fetched.
@@ -35,13 +32,16 @@ qa_task = Task(
     - Then retrieve relevant context from the document store using the RAG retriever tool only if use_rag is true and user_query contains a question.
     - Use the chat history if use_rag is true to provide context in your answer.
     - If use_rag is false, just respond by specifying the list of papers fetched in natural tone.
+    - Papers fetched in this turn may still be queued for ingestion and not searchable yet. If retrieval finds
+      nothing from a just-fetched paper, say that it is still being ingested and can be asked about shortly.
     - Prioritize evidence that directly addresses the query
     - Synthesize a clear, accurate answer grounded in the retrieved sources or chat history
     - If the query cannot be answered from the knowledge source or chat history, do not generate your own response.
       Instead, state clearly that the knowledge source does not contain the required information.
     - Provide transparency by including references, tool usage, and reasoning steps
-    """,
-    expected_output="""
+    """
+
+QA_TASK_EXPECTED_OUTPUT = """
     A structured JSON object with the following fields:
     {
       "answer": "Direct response to the query (1–3 paragraphs, clear and accurate). 
@@ -50,7 +50,26 @@ qa_task = Task(
       "tool_used": "Name of the retrieval/analysis tool invoked (e.g., RAG Retriever, VectorDB, ChatHistory, etc.)",
       "rationale": "Brief explanation of why this answer was chosen, or why no relevant information was found"
     }
+    """
+
+qa_task = Task(
+    agent=qa_agent,
+    name="Question Answering Task",
+    description=QA_TASK_DESCRIPTION,
+    expected_output=QA_TASK_EXPECTED_OUTPUT,
+    output_pydantic=AnswerStructure,
+    input_pydantic=IntentOutput
+)
+
+# Used when the local intent router already decided the intent, so there is no
+# Check Intent Task output in context; the decision is passed in as inputs instead.
+routed_qa_task = Task(
+    agent=qa_agent,
+    name="Routed Question Answering Task",
+    description=QA_TASK_DESCRIPTION + """
+    The user's intent has already been decided: fetch: {fetch}, use_rag: {use_rag}, papers: {papers}.
     """,
+    expected_output=QA_TASK_EXPECTED_OUTPUT,
     output_pydantic=AnswerStructure,
     input_pydantic=IntentOutput
 )
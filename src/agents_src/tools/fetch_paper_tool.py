@@ -2,20 +2,27 @@ import logging
 
 from crewai.tools import tool
 from pydantic import BaseModel
-import chromadb
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, StorageContext
-from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.vector_stores.chroma import ChromaVectorStore
-import fitz  # PyMuPDF
 import os
-from typing import List, Optional
-from llama_index.core import Document
+import threading
+from typing import Callable, List, Optional, Tuple
 
 import arxiv
-from pathlib import Path
 
+from src.agents_src.progress import emit_progress
+from src.agents_src.retrieval.scope import add_scope_papers
+from src.observability.metrics import span
 from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.dedup import get_dedup_index
+from src.rag_doc_ingestion.downloader import PaperDownloader
+from src.rag_doc_ingestion.embeddings import get_embed_model
+from src.rag_doc_ingestion.jobs import IngestionJob, get_job_queue
+from src.rag_doc_ingestion.paper_registry import PaperRegistry, parse_short_id
+from src.rag_doc_ingestion.pdf_extraction import iter_pdf_documents
+from src.rag_doc_ingestion.pipeline import IngestionPipeline
+from src.rag_doc_ingestion.sparse_index import get_sparse_index
+from src.rag_doc_ingestion.store_version import bump_store_version, read_store_version, written_by_this_process
+from src.rag_doc_ingestion.vector_store import get_vector_store
+from src.rag_doc_ingestion.writer_lock import store_writer_lock
 
 
 # Set up logging configuration
@@ -30,6 +37,13 @@ logger = logging.getLogger(__name__)
 # Load settings from environment variables
 settings = DocIngestionSettings()
 
+_ARXIV_PDF_HOST = "https://arxiv.org"
+
+# one pooled downloader and one registry per process, created on first use
+_downloader: Optional[PaperDownloader] = None
+_registry: Optional[PaperRegistry] = None
+_shared_lock = threading.Lock()
+
 # def build_vector_store_from_documents():
 #     logger.info("Starting vector store ingestion process.")
 #     try:
@@ -65,89 +79,103 @@ settings = DocIngestionSettings()
 #         logger.error(f"Error during vector store build: {e}")
 #         return 1
 
-def _extract_text_from_pdf(path: str) -> str:
-    """Extract text from a single PDF using PyMuPDF (fitz)."""
-    text_chunks = []
-    try:
-        doc = fitz.open(path)
-        for page in doc:
-            text = page.get_text("text")
-            if text:
-                text_chunks.append(text)
-        doc.close()
-    except Exception as e:
-        logger.exception(f"Failed to extract text from {path}: {e}")
-    return "\n".join(text_chunks)
-
-
-def build_vector_store_from_documents(pdf_paths: Optional[List[str]] = None) -> int:
+def get_downloader() -> PaperDownloader:
+    """Return the process-wide PDF downloader."""
+    global _downloader
+    if _downloader is None:
+        with _shared_lock:
+            if _downloader is None:
+                _downloader = PaperDownloader(
+                    max_workers=settings.DOWNLOAD_WORKERS,
+                    per_host_limit=settings.DOWNLOAD_PER_HOST_LIMIT,
+                    retries=settings.DOWNLOAD_RETRIES,
+                    timeout=settings.DOWNLOAD_TIMEOUT_SECONDS,
+                )
+    return _downloader
+
+
+def get_paper_registry() -> PaperRegistry:
+    """Return the process-wide registry of ingested arXiv papers."""
+    global _registry
+    if _registry is None:
+        with _shared_lock:
+            if _registry is None:
+                path = settings.PAPER_REGISTRY_PATH or os.path.join(
+                    settings.VECTOR_STORE_DIR, "paper_registry.sqlite3"
+                )
+                _registry = PaperRegistry(path)
+    return _registry
+
+
+def _pdf_url(paper: arxiv.Result) -> str:
+    """The paper's PDF link, pointed at ARXIV_PDF_BASE_URL when configured."""
+    url = paper.pdf_url
+    if settings.ARXIV_PDF_BASE_URL and url.startswith(_ARXIV_PDF_HOST):
+        url = settings.ARXIV_PDF_BASE_URL.rstrip("/") + url[len(_ARXIV_PDF_HOST):]
+    return url
+
+
+def build_vector_store_from_documents(
+    pdf_paths: Optional[List[str]] = None,
+    pdf_blobs: Optional[List[Tuple[str, bytes, dict]]] = None,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> int:
     """
-    Build a persistent Chroma vector store index.
+    Build a persistent vector store index (VECTOR_BACKEND: Chroma or the numpy store).
 
-    If `pdf_paths` is provided (list of absolute/relative PDF file paths),
-    those PDFs are read and converted into Documents. Otherwise, the function
-    falls back to reading documents from settings.DOCUMENTS_DIR using
-    SimpleDirectoryReader (existing behaviour).
+    PDFs can be given as file paths (`pdf_paths`, deleted after ingestion) or as
+    in-memory (name, bytes, metadata) triples (`pdf_blobs`, never written to disk). Pages are
+    extracted in the PDF extraction process pool and streamed through the ingestion
+    pipeline (extract -> chunk -> embed -> upsert), so chunk metadata carries the
+    page number and memory stays flat however many papers are fetched.
     """
     logger.info("Starting vector store ingestion process.")
     try:
-        docs_dir_path = settings.DOCUMENTS_DIR
         vector_store_path = settings.VECTOR_STORE_DIR
-        collection_name = settings.COLLECTION_NAME
-
-        documents = []
-        if pdf_paths:
-            logger.info(f"Loading {len(pdf_paths)} PDF files from provided list.")
-            for p in pdf_paths:
-                p = os.path.expanduser(p)
-                if not os.path.isfile(p):
-                    logger.warning(f"PDF path not found or not a file: {p}")
-                    continue
-                text = _extract_text_from_pdf(p)
-                if not text.strip():
-                    logger.warning(f"No text extracted from PDF: {p}")
-                    continue
-                # create a llama_index Document (keep metadata)
-                doc = Document(text=text, metadata={"source": p, "filename": os.path.basename(p)})
-                documents.append(doc)
-            if not documents:
-                logger.error("No valid documents were created from provided PDF paths.")
+
+        sources = []
+        for p in pdf_paths or []:
+            p = os.path.expanduser(p)
+            if not os.path.isfile(p):
+                logger.warning(f"PDF path not found or not a file: {p}")
+                continue
+            name = os.path.basename(p)
+            sources.append((p, {"source": p, "filename": name, "file_name": name, "paper_id": name}))
+        for name, content, metadata in pdf_blobs or []:
+            sources.append((content, {"source": name, "filename": name, "file_name": name, **metadata}))
+        if not sources:
+            logger.error("No valid PDFs were provided.")
+            return 1
+        logger.info(f"Ingesting {len(sources)} PDFs.")
+
+        # shared embedding model; previously embedded chunks come from the embedding cache
+        embed_model = get_embed_model()
+
+        # one writer at a time across workers and replicas sharing VECTOR_STORE_DIR
+        with store_writer_lock(vector_store_path, timeout=settings.STORE_WRITE_LOCK_TIMEOUT_SECONDS):
+            # reopen storage if another worker wrote since this process last did
+            current_version = read_store_version(vector_store_path)
+            vector_store = get_vector_store(
+                settings, fresh=bool(current_version) and not written_by_this_process(current_version)
+            )
+
+            pipeline = IngestionPipeline(
+                vector_store=vector_store,
+                embed_model=embed_model,
+                on_upsert=get_sparse_index().add_nodes,
+                on_progress=on_progress,
+                dedup_index=get_dedup_index() if settings.DEDUP_ENABLED else None,
+            )
+            report = pipeline.run(iter_pdf_documents(sources))
+            if not report["upserts"] and not report.get("embeddings_saved"):
+                logger.error("No text could be extracted from the provided PDFs.")
                 return 1
-        # else:
-        #     logger.info(f"Loading documents from directory: {docs_dir_path}")
-        #     loader = SimpleDirectoryReader(input_dir=docs_dir_path)
-        #     documents = loader.load_data()
-
-        # Create parser with chunking strategy
-        parser = SimpleNodeParser.from_defaults(chunk_size=1024, chunk_overlap=50)
-        logger.info("Parsing documents into nodes.")
-        nodes = parser.get_nodes_from_documents(documents)
-        logger.info(f"Parsed {len(nodes)} nodes.")
-
-        # download & load embedding model
-        logger.info("Loading HuggingFace embedding model...")
-        embed_model = HuggingFaceEmbedding()
-
-        logger.info(f"Initializing ChromaDB persistent client at: {vector_store_path}")
-        db = chromadb.PersistentClient(path=vector_store_path)
-        chroma_collection = db.get_or_create_collection(name=collection_name)
-
-        logger.info(f"Creating Chroma vector store with collection name: {collection_name}")
-        vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-
-        # Create storage context and index
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
-        logger.info("Building vector store index.")
-        index = VectorStoreIndex(
-            nodes,
-            storage_context=storage_context,
-            vector_store=vector_store,
-            embed_model=embed_model
-        )
+            paper_ids = [metadata["paper_id"] for _, metadata in sources if metadata.get("paper_id")]
+            bump_store_version(vector_store_path, paper_ids=paper_ids)
 
         logger.info("Vector store built successfully.")
 
-        for pdf_path in pdf_paths:
+        for pdf_path in pdf_paths or []:
             try:
                 if os.path.exists(pdf_path):
                     os.remove(pdf_path)
@@ -163,7 +191,145 @@ def build_vector_store_from_documents(pdf_paths: Optional[List[str]] = None) ->
 
 class IntentUse(BaseModel):
     title: str  
-    category: str = "cs.AI"  # Default category
+    category: Optional[str] = "cs.AI"  # Default category; None searches all categories
+
+
+def search_papers(intent: IntentUse) -> List[arxiv.Result]:
+    """Return the top arXiv matches for the intent's title and category."""
+    logger.info(f"Fetching papers with title: {intent.title} and category: {intent.category or 'any'}")
+
+    # Exact title + category search (title-only)
+    query = f'ti:"{intent.title}"'
+    if intent.category:
+        query += f" AND cat:{intent.category}"
+
+    search = arxiv.Search(
+        query=query,
+        max_results=3,
+        sort_by=arxiv.SortCriterion.Relevance,
+    )
+    client = arxiv.Client()
+    if settings.ARXIV_API_URL:
+        client.query_url_format = settings.ARXIV_API_URL.rstrip("?") + "?{}"
+    with span("arxiv_search"):
+        return list(client.results(search))
+
+
+def download_and_ingest(papers: List[arxiv.Result], job: Optional[IngestionJob] = None) -> dict:
+    """
+    Download the papers' PDFs into memory and ingest them into the vector store.
+
+    Papers whose arXiv id and version are already in the paper registry are skipped;
+    the rest are downloaded concurrently over the pooled session. Papers whose download
+    fails are reported under `failed` and left out of `papers`, so fetching them again
+    retries them.
+    """
+    registry = get_paper_registry()
+    pending = []
+    skipped = []
+    failed = []
+    for paper in papers:
+        arxiv_id, version = parse_short_id(paper.get_short_id())
+        if registry.is_ingested(arxiv_id, version):
+            skipped.append(paper.title)
+        else:
+            pending.append((paper, arxiv_id, version))
+    if skipped:
+        logger.info(f"Already ingested, skipping: {skipped}")
+
+    if pending:
+        if job is not None:
+            job.update_progress(stage="downloading", total_papers=len(papers), skipped=len(skipped))
+        logger.info(f"Downloading {len(pending)} papers: {[paper.title for paper, _, _ in pending]}")
+        with span("pdf_download"):
+            contents = get_downloader().download_many([_pdf_url(paper) for paper, _, _ in pending])
+
+        # keep the PDFs in memory; the extraction pool opens them straight from bytes
+        pdf_blobs = []
+        downloaded = []
+        for (paper, arxiv_id, version), content in zip(pending, contents):
+            if isinstance(content, Exception):
+                logger.warning(f"Download failed for '{paper.title}': {content}")
+                failed.append(paper.title)
+                continue
+            metadata = {"arxiv_id": arxiv_id, "arxiv_version": version, "title": paper.title, "paper_id": arxiv_id}
+            pdf_blobs.append((f"{paper.title}.pdf", content, metadata))
+            downloaded.append((paper, arxiv_id, version))
+        if job is not None and failed:
+            job.update_progress(failed=failed)
+        if not pdf_blobs:
+            raise RuntimeError(f"None of the fetched papers could be downloaded: {failed}")
+
+        if job is not None:
+            job.update_progress(stage="ingesting", downloaded=len(pdf_blobs))
+        on_progress = (lambda counts: job.update_progress(**counts)) if job is not None else None
+        with store_writer_lock(settings.VECTOR_STORE_DIR, timeout=settings.STORE_WRITE_LOCK_TIMEOUT_SECONDS):
+            # another worker may have ingested the same papers while these downloaded
+            fresh = [
+                (entry, blob) for entry, blob in zip(downloaded, pdf_blobs)
+                if not registry.is_ingested(entry[1], entry[2])
+            ]
+            if fresh:
+                downloaded, pdf_blobs = [list(items) for items in zip(*fresh)]
+                with span("paper_ingest"):
+                    if build_vector_store_from_documents(pdf_blobs=pdf_blobs, on_progress=on_progress) != 0:
+                        raise RuntimeError("Vector store build failed for the fetched papers.")
+                for paper, arxiv_id, version in downloaded:
+                    registry.mark_ingested(arxiv_id, version, paper.title, paper.pdf_url)
+            else:
+                logger.info("Fetched papers were ingested by another worker meanwhile.")
+
+    if job is not None:
+        job.update_progress(stage="done")
+    return {"papers": [paper.title for paper in papers if paper.title not in failed], "skipped": skipped,
+            "failed": failed}
+
+
+def submit_fetch_job(papers: List[arxiv.Result]) -> IngestionJob:
+    """Queue a background download-and-ingest job; jobs for the same papers are collapsed."""
+    key = ",".join(sorted(paper.get_short_id() for paper in papers))
+    return get_job_queue().submit(
+        key,
+        lambda job: download_and_ingest(papers, job),
+        description=f"Fetch and ingest: {'; '.join(paper.title for paper in papers)}",
+    )
+
+
+def fetch_papers(intent: IntentUse):
+    """
+    Search arXiv for the intent and ingest the matches.
+
+    Returns None when nothing matched, the list of paper titles when ingestion ran
+    inline, or a dict with the titles and the ingestion job id when it was queued
+    (BACKGROUND_INGESTION). When some inline downloads failed, a dict with the
+    ingested `papers` and the `failed` titles.
+    """
+    results = search_papers(intent)
+    if not results:
+        return None  # no match
+    response = [paper.title for paper in results]
+    # later retrieval in this conversation is scoped to these papers
+    add_scope_papers(parse_short_id(paper.get_short_id())[0] for paper in results)
+
+    if settings.BACKGROUND_INGESTION:
+        job = submit_fetch_job(results)
+        logger.info(f"Fetch queued as ingestion job {job.id}: {response}")
+        emit_progress("paper_fetched", papers=response, job_id=job.id)
+        return {"papers": response, "ingestion_job_id": job.id, "status": job.get_status()}
+
+    result = download_and_ingest(results)
+    response = result["papers"]
+    log_response = {
+        "status": "partially_failed" if result["failed"] else "success",
+        "fetched_papers": response,
+        "failed_papers": result["failed"],
+    } 
+    logger.info(f"Fetch response: {log_response}")
+    emit_progress("paper_fetched", papers=response, failed=result["failed"])
+    if result["failed"]:
+        return {"papers": response, "failed": result["failed"]}
+    return response
+
 
 @tool
 def fetch_paper_tool(intent: IntentUse) -> dict:
@@ -177,6 +343,12 @@ def fetch_paper_tool(intent: IntentUse) -> dict:
 
     Returns:
         list: A list of fetched papers with their titles and links.
+              When background ingestion is enabled, a dict with the paper titles and
+              status 'queued': the papers are still being downloaded and indexed and
+              are NOT searchable yet, so questions about them cannot be answered in
+              this turn.
+              When some downloads failed, a dict with the fetched 'papers' and the
+              'failed' titles, which were not fetched and can be requested again.
 
     Notes:
         - Requires proper title and category of the paper to query.
@@ -185,34 +357,12 @@ def fetch_paper_tool(intent: IntentUse) -> dict:
     if isinstance(intent, dict):
         intent = IntentUse(**intent)
 
-    logger.info(f"Fetching papers with title: {intent.title} and category: {intent.category}")
-
-    # Exact title + category search (title-only)
-    query = f'ti:"{intent.title}" AND cat:{intent.category}'
-
-    search = arxiv.Search(
-        query=query,
-        max_results=3,
-        sort_by=arxiv.SortCriterion.Relevance,
-    )
-
-    results = list(search.results())
-    if not results:
-        return None  # no match
-    docs_dir_path = settings.DOCUMENTS_DIR
-    Path(docs_dir_path).mkdir(exist_ok=True)
-    response=[]
-    for paper in results:
-        logger.info(f"Downloading: {paper.title}")
-        paper.download_pdf(dirpath=docs_dir_path, filename=f"{paper.title}.pdf")
-        response.append(paper.title)
-    log_response = {
-        "status": "success",
-        "fetched_papers": response
-    } 
-    logger.info(f"Fetch response: {log_response}")
-    build_vector_store_from_documents(pdf_paths=[os.path.join(docs_dir_path, f"{paper.title}.pdf") for paper in results])
-    return response
+    result = fetch_papers(intent)
+    if isinstance(result, dict) and "ingestion_job_id" in result:
+        # the job id and whether the job already started differ between runs; clients get
+        # them from the paper_fetched progress event, the agent only sees a stable result
+        return {"papers": result["papers"], "status": "queued"}
+    return result
 
 
 
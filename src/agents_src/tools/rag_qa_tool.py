@@ -1,71 +1,77 @@
 import logging
+import time
 
 from crewai.tools import tool
-from llama_index.core import VectorStoreIndex, StorageContext
-from llama_index.vector_stores.chroma import ChromaVectorStore
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.llms.groq import Groq
-from llama_index.core import Settings
-import chromadb
 
 from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.progress import emit_progress
+from src.agents_src.retrieval.context import estimate_tokens, pack_chunks
+from src.agents_src.retrieval.engine import get_retrieval_engine
+from src.observability.metrics import record_context_tokens, span
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
 
-# download & load embedding model
-logger.info("Loading HuggingFace embedding model...")
-embed_model = HuggingFaceEmbedding()
+
+def _retrieve_chunks(query: str, token_budget: int) -> dict:
+    nodes = get_retrieval_engine().retrieve(query)
+    chunks, dropped = pack_chunks(nodes, token_budget)
+    return {
+        "chunks": chunks,
+        "source_files": list(dict.fromkeys(c["file_name"] for c in chunks if c.get("file_name"))),
+        "context_tokens": sum(estimate_tokens(c["text"]) for c in chunks),
+        "dropped_chunks": dropped,
+    }
+
+
+def _synthesize_answer(query: str) -> dict:
+    response = get_retrieval_engine().query(query)
+    source_file_names = {m.get("file_name") for m in getattr(response, "metadata", {}).values()}
+    return {"answer": response.response,
+            # sorted: set order changes between processes and the result goes into the prompt
+            "source_files": sorted(name for name in source_file_names if name),
+            "context_tokens": estimate_tokens(response.response)}
 
 
 @tool
 def rag_query_tool(query: str) -> dict:
     """
-    Answers a query by retrieving relevant documents and generating a response.
-    Returns both the generated answer and the source file names from which the information was retrieved.
+    Answers a query by retrieving relevant documents from the document store.
+    Depending on configuration it returns either a generated answer or the ranked document
+    chunks to answer from, always with the source file names.
 
     Args:
         query (str): The input query string to be processed.
 
     Returns:
         dict: A dictionary with the following keys:
-            - 'answer': The generated answer string.
+            - 'answer': The generated answer string (answer mode only).
+            - 'chunks': Ranked chunks, best first, each with 'rank', 'score', 'text' and its
+              source ('file_name', 'page_label', 'title'); write the answer from these
+              and cite them (retrieval mode only).
             - 'source_files': List of source file names used for retrieval.
 
     Notes:
         - Requires properly configured AgentSettings and access to the vector store.
-        - The function loads the embedding model and LLM each time it is called.
+        - The embedding model, LLM and index are owned by a process-wide RetrievalEngine
+          and are only rebuilt when the vector store changes.
+        - RAG_TOOL_MODE="retrieval" skips the nested LLM call and trims the chunks to
+          RAG_TOOL_CONTEXT_TOKENS.
     """
-
     settings = AgentSettings()
-    vector_store_path = settings.VECTOR_STORE_DIR
-    collection_name = settings.COLLECTION_NAME
-    # Configure LLM
-    Settings.llm = Groq(
-        model=settings.MODEL_NAME,
-        temperature=settings.MODEL_TEMPERATURE,
-        api_key=settings.GROQ_API_KEY,
-    )
-    # Load Chroma collection
-    db = chromadb.PersistentClient(path=vector_store_path)
-    chroma_collection = db.get_or_create_collection(collection_name)
-    # connect to the vector store
-    vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-    storage_context = StorageContext.from_defaults(vector_store=vector_store)
-    # Load index from Chroma
-    index = VectorStoreIndex.from_vector_store(
-        vector_store=vector_store,
-        storage_context=storage_context,
-        embed_model=embed_model
-    )
-    # Create the query engine
-    query_engine = index.as_query_engine(similarity_top_k=3)
-    # Pass the query to the query engine
-    response = query_engine.query(query)
-    source_file_names = {m.get("file_name") for m in getattr(response, "metadata", {}).values()}
-
-    return {"answer": response.response,
-            "source_files": list(source_file_names)}
+    mode = "retrieval" if settings.RAG_TOOL_MODE == "retrieval" else "synthesize"
+    start = time.perf_counter()
+    with span(f"rag_tool_{mode}"):
+        if mode == "retrieval":
+            result = _retrieve_chunks(query, settings.RAG_TOOL_CONTEXT_TOKENS)
+        else:
+            result = _synthesize_answer(query)
+    # the latency stays out of the result: the agent would carry it into its next prompt
+    latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    record_context_tokens(mode, result.pop("context_tokens"))
+    emit_progress("retrieval_done", source_files=result["source_files"])
+    logger.info(f"rag_query_tool ({mode}) returned in {latency_ms}ms")
+    return result
 
 
 # For direct testing, uncomment the code below and comment out @tool.
@@ -1,28 +1,141 @@
+import json
 import logging
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
-from src.backend_src.services.chat import get_answer
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from src.agents_src.config.agent_settings import AgentSettings
+from src.backend_src.services.chat import (
+    aget_answer, aget_session_answer, answer_cache, session_store, stream_answer, stream_session_answer,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# a batch may ask for at most this many times BATCH_MAX_CONCURRENCY synthesis threads
+_MAX_CONCURRENCY_FACTOR = 4
+
 class ChatMessage(BaseModel):
     role: str
     content: str
 
 class ChatHistoryRequest(BaseModel):
     chat_history: List[ChatMessage]
+    use_cache: bool = True  # set to False to bypass the answer cache for this request
+    include_timings: bool = False  # set to True to get the per-stage latency breakdown
+
+class SessionMessageRequest(BaseModel):
+    message: str
+    use_cache: bool = True
+    include_timings: bool = False
+
+class BatchQuestionsRequest(BaseModel):
+    questions: List[str]
+    max_concurrency: Optional[int] = Field(default=None, gt=0)  # defaults to BATCH_MAX_CONCURRENCY
+
+def _get_session(session_id: str):
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return session
 
 @router.post("/chat/answer")
-def chat_answer(request: ChatHistoryRequest):
+async def chat_answer(request: ChatHistoryRequest):
     logger.info(f"Received API request with chat_history: {request.chat_history}")
     try:
         chat_history = [msg.dict() for msg in request.chat_history]
-        result = get_answer(chat_history)
+        result = await aget_answer(chat_history, request.use_cache, request.include_timings)
         logger.info(f"API response: {result}")
         return result
     except Exception as e:
         logger.error(f"Error in chat_answer: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/answer/stream")
+async def chat_answer_stream(request: ChatHistoryRequest):
+    logger.info(f"Received streaming API request with chat_history: {request.chat_history}")
+    chat_history = [msg.dict() for msg in request.chat_history]
+    return StreamingResponse(
+        stream_answer(chat_history, request.use_cache, request.include_timings),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/chat/batch")
+def chat_batch(request: BatchQuestionsRequest):
+    """Answer many questions without crew runs; results stream back as JSON lines as they finish."""
+    from src.agents_src.retrieval.batch import answer_batch
+
+    settings = AgentSettings()
+    max_questions = settings.BATCH_MAX_QUESTIONS
+    if len(request.questions) > max_questions:
+        raise HTTPException(status_code=400, detail=f"At most {max_questions} questions per batch")
+    # checked before the response starts; answer_batch would only fail mid-stream
+    max_concurrency = settings.BATCH_MAX_CONCURRENCY * _MAX_CONCURRENCY_FACTOR
+    if request.max_concurrency is not None and request.max_concurrency > max_concurrency:
+        raise HTTPException(status_code=400, detail=f"max_concurrency must be at most {max_concurrency}")
+    logger.info(f"Received batch of {len(request.questions)} questions")
+    lines = (json.dumps(result) + "\n" for result in answer_batch(request.questions, request.max_concurrency))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@router.post("/chat/sessions")
+def create_chat_session():
+    return {"session_id": session_store.create().id}
+
+@router.get("/chat/sessions/stats")
+def chat_session_stats():
+    return session_store.stats()
+
+@router.get("/chat/sessions/{session_id}")
+def get_chat_session(session_id: str):
+    return _get_session(session_id).to_dict()
+
+@router.delete("/chat/sessions/{session_id}")
+def delete_chat_session(session_id: str):
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return {"status": "deleted"}
+
+@router.post("/chat/sessions/{session_id}/answer")
+async def chat_session_answer(session_id: str, request: SessionMessageRequest):
+    logger.info(f"Received session API request for {session_id}: {request.message}")
+    session = _get_session(session_id)
+    try:
+        result = await aget_session_answer(session, request.message, request.use_cache, request.include_timings)
+        logger.info(f"API response: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Error in chat_session_answer: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/sessions/{session_id}/answer/stream")
+async def chat_session_answer_stream(session_id: str, request: SessionMessageRequest):
+    logger.info(f"Received streaming session API request for {session_id}: {request.message}")
+    session = _get_session(session_id)
+    return StreamingResponse(
+        stream_session_answer(session, request.message, request.use_cache, request.include_timings),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/chat/cache/stats")
+def chat_cache_stats():
+    return answer_cache.stats()
+
+@router.delete("/chat/cache")
+def clear_chat_cache():
+    answer_cache.clear()
+    return {"status": "cleared"}
+
+@router.get("/chat/router/stats")
+def chat_router_stats():
+    from src.agents_src.intent_router import get_intent_router
+
+    return get_intent_router().stats()
+
+@router.get("/chat/llm_cache/stats")
+def chat_llm_cache_stats():
+    from src.agents_src.llm.llm_cache import get_llm_cache
+
+    return get_llm_cache().stats()
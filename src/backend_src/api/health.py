@@ -0,0 +1,24 @@
+import logging
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.backend_src.services.warmup import startup_report
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+def readyz():
+    """Readiness: models, index and crews are warm. 503 while warming up or if warm-up failed."""
+    report = startup_report.to_dict()
+    if not startup_report.ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
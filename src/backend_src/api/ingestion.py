@@ -0,0 +1,45 @@
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Optional
+
+from src.rag_doc_ingestion.jobs import JobQueueFull, QUEUED, RUNNING, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class FetchPapersRequest(BaseModel):
+    title: str
+    category: str = "cs.AI"
+
+
+@router.post("/ingest/jobs", status_code=202)
+def submit_ingestion_job(request: FetchPapersRequest):
+    # arxiv, PyMuPDF and the ingestion pipeline load on first use
+    from src.agents_src.tools.fetch_paper_tool import IntentUse, search_papers, submit_fetch_job
+
+    logger.info(f"Received ingestion request: {request}")
+    papers = search_papers(IntentUse(**request.dict()))
+    if not papers:
+        raise HTTPException(status_code=404, detail="No matching papers found on arXiv.")
+    try:
+        job = submit_fetch_job(papers)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
+
+
+@router.get("/ingest/jobs/{job_id}")
+def get_ingestion_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return job.to_dict()
+
+
+@router.get("/ingest/jobs")
+def list_ingestion_jobs(status: Optional[List[str]] = Query(default=None)):
+    # queued and running jobs unless specific statuses are requested
+    statuses = status or [QUEUED, RUNNING]
+    return [job.to_dict() for job in get_job_queue().list(statuses)]
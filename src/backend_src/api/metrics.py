@@ -0,0 +1,12 @@
+import logging
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.observability.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,13 @@
+import logging
+from fastapi import APIRouter
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/retrieval/stats")
+def retrieval_stats():
+    from src.agents_src.retrieval.engine import get_retrieval_engine
+
+    return get_retrieval_engine().stats()
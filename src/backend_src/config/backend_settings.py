@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -7,6 +9,25 @@ load_dotenv()
 class Settings(BaseSettings):
     API_HOST: str = "localhost"
     API_PORT: int = 8000
+    # Threads dedicated to crew runs, separate from the server's request threadpool
+    CREW_MAX_WORKERS: int = 8
+
+    # Load models, the index and the crews at startup; /readyz reports 503 until done
+    WARMUP_ENABLED: bool = True
+
+    # Semantic answer cache in front of the crew
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+
+    # Server-side chat sessions: history is compacted to a token budget, idle sessions evicted
+    SESSION_MAX_HISTORY_TOKENS: int = 2000
+    SESSION_SUMMARY_MAX_TOKENS: int = 400
+    SESSION_MIN_RECENT_MESSAGES: int = 2
+    SESSION_IDLE_TTL_SECONDS: int = 1800
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_STORE_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/chat_sessions.sqlite3
 
     class Config:
         env_file = ".env"
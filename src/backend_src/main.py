@@ -1,17 +1,41 @@
+import time
+
+_import_start = time.perf_counter()
+
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from src.backend_src.api.chat import router as chat_router
+from src.backend_src.api.health import router as health_router
+from src.backend_src.api.ingestion import router as ingestion_router
+from src.backend_src.api.metrics import router as metrics_router
+from src.backend_src.api.retrieval import router as retrieval_router
 from src.backend_src.config.backend_settings import Settings
+from src.backend_src.services.warmup import start_warmup, startup_report
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
 
-app = FastAPI()
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # crewai, llama_index and the models are loaded here, off the import path
+    start_warmup(settings.WARMUP_ENABLED)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(chat_router)
+app.include_router(ingestion_router)
+app.include_router(retrieval_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
-settings = Settings()
+startup_report.record_imports(time.perf_counter() - _import_start)
 
 if __name__ == "__main__":
     import uvicorn
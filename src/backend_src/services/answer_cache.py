@@ -0,0 +1,128 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def history_key(chat_history: list) -> str:
+    """Stable hash of the conversation an answer depends on."""
+    return hashlib.sha256(json.dumps(chat_history, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    def __init__(self, embedding: np.ndarray, context_key: str, corpus_version: str, answer: dict,
+                 paper_ids: frozenset):
+        self.embedding = embedding
+        self.context_key = context_key
+        self.corpus_version = corpus_version
+        self.answer = answer
+        self.paper_ids = paper_ids
+        self.created_at = time.time()
+
+
+class SemanticAnswerCache:
+    """
+    In-memory answer cache keyed by the query's embedding.
+
+    A lookup hits when an entry for the same conversation context and corpus version
+    has a query embedding with cosine similarity at or above `threshold`. Entries
+    older than `ttl_seconds` expire, and the least recently used entries are evicted
+    beyond `max_entries`.
+
+    Each entry records the papers its retrieval was scoped to. When the corpus version
+    moves on, `changed_papers(old_version, new_version)` names the papers ingestion
+    touched in between; entries scoped to other papers are kept for the new version.
+    Entries answered from the whole corpus (no scope), entries whose papers changed,
+    and every entry when the changes are unknown (`changed_papers` is unset or returns
+    None) are dropped.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000,
+                 changed_papers: Optional[Callable[[str, str], Optional[Set[str]]]] = None):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.changed_papers = changed_papers
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0,
+                       "revalidations": 0, "expirations": 0}
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _purge(self, corpus_version: str) -> None:
+        now = time.time()
+        changes = {}
+        for entry_id in list(self._entries):
+            entry = self._entries[entry_id]
+            if entry.corpus_version != corpus_version:
+                if entry.corpus_version not in changes:
+                    changes[entry.corpus_version] = (
+                        self.changed_papers(entry.corpus_version, corpus_version) if self.changed_papers else None
+                    )
+                changed = changes[entry.corpus_version]
+                if changed is None or not entry.paper_ids or changed & entry.paper_ids:
+                    del self._entries[entry_id]
+                    self._stats["invalidations"] += 1
+                    continue
+                entry.corpus_version = corpus_version
+                self._stats["revalidations"] += 1
+            if now - entry.created_at > self.ttl_seconds:
+                del self._entries[entry_id]
+                self._stats["expirations"] += 1
+
+    def lookup(self, embedding: List[float], context_key: str, corpus_version: str) -> Optional[dict]:
+        """Return a copy of the cached answer for a similar query, or None."""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._purge(corpus_version)
+            candidates = [(entry_id, entry) for entry_id, entry in self._entries.items()
+                          if entry.context_key == context_key]
+            if candidates:
+                similarities = np.stack([entry.embedding for _, entry in candidates]) @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self._stats["hits"] += 1
+                    logger.info(f"Answer cache hit (similarity {similarities[best]:.3f})")
+                    return copy.deepcopy(entry.answer)
+            self._stats["misses"] += 1
+        return None
+
+    def store(self, embedding: List[float], context_key: str, corpus_version: str, answer: dict,
+              paper_ids: Iterable[str] = ()) -> None:
+        """Cache `answer`; `paper_ids` are the papers its retrieval was scoped to (none means the whole corpus)."""
+        with self._lock:
+            self._entries[self._next_id] = _Entry(self._normalize(embedding), context_key, corpus_version,
+                                                  copy.deepcopy(answer), frozenset(paper_ids))
+            self._next_id += 1
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -1,10 +1,67 @@
+import asyncio
+import contextvars
+import json
 import logging
-from src.agents_src.crew import qa_crew
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Optional
+
+from src.agents_src.config.agent_settings import AgentSettings
+from src.agents_src.progress import emit_progress, progress_listener
+from src.agents_src.retrieval.scope import (
+    RetrievalScope, add_scope_papers, retrieval_scope, scope_paper_ids, used_global_retrieval,
+)
+from src.backend_src.config.backend_settings import Settings
+from src.backend_src.services.answer_cache import SemanticAnswerCache, history_key
+from src.backend_src.services.sessions import ChatSession, SessionStore
+from src.observability.metrics import (
+    CACHE_LOOKUPS, CHAT_REQUESTS, CHAT_SECONDS, record_token_usage, request_timings, span,
+)
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.store_version import StoreVersionWatcher, changed_papers
 
 logger = logging.getLogger(__name__)
 
+settings = Settings()
+
+# Crew runs block for the length of two LLM agents (and possibly a paper fetch), so they
+# get their own threads instead of occupying the server's request threadpool.
+crew_executor = ThreadPoolExecutor(max_workers=settings.CREW_MAX_WORKERS, thread_name_prefix="crew")
+
+# answers are cached per corpus version; checked at most every STORE_VERSION_CHECK_SECONDS
+vector_store_dir = DocIngestionSettings().VECTOR_STORE_DIR
+store_version_watcher = StoreVersionWatcher(vector_store_dir, interval=AgentSettings().STORE_VERSION_CHECK_SECONDS)
+
+answer_cache = SemanticAnswerCache(
+    threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    # entries scoped to papers an ingestion did not touch stay valid
+    changed_papers=lambda since, version: changed_papers(vector_store_dir, since, version),
+)
+
+# sessions live in SQLite next to the vector store, so every worker sees them
+session_store = SessionStore(
+    path=settings.SESSION_STORE_PATH or os.path.join(vector_store_dir, "chat_sessions.sqlite3"),
+    max_history_tokens=settings.SESSION_MAX_HISTORY_TOKENS,
+    summary_max_tokens=settings.SESSION_SUMMARY_MAX_TOKENS,
+    min_recent_messages=settings.SESSION_MIN_RECENT_MESSAGES,
+    idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+    max_sessions=settings.SESSION_MAX_SESSIONS,
+)
+
+_DONE = object()
+
+
+def get_answer(chat_history: list, use_cache: bool = True) -> dict:
+    # crewai, llama_index and the models load on first use (or during startup warm-up)
+    from src.agents_src.crew import get_qa_crew, get_routed_qa_crew
+    from src.agents_src.intent_router import get_intent_router
+    from src.agents_src.tools.fetch_paper_tool import get_paper_registry
+    from src.rag_doc_ingestion.dedup import get_dedup_index
+    from src.rag_doc_ingestion.embeddings import get_embed_model
 
-def get_answer(chat_history: list) -> dict:
     logger.info(f"Received chat_history: {chat_history}")
     # get the last message in the chat_history as user_query
     last_user_message = chat_history[-1]
@@ -12,17 +69,180 @@ def get_answer(chat_history: list) -> dict:
     logger.info(f"Extracted user_query: {user_query}")
     # Remove the last user message from chat_history
     history_without_last = chat_history[:-1]
-    input_data = {
-        "user_query": user_query,
-        "chat_history": history_without_last,
-    }
-    logger.debug(f"Input data for qa_crew: {input_data}")
-    result = qa_crew.kickoff(input_data)
+
+    use_cache = use_cache and settings.ANSWER_CACHE_ENABLED
+    if use_cache:
+        with span("answer_cache"):
+            query_embedding = get_embed_model().get_query_embedding(user_query)
+            # answers depend on the papers retrieval is scoped to, as well as the history
+            context_key = history_key([history_without_last, sorted(scope_paper_ids())])
+            corpus_version = store_version_watcher.current()
+            cached = answer_cache.lookup(query_embedding, context_key, corpus_version)
+        CACHE_LOOKUPS.inc(cache="answer", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            emit_progress("answer_cache_hit")
+            return cached
+
+    # Let the local intent router decide obvious turns without the Check Intent Agent
+    intent = None
+    if AgentSettings().INTENT_ROUTER_ENABLED:
+        with span("intent_router"):
+            intent = get_intent_router().route(user_query, history_without_last)
+
+    if intent is not None and intent.papers:
+        # papers the user named that are already ingested scope this turn's retrieval
+        add_scope_papers(get_paper_registry().ids_for_titles(intent.papers))
+
+    if intent is not None:
+        input_data = intent.model_dump()
+        logger.debug(f"Input data for routed_qa_crew: {input_data}")
+        crew_name = "routed_qa_crew"
+        with span("crew_kickoff"):
+            result = get_routed_qa_crew().kickoff(input_data)
+    else:
+        input_data = {
+            "user_query": user_query,
+            "chat_history": history_without_last,
+        }
+        logger.debug(f"Input data for qa_crew: {input_data}")
+        crew_name = "qa_crew"
+        with span("crew_kickoff"):
+            result = get_qa_crew().kickoff(input_data)
+    record_token_usage(crew_name, getattr(result, "token_usage", None))
     result_dict = result.to_dict()
     logger.info(f"Result from qa_crew: {result_dict}")
+
+    # "sources" lists papers fetched during this turn; such answers are not reusable
+    if use_cache and not result_dict.get("sources"):
+        # the papers the answer was retrieved from; none if any search covered the whole corpus
+        paper_ids = []
+        if AgentSettings().SCOPED_RETRIEVAL_ENABLED and not used_global_retrieval():
+            paper_ids = scope_paper_ids()
+            # scoped retrieval also searched the papers holding their deduplicated chunks
+            paper_ids = paper_ids + get_dedup_index().paper_aliases(paper_ids)
+        answer_cache.store(query_embedding, context_key, corpus_version, result_dict, paper_ids=paper_ids)
     return result_dict
 
 
+def timed_answer(chat_history: list, use_cache: bool = True, include_timings: bool = False,
+                 scope: Optional[RetrievalScope] = None) -> dict:
+    """
+    Run get_answer and record its latency and outcome.
+
+    Retrieval is scoped to `scope` (papers fetched during the turn are added to it);
+    without one the turn starts from an empty, per-request scope.
+    With `include_timings` the result gets a "timings" entry with the per-stage
+    breakdown and token usage of this request. It is added after caching, so cached
+    answers never carry another request's timings.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with request_timings() as timings, retrieval_scope(scope):
+            result = get_answer(chat_history, use_cache)
+        outcome = "ok"
+    finally:
+        CHAT_REQUESTS.inc(outcome=outcome)
+        CHAT_SECONDS.observe(time.perf_counter() - start)
+    if include_timings:
+        result = dict(result, timings=timings.breakdown())
+    return result
+
+
+async def aget_answer(chat_history: list, use_cache: bool = True, include_timings: bool = False) -> dict:
+    """Run get_answer on the crew executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        crew_executor, ctx.run, timed_answer, chat_history, use_cache, include_timings
+    )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream(answer_fn: Callable[[], dict]) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_progress(event: str, data: dict) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    def run() -> dict:
+        with progress_listener(on_progress):
+            return answer_fn()
+
+    ctx = contextvars.copy_context()
+    future = loop.run_in_executor(crew_executor, ctx.run, run)
+    future.add_done_callback(lambda _: events.put_nowait(_DONE))
+
+    while True:
+        item = await events.get()
+        if item is _DONE:
+            break
+        event, data = item
+        yield _sse(event, data)
+
+    try:
+        yield _sse("answer", future.result())
+    except Exception as e:
+        logger.error(f"Error while streaming answer: {e}", exc_info=True)
+        yield _sse("error", {"detail": str(e)})
+
+
+async def stream_answer(chat_history: list, use_cache: bool = True,
+                        include_timings: bool = False) -> AsyncIterator[str]:
+    """
+    Run the crew and yield Server-Sent Events as it progresses.
+
+    Emits `intent_decided`, `paper_fetched` and `retrieval_done` progress events and
+    `token` events for the answer as it is generated, then a final `answer` event with
+    the AnswerStructure payload (or an `error` event).
+    """
+    async for event in _stream(lambda: timed_answer(chat_history, use_cache, include_timings)):
+        yield event
+
+
+def session_answer(session: ChatSession, message: str, use_cache: bool = True,
+                   include_timings: bool = False) -> dict:
+    """
+    Answer `message` in the context of a server-side session.
+
+    The crew sees the session's compacted history plus the new message, and retrieval
+    is scoped to the papers the session has touched so far. The message, the answer
+    and any newly fetched papers are added to the stored session only once the turn
+    succeeded.
+    """
+    with session.turn_lock:
+        chat_history = session_store.history(session) + [{"role": "user", "content": message}]
+        scope = RetrievalScope(session.papers)
+        result = timed_answer(chat_history, use_cache, include_timings, scope=scope)
+        session_store.record_turn(
+            session,
+            [{"role": "user", "content": message}, {"role": "assistant", "content": result.get("answer", "")}],
+            papers=scope.paper_ids,
+        )
+    return dict(result, session_id=session.id)
+
+
+async def aget_session_answer(session: ChatSession, message: str, use_cache: bool = True,
+                              include_timings: bool = False) -> dict:
+    """Run session_answer on the crew executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        crew_executor, ctx.run, session_answer, session, message, use_cache, include_timings
+    )
+
+
+async def stream_session_answer(session: ChatSession, message: str, use_cache: bool = True,
+                                include_timings: bool = False) -> AsyncIterator[str]:
+    """Stream session_answer as Server-Sent Events, like stream_answer."""
+    async for event in _stream(lambda: session_answer(session, message, use_cache, include_timings)):
+        yield event
+
+
 # Example usage
 # sample_chat_history = [
 #     {"role": "user", "content": "What is Evolution?"},
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from typing import Iterable, List, Optional
+
+from src.agents_src.retrieval.context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_FIRST_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)", re.DOTALL)
+_SUMMARY_LINE_CHARS = 200
+
+
+def _summary_line(message: dict) -> str:
+    content = " ".join(message["content"].split())
+    if message["role"] == "assistant":
+        match = _FIRST_SENTENCE.match(content)
+        content = match.group(1) if match else content
+        prefix = "Assistant answered"
+    else:
+        prefix = "User asked"
+    if len(content) > _SUMMARY_LINE_CHARS:
+        content = content[:_SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+    return f"{prefix}: {content}"
+
+
+class ChatSession:
+    """One conversation: recent messages verbatim plus a summary of older ones."""
+
+    def __init__(self, session_id: str, turn_lock: Optional[threading.Lock] = None):
+        self.id = session_id
+        self.messages: deque = deque()
+        self.summary_lines: deque = deque()
+        self.dropped_messages = 0
+        # paper ids this conversation fetched or named; retrieval is scoped to them
+        self.papers: List[str] = []
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        # serializes turns of the same session in this process, so answers are appended in order
+        self.turn_lock = turn_lock or threading.Lock()
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.id,
+            "messages": list(self.messages),
+            "summary": list(self.summary_lines),
+            "dropped_messages": self.dropped_messages,
+            "papers": list(self.papers),
+            "created_at": self.created_at,
+            "last_active": self.last_active,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, turn_lock: Optional[threading.Lock] = None) -> "ChatSession":
+        session = cls(data["session_id"], turn_lock)
+        session.messages = deque(data["messages"])
+        session.summary_lines = deque(data["summary"])
+        session.dropped_messages = data["dropped_messages"]
+        session.papers = list(data["papers"])
+        session.created_at = data["created_at"]
+        session.last_active = data["last_active"]
+        return session
+
+
+class SessionStore:
+    """
+    Chat sessions keyed by session id, stored in SQLite so every uvicorn worker (and
+    replicas sharing the directory) sees the same conversations.
+
+    After every turn the history is compacted to `max_history_tokens`: the most
+    recent messages stay verbatim (at least `min_recent_messages`), older ones are
+    folded into a short extractive summary, and summary lines beyond
+    `summary_max_tokens` are dropped oldest first. Sessions idle for longer than
+    `idle_ttl_seconds` are evicted, as are the least recently used ones beyond
+    `max_sessions`. A turn is appended in one write transaction against the stored
+    session, so turns finished by different workers are all kept. Counters in
+    `stats()` are per process; `active_sessions` counts the shared store.
+    """
+
+    def __init__(self, path: str, max_history_tokens: int = 2000, summary_max_tokens: int = 400,
+                 min_recent_messages: int = 2, idle_ttl_seconds: float = 1800, max_sessions: int = 10000):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_history_tokens = max_history_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.min_recent_messages = min_recent_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        # turn locks of the sessions currently in use in this process
+        self._turn_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                last_active REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chat_sessions_last_active ON chat_sessions (last_active);
+            """
+        )
+        self._conn.commit()
+        self._stats = {"created": 0, "evicted_idle": 0, "evicted_capacity": 0, "deleted": 0,
+                       "messages": 0, "compacted_messages": 0}
+
+    def _turn_lock(self, session_id: str) -> threading.Lock:
+        turn_lock = self._turn_locks.get(session_id)
+        if turn_lock is None:
+            turn_lock = threading.Lock()
+            self._turn_locks[session_id] = turn_lock
+        return turn_lock
+
+    def _load(self, session_id: str) -> Optional[ChatSession]:
+        row = self._conn.execute(
+            "SELECT state, last_active FROM chat_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        data["last_active"] = row[1]
+        return ChatSession.from_dict(data, self._turn_lock(session_id))
+
+    def _save(self, session: ChatSession) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO chat_sessions (session_id, state, last_active) VALUES (?, ?, ?)",
+            (session.id, json.dumps(session.to_dict()), session.last_active),
+        )
+
+    def _evict(self) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM chat_sessions WHERE last_active < ?", (time.time() - self.idle_ttl_seconds,)
+        )
+        self._stats["evicted_idle"] += cursor.rowcount
+        excess = self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0] - self.max_sessions
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id IN "
+                "(SELECT session_id FROM chat_sessions ORDER BY last_active LIMIT ?)",
+                (excess,),
+            )
+            self._stats["evicted_capacity"] += excess
+
+    def create(self) -> ChatSession:
+        session_id = uuid.uuid4().hex
+        session = ChatSession(session_id, self._turn_lock(session_id))
+        with self._lock, self._conn:
+            self._save(session)
+            self._stats["created"] += 1
+            self._evict()
+        logger.info(f"Created chat session {session.id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Return the session and mark it active, or None if it is unknown or was evicted."""
+        with self._lock, self._conn:
+            session = self._load(session_id)
+            if session is None:
+                return None
+            now = time.time()
+            if session.last_active < now - self.idle_ttl_seconds:
+                self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+                self._stats["evicted_idle"] += 1
+                return None
+            session.last_active = now
+            self._conn.execute(
+                "UPDATE chat_sessions SET last_active = ? WHERE session_id = ?", (now, session_id)
+            )
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+            if not cursor.rowcount:
+                return False
+            self._stats["deleted"] += 1
+            return True
+
+    def _compact(self, session: ChatSession) -> None:
+        def history_tokens() -> int:
+            return (sum(estimate_tokens(m["content"]) for m in session.messages)
+                    + sum(estimate_tokens(line) for line in session.summary_lines))
+
+        while len(session.messages) > self.min_recent_messages and history_tokens() > self.max_history_tokens:
+            session.summary_lines.append(_summary_line(session.messages.popleft()))
+            self._stats["compacted_messages"] += 1
+        while session.summary_lines and (
+            sum(estimate_tokens(line) for line in session.summary_lines) > self.summary_max_tokens
+            or history_tokens() > self.max_history_tokens
+        ):
+            session.summary_lines.popleft()
+            session.dropped_messages += 1
+
+    def record_turn(self, session: ChatSession, messages: List[dict], papers: Iterable[str] = ()) -> None:
+        """
+        Append a turn's messages and papers to the stored session and compact its history.
+
+        The stored copy is re-read inside the write transaction, so turns another worker
+        recorded meanwhile are kept; `session` is updated to the result.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            # a session evicted during the turn is stored again rather than losing the turn
+            stored = self._load(session.id) or session
+            stored.messages.extend(messages)
+            stored.papers.extend(p for p in papers if p not in stored.papers)
+            stored.last_active = time.time()
+            self._stats["messages"] += len(messages)
+            self._compact(stored)
+            self._save(stored)
+        session.messages = stored.messages
+        session.summary_lines = stored.summary_lines
+        session.dropped_messages = stored.dropped_messages
+        session.papers = stored.papers
+        session.last_active = stored.last_active
+
+    def append(self, session: ChatSession, role: str, content: str) -> None:
+        """Add a message to the session and compact its history to the token budget."""
+        self.record_turn(session, [{"role": role, "content": content}])
+
+    def history(self, session: ChatSession) -> List[dict]:
+        """The compacted history in chat_history form, summary first."""
+        messages = list(session.messages)
+        summary_lines = list(session.summary_lines)
+        if summary_lines:
+            summary = "Summary of the earlier conversation:\n" + "\n".join(summary_lines)
+            messages.insert(0, {"role": "system", "content": summary})
+        return messages
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active_sessions"] = self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+        return stats
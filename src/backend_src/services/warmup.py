@@ -0,0 +1,139 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from src.agents_src.config.agent_settings import AgentSettings
+from src.observability.metrics import record_stage
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupReport:
+    """Import and warm-up timings of this worker, and whether it is ready for traffic."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.state = STARTING
+        self.import_seconds: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self._stages: List[dict] = []
+        self._lock = threading.Lock()
+
+    def record_imports(self, seconds: float) -> None:
+        self.import_seconds = seconds
+        record_stage("startup_imports", seconds)
+
+    def _set_state(self, state: str) -> None:
+        with self._lock:
+            self.state = state
+            if state == READY:
+                self.ready_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def run_warmup(self, steps: List[Tuple[str, Callable[[], None]]]) -> None:
+        """Run the warm-up steps in order, timing each; the worker is ready if all succeed."""
+        self._set_state(WARMING)
+        failed = False
+        for name, step in steps:
+            start = time.perf_counter()
+            entry = {"stage": name}
+            try:
+                step()
+            except Exception as e:
+                logger.exception(f"Warm-up step '{name}' failed: {e}")
+                entry["error"] = str(e)
+                failed = True
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+            record_stage(f"warmup_{name}", entry["seconds"])
+            with self._lock:
+                self._stages.append(entry)
+        self._set_state(FAILED if failed else READY)
+        logger.info(f"Startup finished: {self.to_dict()}")
+
+    def mark_ready(self) -> None:
+        self._set_state(READY)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = [dict(stage) for stage in self._stages]
+            state, ready_at = self.state, self.ready_at
+        return {
+            "state": state,
+            "import_seconds": round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            "warmup_seconds": round(sum(stage["seconds"] for stage in stages), 3),
+            "ready_after_seconds": round(ready_at - self.started_at, 3) if ready_at is not None else None,
+            "stages": stages,
+        }
+
+
+startup_report = StartupReport()
+
+
+def _import(module: str) -> Callable[[], None]:
+    return lambda: importlib.import_module(module)
+
+
+def _warm_embed_model() -> None:
+    from src.rag_doc_ingestion.embeddings import get_embed_model
+
+    # the first call pays for lazy model initialisation; do it before real traffic
+    get_embed_model().get_query_embedding("warm-up")
+
+
+def _warm_retrieval_engine() -> None:
+    from src.agents_src.retrieval.engine import get_retrieval_engine
+
+    get_retrieval_engine().warm_up()
+
+
+def _warm_intent_router() -> None:
+    if AgentSettings().INTENT_ROUTER_ENABLED:
+        from src.agents_src.intent_router import get_intent_router
+
+        get_intent_router().warm_up()
+
+
+def _warm_crews() -> None:
+    from src.agents_src.crew import get_qa_crew, get_routed_qa_crew
+
+    get_qa_crew()
+    get_routed_qa_crew()
+
+
+def warmup_steps() -> List[Tuple[str, Callable[[], None]]]:
+    """Heavy imports first (timed separately), then models, index and crews."""
+    return [
+        ("import_crewai", _import("crewai")),
+        ("import_retrieval", _import("src.agents_src.retrieval.engine")),
+        ("import_paper_tools", _import("src.agents_src.tools.fetch_paper_tool")),
+        ("embed_model", _warm_embed_model),
+        ("retrieval_engine", _warm_retrieval_engine),
+        ("intent_router", _warm_intent_router),
+        ("crews", _warm_crews),
+    ]
+
+
+def start_warmup(enabled: bool = True) -> None:
+    """
+    Warm the worker up in a background thread.
+
+    /healthz answers as soon as the server runs; /readyz only once warm-up has
+    finished. With `enabled` False the worker is ready at once and everything loads on
+    first use.
+    """
+    if not enabled:
+        startup_report.mark_ready()
+        return
+    threading.Thread(
+        target=startup_report.run_warmup, args=(warmup_steps(),), name="warmup", daemon=True
+    ).start()
@@ -18,9 +18,47 @@ st.title("💬 AstraRAG - Agentic RAG Chatbot")
 
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
+
+
+SESSION_RESET_NOTICE = (
+    "The server no longer had this conversation (it expired or was ended), "
+    "so this answer does not take the earlier messages into account."
+)
+
+
+def ask(message: str) -> dict:
+    """
+    Send only the new message; the backend keeps the (compacted) history per session.
+
+    If the session is gone on the server, a new one is started and the result has
+    `session_reset` set, so the user can be told the earlier history was not used.
+    """
+    session_reset = False
+    for _ in range(2):
+        if st.session_state.session_id is None:
+            created = requests.post(settings.CHAT_SESSIONS_URL)
+            created.raise_for_status()
+            st.session_state.session_id = created.json()["session_id"]
+        response = requests.post(
+            f"{settings.CHAT_SESSIONS_URL}/{st.session_state.session_id}/answer",
+            json={"message": message},
+        )
+        if response.status_code == 404:
+            # the session expired on the server; start a new one
+            st.session_state.session_id = None
+            session_reset = True
+            continue
+        response.raise_for_status()
+        return dict(response.json(), session_reset=session_reset)
+    raise RuntimeError("Could not create a chat session")
+
 
 for message in st.session_state.chat_history:
     with st.chat_message(message["role"]):
+        if message.get("session_reset"):
+            st.warning(SESSION_RESET_NOTICE)
         st.markdown(message["content"])
         if message.get("role") == "assistant":
             sources = message.get("sources", [])
@@ -39,30 +77,31 @@ if user_prompt:
     st.chat_message("user").markdown(user_prompt)
     st.session_state.chat_history.append({"role": "user", "content": user_prompt})
 
-    # Prepare payload for API
-    payload = {"chat_history": st.session_state.chat_history}
     try:
-        response = requests.post(settings.CHAT_ENDPOINT_URL, json=payload)
-        response.raise_for_status()
-        response_json = response.json()
+        response_json = ask(user_prompt)
         assistant_response = response_json.get("answer", "(No response)")
         tool_used = response_json.get("tool_used", "N/A")
         rationale = response_json.get("rationale", "N/A")
         sources = response_json.get("sources", [])
+        session_reset = response_json.get("session_reset", False)
     except Exception as e:
         assistant_response = f"Error: {e}"
         tool_used = "N/A"
         rationale = "N/A"
         sources = []
+        session_reset = False
 
     st.session_state.chat_history.append({
         "role": "assistant",
         "content": assistant_response,
         "tool_used": tool_used,
         "rationale": rationale,
-        "sources": sources
+        "sources": sources,
+        "session_reset": session_reset,
     })
     with st.chat_message("assistant"):
+        if session_reset:
+            st.warning(SESSION_RESET_NOTICE)
         st.markdown(assistant_response)
         if sources:
             st.markdown(f"**Sources:** {', '.join(sources)}")
@@ -6,6 +6,8 @@ load_dotenv()
 
 class Settings(BaseSettings):
     CHAT_ENDPOINT_URL: str = "http://localhost:8000/chat/answer"
+    # Server-side sessions: only the new message is sent each turn
+    CHAT_SESSIONS_URL: str = "http://localhost:8000/chat/sessions"
 
     class Config:
         env_file = ".env"
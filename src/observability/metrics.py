@@ -0,0 +1,265 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache lookups up to full crew runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts, sum, count
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        lines = self._header()
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text exposition format.
+
+    Collectors registered with `register_collector` are called at scrape time and
+    return extra exposition lines, for values owned by other components (e.g. cache
+    statistics).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception:
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "rag_stage_duration_seconds", "Time spent in each stage of answering and ingestion.", ["stage"]
+)
+STAGE_ERRORS = REGISTRY.counter("rag_stage_errors_total", "Stages that raised an exception.", ["stage"])
+CHAT_REQUESTS = REGISTRY.counter("rag_chat_requests_total", "Chat answer requests by outcome.", ["outcome"])
+CHAT_SECONDS = REGISTRY.histogram("rag_chat_request_duration_seconds", "End-to-end chat answer latency.")
+LLM_CALL_SECONDS = REGISTRY.histogram("rag_llm_call_duration_seconds", "Latency of agent LLM calls.", ["agent"])
+LLM_TOKENS = REGISTRY.counter("rag_llm_tokens_total", "LLM tokens used by crew runs.", ["crew", "kind"])
+LLM_REQUESTS = REGISTRY.counter("rag_llm_requests_total", "Successful LLM requests made by crew runs.", ["crew"])
+RAG_TOOL_CONTEXT_TOKENS = REGISTRY.counter(
+    "rag_tool_context_tokens_total", "Context tokens returned by rag_query_tool to the agent.", ["mode"]
+)
+CACHE_LOOKUPS = REGISTRY.counter("rag_cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"])
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "rag_llm_cache_lookups_total", "Agent LLM response cache lookups by agent and result.", ["agent", "result"]
+)
+DEDUP_CHUNKS = REGISTRY.counter(
+    "rag_ingest_dedup_chunks_total", "Ingested chunks kept or skipped as near-duplicates.", ["result"]
+)
+
+
+class RequestTimings:
+    """Per-request breakdown of stage timings and token usage."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, List[float]] = {}
+        self._tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_tokens(self, **tokens: int) -> None:
+        with self._lock:
+            for kind, count in tokens.items():
+                self._tokens[kind] = self._tokens.get(kind, 0) + count
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            stages = {stage: {"seconds": round(seconds, 4), "count": count}
+                      for stage, (seconds, count) in self._stages.items()}
+            tokens = dict(self._tokens)
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "stages": stages,
+            "llm_tokens": tokens,
+        }
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def request_timings():
+    """Collect the stage timings recorded in this context into a RequestTimings."""
+    timings = RequestTimings()
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere (e.g. on a pipeline thread)."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as `stage` for the metrics and the current request's breakdown."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def record_token_usage(crew: str, usage) -> None:
+    """Count the token usage of a crew run (crewai UsageMetrics or a dict)."""
+    if usage is None:
+        return
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+    tokens = {kind: int(usage.get(f"{kind}_tokens") or 0) for kind in ("prompt", "completion", "cached_prompt")}
+    for kind, count in tokens.items():
+        if count:
+            LLM_TOKENS.inc(count, crew=crew, kind=kind)
+    LLM_REQUESTS.inc(int(usage.get("successful_requests") or 0), crew=crew)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add_tokens(**tokens)
+
+
+def record_context_tokens(mode: str, tokens: int) -> None:
+    """Count the context tokens rag_query_tool handed to the agent."""
+    RAG_TOOL_CONTEXT_TOKENS.inc(tokens, mode=mode)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add_tokens(rag_context=tokens)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -10,7 +12,75 @@ class DocIngestionSettings(BaseSettings):
     VECTOR_STORE_DIR: str
     COLLECTION_NAME: str
 
+    # Vector store backend: "chroma" or "numpy" (memory-mapped flat/int8 matrices)
+    VECTOR_BACKEND: str = "chroma"
+    NUMPY_STORE_QUANTIZE: bool = True
+    NUMPY_STORE_RESCORE_FACTOR: int = 4
+
+    # Embedding model and caches
+    EMBED_MODEL_NAME: str = "BAAI/bge-small-en-v1.5"
+    EMBED_CACHE_DIR: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/embedding_cache
+    EMBED_CACHE_MAX_ENTRIES: int = 200_000
+    QUERY_EMBED_CACHE_SIZE: int = 1024
+
+    # Embedding backend: "huggingface" or "onnx" (ONNX Runtime on CPU, see onnx_embedding.py)
+    EMBED_BACKEND: str = "huggingface"
+    EMBED_ONNX_DIR: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/onnx/<model name>
+    EMBED_ONNX_QUANTIZE: bool = True  # int8 dynamic quantization
+    EMBED_ONNX_THREADS: int = 0  # 0 = one per CPU
+    EMBED_ONNX_MAX_BATCH_TOKENS: int = 8192  # padded tokens per length-sorted batch
+    EMBED_ONNX_PARITY_MIN_COSINE: float = 0.98
+    EMBED_ONNX_PARITY_MIN_OVERLAP: float = 0.8
+
+    # Shared embedding service (python -m src.rag_doc_ingestion.embedding_service)
+    EMBED_SERVICE_ENABLED: bool = False
+    EMBED_SERVICE_SOCKET: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/embedding_service.sock
+    EMBED_SERVICE_MAX_BATCH_SIZE: int = 64  # texts per micro-batch
+    EMBED_SERVICE_MAX_WAIT_MS: float = 5.0  # how long a batch waits for more requests
+    EMBED_SERVICE_TIMEOUT_SECONDS: float = 60.0
+
+    # PDF extraction pool (0 = one worker per CPU, 1 = extract inline)
+    PDF_EXTRACT_WORKERS: int = 0
+    PDF_PAGES_PER_TASK: int = 16
+
+    # Streaming ingestion pipeline
+    INGEST_QUEUE_SIZE: int = 8
+    EMBED_BATCH_SIZE: int = 32
+    UPSERT_BATCH_SIZE: int = 256
+
+    # Background fetch-and-ingest jobs
+    BACKGROUND_INGESTION: bool = True
+    INGEST_JOB_WORKERS: int = 2
+    INGEST_JOB_QUEUE_SIZE: int = 32
+    INGEST_JOB_HISTORY: int = 200
+
+    # arXiv access (the URLs can point at a local stand-in server)
+    ARXIV_API_URL: Optional[str] = None  # e.g. http://localhost:9000/api/query
+    ARXIV_PDF_BASE_URL: Optional[str] = None  # replaces https://arxiv.org in PDF links
+    PAPER_REGISTRY_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/paper_registry.sqlite3
+    DOWNLOAD_WORKERS: int = 4
+    DOWNLOAD_PER_HOST_LIMIT: int = 2
+    DOWNLOAD_RETRIES: int = 3
+    DOWNLOAD_TIMEOUT_SECONDS: float = 60.0
+
+    # BM25 sparse index used for hybrid retrieval
+    SPARSE_INDEX_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/sparse_index.sqlite3
+    SPARSE_MAX_DF_RATIO: float = 0.5  # query terms in more than this share of the chunks are not scored
+
+    # Near-duplicate chunks (MinHash/LSH over word shingles) are skipped before embedding
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.9  # estimated Jaccard similarity at which a chunk counts as a duplicate
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_SHINGLE_SIZE: int = 5
+    DEDUP_INDEX_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/dedup_index.sqlite3
+
+    # Single writer: ingestion in any worker or replica waits for <VECTOR_STORE_DIR>/.writer.lock
+    STORE_WRITE_LOCK_TIMEOUT_SECONDS: float = 600.0
+
+    # Incremental ingestion
+    INGEST_MANIFEST_PATH: Optional[str] = None  # defaults to <VECTOR_STORE_DIR>/ingest_manifest.json
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
-        extra = "allow"
\ No newline at end of file
+        extra = "allow"
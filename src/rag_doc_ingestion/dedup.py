@@ -0,0 +1,321 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+# Chunks shorter than this are always kept: too few shingles for a stable estimate,
+# and cheap to embed anyway.
+_MIN_WORDS = 20
+
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band for `num_perm` hashes, chosen so that pairs around
+    `threshold` similarity become candidates (minimizing the area of false positives
+    below the threshold plus false negatives above it).
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1.0 - (1.0 - grid ** rows) ** bands
+        below, above = grid < threshold, grid >= threshold
+        error = candidate[below].sum() + (1.0 - candidate[above]).sum()
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, stable across processes and runs."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a * x + b stays below 2**64 for 32-bit shingle hashes
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Signature of `text`, or None when it is too short to deduplicate."""
+        words = _WORD.findall(text.lower())
+        if len(words) < _MIN_WORDS:
+            return None
+        k = self.shingle_size
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+def _similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class DedupIndex:
+    """
+    MinHash/LSH index of the chunks in the vector store, persisted in SQLite.
+
+    The ingestion pipeline checks every new chunk against it before embedding: a chunk
+    whose estimated Jaccard similarity (word shingles) to an indexed chunk is at least
+    `threshold` is skipped and recorded as a duplicate of that chunk, so no embedding is
+    computed or stored for it. Papers whose chunks were skipped are aliased to the papers
+    holding the kept copies, which keeps scoped retrieval complete. Chunks are deleted by
+    file path alongside the vector store and sparse index deletes.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 5):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                node_id TEXT PRIMARY KEY,
+                file_path TEXT,
+                paper_id TEXT,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_file_path ON chunks (file_path);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                key INTEGER NOT NULL,
+                node_id TEXT NOT NULL,
+                PRIMARY KEY (band, key, node_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS bands_node ON bands (node_id);
+            CREATE TABLE IF NOT EXISTS duplicates (
+                node_id TEXT PRIMARY KEY,
+                file_path TEXT,
+                paper_id TEXT,
+                canonical_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS duplicates_canonical ON duplicates (canonical_id);
+            CREATE INDEX IF NOT EXISTS duplicates_file_path ON duplicates (file_path);
+            CREATE TABLE IF NOT EXISTS params (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        params = f"{num_perm}:{shingle_size}:{self.bands}x{self.rows}"
+        stored = self._conn.execute("SELECT value FROM params WHERE name = 'minhash'").fetchone()
+        if stored is not None and stored[0] != params:
+            # signatures from other parameters cannot be compared; start over
+            logger.warning(f"Dedup index {path} was built with {stored[0]}, now {params}; clearing it")
+            self._conn.executescript("DELETE FROM chunks; DELETE FROM bands; DELETE FROM duplicates;")
+        self._conn.execute("INSERT OR REPLACE INTO params (name, value) VALUES ('minhash', ?)", (params,))
+        self._conn.commit()
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+
+    def candidates(self, keys: Sequence[int]) -> Dict[str, np.ndarray]:
+        """Indexed chunks sharing at least one band with `keys`, with their signatures."""
+        clauses = " OR ".join("(b.band = ? AND b.key = ?)" for _ in keys)
+        params = [value for band, key in enumerate(keys) for value in (band, key)]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT c.node_id, c.signature FROM bands b JOIN chunks c ON c.node_id = b.node_id "
+                f"WHERE {clauses}",
+                params,
+            ).fetchall()
+        return {node_id: np.frombuffer(signature, dtype=np.uint64) for node_id, signature in rows}
+
+    def add(self, chunks: List[Tuple[str, Optional[str], Optional[str], np.ndarray, List[int]]],
+            duplicates: List[Tuple[str, Optional[str], Optional[str], str]]) -> None:
+        """Persist kept chunks (node_id, file_path, paper_id, signature, band keys) and skipped duplicates."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (node_id, file_path, paper_id, signature) VALUES (?, ?, ?, ?)",
+                [(node_id, file_path, paper_id, signature.tobytes())
+                 for node_id, file_path, paper_id, signature, _ in chunks],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, key, node_id) VALUES (?, ?, ?)",
+                [(band, key, node_id) for node_id, _, _, _, keys in chunks for band, key in enumerate(keys)],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO duplicates (node_id, file_path, paper_id, canonical_id) VALUES (?, ?, ?, ?)",
+                duplicates,
+            )
+
+    def delete_file(self, file_path: str) -> Set[str]:
+        """
+        Remove the chunks and duplicates recorded for `file_path`.
+
+        Returns the other files that had chunks skipped as duplicates of the removed
+        ones; those chunks are no longer stored anywhere, so the files must be ingested
+        again.
+        """
+        with self._lock, self._conn:
+            node_ids = [row[0] for row in self._conn.execute(
+                "SELECT node_id FROM chunks WHERE file_path = ?", (file_path,)
+            )]
+            orphaned = set()
+            for i in range(0, len(node_ids), 500):
+                chunk = node_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                orphaned.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT file_path FROM duplicates WHERE canonical_id IN ({placeholders})", chunk
+                ))
+                self._conn.execute(f"DELETE FROM duplicates WHERE canonical_id IN ({placeholders})", chunk)
+                self._conn.execute(f"DELETE FROM bands WHERE node_id IN ({placeholders})", chunk)
+            self._conn.execute("DELETE FROM chunks WHERE file_path = ?", (file_path,))
+            self._conn.execute("DELETE FROM duplicates WHERE file_path = ?", (file_path,))
+        orphaned.discard(file_path)
+        orphaned.discard(None)
+        return orphaned
+
+    def paper_aliases(self, paper_ids: Sequence[str]) -> List[str]:
+        """Papers holding the kept copies of chunks skipped for `paper_ids`."""
+        if not paper_ids:
+            return []
+        placeholders = ",".join("?" * len(paper_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT c.paper_id FROM duplicates d JOIN chunks c ON c.node_id = d.canonical_id "
+                f"WHERE d.paper_id IN ({placeholders}) AND c.paper_id IS NOT NULL",
+                list(paper_ids),
+            ).fetchall()
+        return [row[0] for row in rows if row[0] not in paper_ids]
+
+    def stats(self) -> dict:
+        with self._lock:
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            duplicates = self._conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0]
+        return {"indexed_chunks": chunks, "embeddings_saved": duplicates,
+                "threshold": self.threshold, "bands": self.bands, "rows": self.rows}
+
+    def session(self) -> "DedupSession":
+        return DedupSession(self)
+
+
+class DedupSession:
+    """
+    Deduplication state of one ingestion run.
+
+    `filter` decides which chunks to keep, also against chunks kept earlier in the same
+    run; `commit` persists the decisions for chunks once they are in the vector store,
+    so a failed run leaves no index entries for chunks that were never stored.
+    """
+
+    def __init__(self, index: DedupIndex):
+        self.index = index
+        self.kept = 0
+        self.skipped = 0
+        self._pending: Dict[str, Tuple[Optional[str], Optional[str], np.ndarray, List[int]]] = {}
+        self._pending_bands: Dict[Tuple[int, int], List[str]] = {}
+        # skipped chunks whose kept copy is not committed yet, by that copy's node id
+        self._pending_duplicates: Dict[str, List[Tuple[str, Optional[str], Optional[str], str]]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, nodes: List[BaseNode]) -> List[BaseNode]:
+        """Return the nodes that are not near-duplicates of indexed or earlier chunks."""
+        kept_nodes = []
+        for node in nodes:
+            signature = self.index.hasher.signature(node.get_content(metadata_mode=MetadataMode.NONE))
+            if signature is None:
+                kept_nodes.append(node)
+                self.kept += 1
+                continue
+            keys = self.index.band_keys(signature)
+            candidates = self.index.candidates(keys)
+            with self._lock:
+                for band_key in enumerate(keys):
+                    for node_id in self._pending_bands.get(band_key, ()):
+                        candidates[node_id] = self._pending[node_id][2]
+            best_id, best = None, 0.0
+            for node_id, candidate in candidates.items():
+                similarity = _similarity(signature, candidate)
+                if similarity > best:
+                    best_id, best = node_id, similarity
+
+            file_path, paper_id = node.metadata.get("file_path"), node.metadata.get("paper_id")
+            if best_id is not None and best >= self.index.threshold:
+                duplicate = (node.node_id, file_path, paper_id, best_id)
+                with self._lock:
+                    if best_id in self._pending:
+                        self._pending_duplicates.setdefault(best_id, []).append(duplicate)
+                        duplicate = None
+                if duplicate is not None:
+                    self.index.add([], [duplicate])
+                self.skipped += 1
+                logger.debug(f"Skipping chunk {node.node_id} ({best:.2f} similar to {best_id})")
+                continue
+            with self._lock:
+                self._pending[node.node_id] = (file_path, paper_id, signature, keys)
+                for band_key in enumerate(keys):
+                    self._pending_bands.setdefault(band_key, []).append(node.node_id)
+            kept_nodes.append(node)
+            self.kept += 1
+        return kept_nodes
+
+    def commit(self, nodes: List[BaseNode]) -> None:
+        """Index the given chunks (now in the vector store) and their skipped duplicates."""
+        chunks, duplicates = [], []
+        with self._lock:
+            for node in nodes:
+                pending = self._pending.pop(node.node_id, None)
+                if pending is None:
+                    continue
+                file_path, paper_id, signature, keys = pending
+                chunks.append((node.node_id, file_path, paper_id, signature, keys))
+                duplicates.extend(self._pending_duplicates.pop(node.node_id, ()))
+                for band_key in enumerate(keys):
+                    bucket = self._pending_bands.get(band_key)
+                    if bucket is not None:
+                        bucket.remove(node.node_id)
+                        if not bucket:
+                            del self._pending_bands[band_key]
+        if chunks:
+            self.index.add(chunks, duplicates)
+
+
+_dedup_index: Optional[DedupIndex] = None
+_dedup_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> DedupIndex:
+    """Return the process-wide near-duplicate index stored next to the vector store."""
+    global _dedup_index
+    if _dedup_index is None:
+        with _dedup_index_lock:
+            if _dedup_index is None:
+                settings = DocIngestionSettings()
+                path = settings.DEDUP_INDEX_PATH or os.path.join(settings.VECTOR_STORE_DIR, "dedup_index.sqlite3")
+                logger.info(f"Using near-duplicate index at: {path}")
+                _dedup_index = DedupIndex(
+                    path,
+                    threshold=settings.DEDUP_THRESHOLD,
+                    num_perm=settings.DEDUP_NUM_PERM,
+                    shingle_size=settings.DEDUP_SHINGLE_SIZE,
+                )
+    return _dedup_index
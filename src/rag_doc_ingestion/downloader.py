@@ -0,0 +1,70 @@
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+class PaperDownloader:
+    """
+    Concurrent PDF downloader over a pooled HTTP session.
+
+    Connections are reused through one requests.Session, failed requests are retried
+    with exponential backoff, and at most `per_host_limit` downloads run against the
+    same host at a time (arXiv asks clients to be gentle).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        per_host_limit: int = 2,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = 60.0,
+    ):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self._session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-download")
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        with self._host_slots_lock:
+            return self._host_slots[urlsplit(url).netloc]
+
+    def download(self, url: str) -> bytes:
+        """Download `url` into memory."""
+        with self._host_slot(url):
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+
+    def download_many(self, urls: List[str]) -> List[Union[bytes, Exception]]:
+        """Download all `urls` concurrently; failures are returned in place of the content."""
+        futures = [self._executor.submit(self.download, url) for url in urls]
+        results: List[Union[bytes, Exception]] = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Failed to download {url}: {e}")
+                results.append(e)
+        return results
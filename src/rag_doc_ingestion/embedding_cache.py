@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """Content address of a chunk of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model id, chunk-text hash).
+
+    Entries are stored in a SQLite file as packed float32 vectors. Every read refreshes
+    the entry's access time and the least recently used entries are evicted once the
+    cache grows past `max_entries`.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 200_000):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "embeddings.sqlite3")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model_id TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (model_id, text_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+
+    def get_many(self, model_id: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the given hashes, skipping misses."""
+        hashes = list(hashes)
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            # stay well below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model_id = ? AND text_hash IN ({placeholders})",
+                    [model_id, *batch],
+                ).fetchall()
+                for h, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[h] = vector.tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model_id = ? AND text_hash = ?",
+                    [(now, model_id, h) for h in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model_id: str, items: Iterable[Tuple[str, List[float]]]) -> None:
+        """Store vectors and evict the least recently used entries beyond the size cap."""
+        now = time.time()
+        rows = [(model_id, h, array("f", vector).tobytes(), now) for h, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_id, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE (model_id, text_hash) IN"
+                    " (SELECT model_id, text_hash FROM embeddings ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+                logger.info(f"Evicted {overflow} least recently used embeddings from cache.")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper that consults caches before calling the wrapped model.
+
+    Document embeddings go through the on-disk EmbeddingCache so re-ingesting the same
+    chunk text never re-runs the model. Query embeddings go through an in-memory LRU.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _disk_cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _query_cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _query_cache_size: int = PrivateAttr(default=1024)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: dict = PrivateAttr(default_factory=dict)
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        disk_cache: Optional[EmbeddingCache] = None,
+        query_cache_size: int = 1024,
+        **kwargs,
+    ):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._disk_cache = disk_cache
+        self._query_cache_size = query_cache_size
+        self._stats = {"text_hits": 0, "text_misses": 0, "query_hits": 0, "query_misses": 0}
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def inner_model(self) -> BaseEmbedding:
+        return self._embed_model
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        with self._lock:
+            embedding = self._query_cache.get(query)
+            if embedding is not None:
+                self._query_cache.move_to_end(query)
+                self._stats["query_hits"] += 1
+                return embedding
+            self._stats["query_misses"] += 1
+        embedding = self._embed_model.get_query_embedding(query)
+        with self._lock:
+            self._query_cache[query] = embedding
+            while len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def get_query_embedding_batch(self, queries: List[str]) -> List[List[float]]:
+        """Embed many queries, running the uncached ones through the model as one batch."""
+        embeddings: Dict[str, List[float]] = {}
+        with self._lock:
+            for query in queries:
+                embedding = self._query_cache.get(query)
+                if embedding is not None:
+                    self._query_cache.move_to_end(query)
+                    embeddings[query] = embedding
+            missing = list(dict.fromkeys(q for q in queries if q not in embeddings))
+            self._stats["query_hits"] += len(queries) - len(missing)
+            self._stats["query_misses"] += len(missing)
+        if missing:
+            if hasattr(self._embed_model, "_embed"):
+                # HuggingFace and ONNX embeddings encode a list in one pass with the query prompt
+                new_embeddings = self._embed_model._embed(missing, prompt_name="query")
+            else:
+                new_embeddings = [self._embed_model.get_query_embedding(q) for q in missing]
+            with self._lock:
+                for query, embedding in zip(missing, new_embeddings):
+                    embeddings[query] = embedding
+                    self._query_cache[query] = embedding
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return [embeddings[query] for query in queries]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if self._disk_cache is None:
+            return self._embed_model.get_text_embedding_batch(texts)
+
+        hashes = [text_hash(t) for t in texts]
+        cached = self._disk_cache.get_many(self.model_name, set(hashes))
+        missing: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in missing:
+                missing[h] = t
+        with self._lock:
+            self._stats["text_hits"] += len(texts) - len(missing)
+            self._stats["text_misses"] += len(missing)
+        if missing:
+            new_embeddings = self._embed_model.get_text_embedding_batch(list(missing.values()))
+            new_items = list(zip(missing.keys(), new_embeddings))
+            self._disk_cache.put_many(self.model_name, new_items)
+            cached.update(new_items)
+        return [cached[h] for h in hashes]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,436 @@
+"""
+Local embedding service: one process holds the embedding model for every worker.
+
+    python -m src.rag_doc_ingestion.embedding_service          # serve on EMBED_SERVICE_SOCKET
+    python -m src.rag_doc_ingestion.embedding_service --stats  # print the service's batching stats
+
+With EMBED_SERVICE_ENABLED, `get_embed_model()` in each uvicorn worker, ingest_docs and
+the fetch tool returns a RemoteEmbedding that talks to this process over a Unix socket
+instead of loading its own copy of the model. Concurrent requests from all clients are
+merged into micro-batches.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# frame: header length, payload length, JSON header, binary payload (float32 matrix)
+_FRAME = struct.Struct(">II")
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def service_socket_path(settings: Optional[DocIngestionSettings] = None) -> str:
+    settings = settings or DocIngestionSettings()
+    return settings.EMBED_SERVICE_SOCKET or os.path.join(settings.VECTOR_STORE_DIR, "embedding_service.sock")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Embedding service connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _send_frame(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    header_bytes = json.dumps(header).encode("utf-8")
+    sock.sendall(_FRAME.pack(len(header_bytes), len(payload)) + header_bytes + payload)
+
+
+def _recv_frame(sock: socket.socket) -> Tuple[dict, bytes]:
+    header_size, payload_size = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    header = json.loads(_recv_exact(sock, header_size))
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+class _Request:
+    __slots__ = ("texts", "kind", "future", "submitted_at")
+
+    def __init__(self, texts: List[str], kind: str):
+        self.texts = texts
+        self.kind = kind
+        self.future: Future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+def _gather(futures: List[Future]) -> Future:
+    """A future for the row-wise concatenation of the embedding matrices of `futures`."""
+    combined: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def part_done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            combined.set_exception(errors[0])
+        else:
+            combined.set_result(np.concatenate([future.result() for future in futures]))
+
+    for future in futures:
+        future.add_done_callback(part_done)
+    return combined
+
+
+class MicroBatcher:
+    """
+    Merges concurrent embedding requests into batches for one model.
+
+    Requests larger than `max_batch_size` are split into parts of at most that many
+    texts, so a bulk ingestion request cannot hold the model for one long call. Query
+    requests wait in their own queue and are always taken before text requests, so a
+    user's query is embedded in the next batch even while ingestion is queued. A batch
+    starts with the next waiting request and takes further ones until the next would
+    take it past `max_batch_size` texts or `max_wait_ms` have passed since it started,
+    then runs one model call per kind (query or text prompt), queries first.
+    """
+
+    def __init__(self, embed_model: BaseEmbedding, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.embed_model = embed_model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = {"query": deque(), "text": deque()}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "split_requests": 0, "parts": 0, "query_parts": 0, "texts": 0, "batches": 0,
+            "errors": 0, "max_batch_texts": 0, "max_queue_depth": 0, "queue_wait_seconds_total": 0.0,
+            "query_wait_seconds_total": 0.0, "embed_seconds_total": 0.0,
+        }
+        self._batch_sizes = [0] * (len(_BATCH_SIZE_BUCKETS) + 1)
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str], kind: str = "text") -> Future:
+        kind = "query" if kind == "query" else "text"
+        parts = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)] or [texts]
+        requests = [_Request(part, kind) for part in parts]
+        with self._cond:
+            self._pending[kind].extend(requests)
+            depth = self._queue_depth()
+            self._cond.notify()
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["split_requests"] += len(requests) > 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        if len(requests) == 1:
+            return requests[0].future
+        return _gather([request.future for request in requests])
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _queue_depth(self) -> int:
+        return len(self._pending["query"]) + len(self._pending["text"])
+
+    def _take(self, limit: int) -> Optional[_Request]:
+        """The next waiting request, queries first, if it has at most `limit` texts. Hold `_cond`."""
+        for kind in ("query", "text"):
+            if self._pending[kind]:
+                if len(self._pending[kind][0].texts) > limit:
+                    return None
+                return self._pending[kind].popleft()
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue_depth():
+                    self._cond.wait()
+                first = self._take(self.max_batch_size)
+                if first is None:
+                    return  # closed and drained
+            batch, size = [first], len(first.texts)
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                with self._cond:
+                    request = self._take(self.max_batch_size - size)
+                    if request is None:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0 or self._closed or self._queue_depth():
+                            # out of time, stopping, or the next request does not fit
+                            break
+                        self._cond.wait(remaining)
+                        continue
+                batch.append(request)
+                size += len(request.texts)
+            self._process(batch)
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        if hasattr(self.embed_model, "_embed"):
+            # HuggingFace and ONNX embeddings encode a list in one pass with the prompt
+            return self.embed_model._embed(texts, prompt_name=kind)
+        if kind == "query":
+            return [self.embed_model.get_query_embedding(text) for text in texts]
+        return self.embed_model.get_text_embedding_batch(texts)
+
+    def _process(self, batch: List[_Request]) -> None:
+        start = time.perf_counter()
+        texts_total = sum(len(request.texts) for request in batch)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["texts"] += texts_total
+            self._stats["max_batch_texts"] = max(self._stats["max_batch_texts"], texts_total)
+            self._stats["parts"] += len(batch)
+            self._stats["queue_wait_seconds_total"] += sum(start - request.submitted_at for request in batch)
+            queries = [request for request in batch if request.kind == "query"]
+            self._stats["query_parts"] += len(queries)
+            self._stats["query_wait_seconds_total"] += sum(start - request.submitted_at for request in queries)
+            bucket = next((i for i, bound in enumerate(_BATCH_SIZE_BUCKETS) if texts_total <= bound),
+                          len(_BATCH_SIZE_BUCKETS))
+            self._batch_sizes[bucket] += 1
+
+        for kind in ("query", "text"):
+            requests = [request for request in batch if request.kind == kind]
+            texts = [text for request in requests for text in request.texts]
+            if not texts:
+                for request in requests:
+                    request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+                continue
+            try:
+                embeddings = np.asarray(self._embed(texts, kind), dtype=np.float32)
+            except Exception as e:
+                logger.exception(f"Embedding batch of {len(texts)} texts failed: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+            offset = 0
+            for request in requests:
+                request.future.set_result(embeddings[offset:offset + len(request.texts)])
+                offset += len(request.texts)
+        with self._lock:
+            self._stats["embed_seconds_total"] += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            batch_sizes = list(self._batch_sizes)
+        with self._cond:
+            stats["queue_depth"] = self._queue_depth()
+        stats["avg_batch_texts"] = round(stats["texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["avg_queue_wait_ms"] = (
+            round(stats["queue_wait_seconds_total"] / stats["parts"] * 1000, 2) if stats["parts"] else 0.0
+        )
+        stats["avg_query_wait_ms"] = (
+            round(stats["query_wait_seconds_total"] / stats["query_parts"] * 1000, 2) if stats["query_parts"] else 0.0
+        )
+        labels = [f"<={bound}" for bound in _BATCH_SIZE_BUCKETS] + [f">{_BATCH_SIZE_BUCKETS[-1]}"]
+        stats["batch_texts_histogram"] = dict(zip(labels, batch_sizes))
+        return stats
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves the frames of one client connection, one request at a time."""
+
+    def handle(self) -> None:
+        service: "EmbeddingService" = self.server.service
+        while True:
+            try:
+                header, _ = _recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                op = header.get("op")
+                if op == "embed":
+                    embeddings = service.batcher.submit(header["texts"], header.get("kind", "text")).result()
+                    _send_frame(self.request, {"shape": list(embeddings.shape)}, embeddings.tobytes())
+                elif op == "info":
+                    _send_frame(self.request, {"model_name": service.embed_model.model_name, "pid": os.getpid(),
+                                               "max_batch_size": service.batcher.max_batch_size})
+                elif op == "stats":
+                    _send_frame(self.request, service.stats())
+                else:
+                    _send_frame(self.request, {"error": f"Unknown operation '{op}'"})
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                _send_frame(self.request, {"error": str(e)})
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class EmbeddingService:
+    """The embedding model behind a Unix socket, shared by every process on the host."""
+
+    def __init__(self, embed_model: BaseEmbedding, socket_path: str, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0):
+        self.embed_model = embed_model
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(embed_model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.started_at = time.time()
+
+    def stats(self) -> dict:
+        return {"model_name": self.embed_model.model_name, "uptime_seconds": round(time.time() - self.started_at, 1),
+                **self.batcher.stats()}
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"An embedding service is already listening on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # left over from a service that did not shut down cleanly
+                os.remove(self.socket_path)
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        server = _UnixServer(self.socket_path, _Handler)
+        server.service = self
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Embedding service for {self.embed_model.model_name} listening on {self.socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.batcher.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logger.info(f"Embedding service stopped: {self.stats()}")
+
+
+class RemoteEmbedding(BaseEmbedding):
+    """
+    Embedding model served by the local EmbeddingService.
+
+    Connections are pooled, so concurrent callers in one process reach the service in
+    parallel and their requests can share a batch there. The model name is the one the
+    service reports, so embedding cache entries are shared with in-process models.
+    """
+
+    _socket_path: str = PrivateAttr()
+    _timeout: float = PrivateAttr()
+    _max_request_texts: Optional[int] = PrivateAttr(default=None)
+    _pool: list = PrivateAttr(default_factory=list)
+    _pool_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, socket_path: str, timeout: float = 60.0, embed_batch_size: int = 256, **kwargs):
+        super().__init__(model_name="remote", embed_batch_size=embed_batch_size, **kwargs)
+        self._socket_path = socket_path
+        self._timeout = timeout
+        # fails here (OSError) if no service is listening
+        info = self._request({"op": "info"})[0]
+        self.model_name = info["model_name"]
+        self._max_request_texts = info.get("max_batch_size")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "RemoteEmbedding"
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        sock.connect(self._socket_path)
+        return sock
+
+    def _request(self, header: dict) -> Tuple[dict, bytes]:
+        with self._pool_lock:
+            sock = self._pool.pop() if self._pool else None
+        for attempt in range(2):
+            if sock is None:
+                sock = self._connect()
+            try:
+                _send_frame(sock, header)
+                response = _recv_frame(sock)
+                break
+            except (ConnectionError, OSError):
+                sock.close()
+                sock = None
+                # a pooled connection may have gone stale (e.g. service restart); retry once
+                if attempt:
+                    raise
+        with self._pool_lock:
+            self._pool.append(sock)
+        if "error" in response[0]:
+            raise RuntimeError(f"Embedding service error: {response[0]['error']}")
+        return response
+
+    def _embed(self, texts: List[str], prompt_name: Optional[str] = None) -> List[List[float]]:
+        # one request per service batch, so a large text request never occupies the
+        # model for longer than one batch and queries from other callers get in between
+        step = self._max_request_texts or max(len(texts), 1)
+        embeddings = []
+        for i in range(0, len(texts), step):
+            header, payload = self._request({"op": "embed", "kind": prompt_name or "text", "texts": texts[i:i + step]})
+            embeddings.extend(np.frombuffer(payload, dtype=np.float32).reshape(header["shape"]).tolist())
+        return embeddings
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed([query], prompt_name="query")[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([text], prompt_name="text")[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, prompt_name="text")
+
+    def service_stats(self) -> dict:
+        return self._request({"op": "stats"})[0]
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Serve the embedding model to local processes over a Unix socket.")
+    arg_parser.add_argument("--socket", help="Socket path (default: EMBED_SERVICE_SOCKET).")
+    arg_parser.add_argument("--stats", action="store_true", help="Print the running service's stats and exit.")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    settings = DocIngestionSettings()
+    socket_path = args.socket or service_socket_path(settings)
+
+    if args.stats:
+        print(json.dumps(RemoteEmbedding(socket_path).service_stats(), indent=2))
+        return 0
+
+    from src.rag_doc_ingestion.embeddings import load_local_embed_model
+
+    service = EmbeddingService(
+        load_local_embed_model(settings),
+        socket_path,
+        max_batch_size=settings.EMBED_SERVICE_MAX_BATCH_SIZE,
+        max_wait_ms=settings.EMBED_SERVICE_MAX_WAIT_MS,
+    )
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
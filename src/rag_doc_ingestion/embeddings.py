@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+from typing import List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+from src.observability.metrics import REGISTRY
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.embedding_cache import CachedEmbedding, EmbeddingCache
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+_embed_model: Optional[BaseEmbedding] = None
+_embed_model_lock = threading.Lock()
+
+
+def load_local_embed_model(settings: Optional[DocIngestionSettings] = None) -> BaseEmbedding:
+    """Load EMBED_MODEL_NAME in this process with the EMBED_BACKEND runtime (uncached)."""
+    settings = settings or DocIngestionSettings()
+    if settings.EMBED_BACKEND.lower() == "onnx":
+        from src.rag_doc_ingestion.onnx_embedding import load_onnx_embedding
+
+        logger.info(f"Loading ONNX embedding model: {settings.EMBED_MODEL_NAME}")
+        return load_onnx_embedding(settings)
+    # imported here so processes using the embedding service never load torch
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    # download & load embedding model
+    logger.info(f"Loading HuggingFace embedding model: {settings.EMBED_MODEL_NAME}")
+    return HuggingFaceEmbedding(model_name=settings.EMBED_MODEL_NAME)
+
+
+def get_embed_model() -> BaseEmbedding:
+    """
+    Return the process-wide embedding model used by ingestion and retrieval.
+
+    The model (HuggingFace, or its ONNX Runtime export with EMBED_BACKEND=onnx) is
+    loaded once and wrapped in a CachedEmbedding so document chunks go through the
+    on-disk embedding cache and queries through an in-memory LRU. With
+    EMBED_SERVICE_ENABLED the model lives in the shared embedding service process and
+    only the caches are kept here; if the service is not running, the model is loaded
+    locally.
+    """
+    global _embed_model
+    if _embed_model is None:
+        with _embed_model_lock:
+            if _embed_model is None:
+                settings = DocIngestionSettings()
+                base_model = None
+                if settings.EMBED_SERVICE_ENABLED:
+                    from src.rag_doc_ingestion.embedding_service import RemoteEmbedding, service_socket_path
+
+                    socket_path = service_socket_path(settings)
+                    try:
+                        base_model = RemoteEmbedding(socket_path, timeout=settings.EMBED_SERVICE_TIMEOUT_SECONDS)
+                        logger.info(f"Using embedding service at {socket_path} ({base_model.model_name})")
+                    except OSError as e:
+                        logger.warning(f"Embedding service at {socket_path} unavailable ({e}); loading the model here")
+                if base_model is None:
+                    base_model = load_local_embed_model(settings)
+                cache_dir = settings.EMBED_CACHE_DIR or os.path.join(settings.VECTOR_STORE_DIR, "embedding_cache")
+                logger.info(f"Using embedding cache at: {cache_dir}")
+                _embed_model = CachedEmbedding(
+                    base_model,
+                    disk_cache=EmbeddingCache(cache_dir, max_entries=settings.EMBED_CACHE_MAX_ENTRIES),
+                    query_cache_size=settings.QUERY_EMBED_CACHE_SIZE,
+                )
+    return _embed_model
+
+
+def _embedding_cache_metrics() -> List[str]:
+    """Expose the embedding cache counters on /metrics once the model is loaded."""
+    if _embed_model is None or not hasattr(_embed_model, "stats"):
+        return []
+    lines = [
+        "# HELP rag_embedding_cache_events_total Embedding cache events by type.",
+        "# TYPE rag_embedding_cache_events_total counter",
+    ]
+    for event, count in sorted(_embed_model.stats().items()):
+        if isinstance(count, (int, float)):
+            lines.append(f'rag_embedding_cache_events_total{{event="{event}"}} {count}')
+    return lines
+
+
+def _embedding_service_metrics() -> List[str]:
+    """Expose the shared embedding service's batching stats when this process uses it."""
+    inner_model = getattr(_embed_model, "inner_model", None)
+    if not hasattr(inner_model, "service_stats"):
+        return []
+    lines = [
+        "# HELP rag_embedding_service Embedding service queue and micro-batching stats.",
+        "# TYPE rag_embedding_service gauge",
+    ]
+    for stat, value in sorted(inner_model.service_stats().items()):
+        if isinstance(value, (int, float)):
+            lines.append(f'rag_embedding_service{{stat="{stat}"}} {value}')
+    return lines
+
+
+REGISTRY.register_collector(_embedding_cache_metrics)
+REGISTRY.register_collector(_embedding_service_metrics)
@@ -1,12 +1,21 @@
+import argparse
 import logging
+import os
+import time
+from typing import Iterator, List
 
-import chromadb
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, StorageContext
-from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from llama_index.vector_stores.chroma import ChromaVectorStore
+from llama_index.core import Document, SimpleDirectoryReader
 
 from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.dedup import get_dedup_index
+from src.rag_doc_ingestion.embeddings import get_embed_model
+from src.rag_doc_ingestion.manifest import IngestionManifest
+from src.rag_doc_ingestion.pdf_extraction import iter_pdf_documents
+from src.rag_doc_ingestion.pipeline import IngestionPipeline
+from src.rag_doc_ingestion.sparse_index import get_sparse_index
+from src.rag_doc_ingestion.store_version import bump_store_version, read_store_version, written_by_this_process
+from src.rag_doc_ingestion.vector_store import delete_file_chunks, get_vector_store
+from src.rag_doc_ingestion.writer_lock import store_writer_lock
 
 
 # Set up logging configuration
@@ -20,41 +29,132 @@ logger = logging.getLogger(__name__)
 
 # Load settings from environment variables
 settings = DocIngestionSettings()
-# download & load embedding model
-logger.info("Loading HuggingFace embedding model...")
-embed_model = HuggingFaceEmbedding()
+# download & load embedding model (shared embedding cache)
+embed_model = get_embed_model()
 
 
-def build_vector_store_from_documents():
+def _list_document_files(docs_dir_path: str) -> List[str]:
+    """Files SimpleDirectoryReader(input_dir=...) would load: top level, non-hidden."""
+    files = []
+    for name in sorted(os.listdir(docs_dir_path)):
+        path = os.path.abspath(os.path.join(docs_dir_path, name))
+        if name.startswith(".") or not os.path.isfile(path):
+            continue
+        files.append(path)
+    return files
+
+
+def _iter_documents(paths: List[str]) -> Iterator[Document]:
+    """
+    Stream Documents for `paths` one file at a time.
+
+    PDFs go through the PDF extraction pool (one Document per page), every other
+    file type through SimpleDirectoryReader.
+    """
+    pdf_paths = [p for p in paths if p.lower().endswith(".pdf")]
+    other_paths = [p for p in paths if not p.lower().endswith(".pdf")]
+    yield from iter_pdf_documents([
+        (
+            path,
+            {
+                "file_path": path,
+                "file_name": os.path.basename(path),
+                "file_type": "application/pdf",
+                "file_size": os.path.getsize(path),
+                # local documents are scoped by file name (fetched papers by arXiv id)
+                "paper_id": os.path.basename(path),
+            },
+        )
+        for path in pdf_paths
+    ])
+    for path in other_paths:
+        for document in SimpleDirectoryReader(input_files=[path]).load_data():
+            document.metadata["paper_id"] = os.path.basename(path)
+            document.excluded_embed_metadata_keys.append("paper_id")
+            document.excluded_llm_metadata_keys.append("paper_id")
+            yield document
+
+
+def build_vector_store_from_documents(full_rebuild: bool = False) -> int:
+    """
+    Incrementally sync DOCUMENTS_DIR into the vector store (VECTOR_BACKEND).
+
+    A manifest of file path, size, mtime and content hash decides which files are new,
+    changed, unchanged or removed. Only new and changed files are streamed through the
+    ingestion pipeline; the chunks of changed and removed files are deleted from the
+    collection and the sparse index first. Files whose chunks were skipped as
+    near-duplicates of deleted chunks are re-ingested, so their content stays stored.
+    With `full_rebuild`, every file is re-ingested; the manifest is still read so the
+    chunks of files removed since the last run are deleted.
+    """
     logger.info("Starting vector store ingestion process.")
+    start = time.perf_counter()
     try:
         docs_dir_path = settings.DOCUMENTS_DIR
         vector_store_path = settings.VECTOR_STORE_DIR
-        collection_name = settings.COLLECTION_NAME
-        logger.info(f"Loading documents from directory: {docs_dir_path}")
-        loader = SimpleDirectoryReader(input_dir=docs_dir_path)
-        documents = loader.load_data()
-        # Create parser with chunking strategy
-        parser = SimpleNodeParser.from_defaults(chunk_size=1024, chunk_overlap=50)
-        logger.info("Parsing documents into nodes.")
-        nodes = parser.get_nodes_from_documents(documents)
-        logger.info(f"Parsed {len(nodes)} nodes.")
-        logger.info(f"Initializing ChromaDB persistent client at: {vector_store_path}")
-        db = chromadb.PersistentClient(path=vector_store_path)
-        # Create or retrieve the vector collection
-        chroma_collection = db.get_or_create_collection(name=collection_name)
-        logger.info(f"Creating Chroma vector store with collection name: {collection_name}")
-        vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-        # Create storage context
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
-        logger.info("Building vector store index.")
-        index = VectorStoreIndex(
-            nodes,
-            storage_context=storage_context,
-            vector_store=vector_store,
-            embed_model=embed_model
-        )
-        logger.info("Vector store build successfully.")
+        manifest_path = settings.INGEST_MANIFEST_PATH or os.path.join(vector_store_path, "ingest_manifest.json")
+
+        # the manifest, vector store and sparse index have one writer at a time
+        with store_writer_lock(vector_store_path, timeout=settings.STORE_WRITE_LOCK_TIMEOUT_SECONDS):
+            manifest = IngestionManifest.load(manifest_path)
+            logger.info(f"Scanning documents directory: {docs_dir_path}")
+            diff = manifest.diff(_list_document_files(docs_dir_path), force=full_rebuild)
+            to_ingest = diff.added + diff.updated
+            pipeline_report = {}
+
+            if to_ingest or diff.removed:
+                # reopen storage if another worker wrote since this process last did
+                current_version = read_store_version(vector_store_path)
+                vector_store = get_vector_store(
+                    settings, fresh=bool(current_version) and not written_by_this_process(current_version)
+                )
+                sparse_index = get_sparse_index()
+                dedup_index = get_dedup_index() if settings.DEDUP_ENABLED else None
+                # Drop stale chunks. New files are included so chunks written before the
+                # manifest existed are not duplicated.
+                stale = to_ingest + diff.removed
+                while stale:
+                    orphaned = set()
+                    for path in stale:
+                        delete_file_chunks(vector_store, path)
+                        sparse_index.delete_file(path)
+                        if dedup_index is not None:
+                            orphaned.update(dedup_index.delete_file(path))
+                    # unchanged files that relied on the deleted chunks as their kept copies
+                    stale = [path for path in diff.unchanged if path in orphaned]
+                    for path in stale:
+                        diff.unchanged.remove(path)
+                        diff.updated.append(path)
+                        to_ingest.append(path)
+                    if stale:
+                        logger.info(f"Re-ingesting {len(stale)} documents whose duplicate chunks were deleted.")
+
+                if to_ingest:
+                    logger.info(f"Ingesting {len(to_ingest)} new or changed documents.")
+                    pipeline = IngestionPipeline(
+                        vector_store=vector_store,
+                        embed_model=embed_model,
+                        on_upsert=sparse_index.add_nodes,
+                        dedup_index=dedup_index,
+                    )
+                    pipeline_report = pipeline.run(_iter_documents(to_ingest))
+                # chunks are tagged with the file name as their paper_id
+                bump_store_version(
+                    vector_store_path, paper_ids=[os.path.basename(path) for path in to_ingest + diff.removed]
+                )
+
+            manifest.apply(diff)
+            manifest.save()
+
+        report = {
+            **pipeline_report,
+            "added": len(diff.added),
+            "updated": len(diff.updated),
+            "skipped": len(diff.unchanged),
+            "deleted": len(diff.removed),
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"Vector store sync finished: {report}")
         return 0
     except Exception as e:
         logger.error(f"Error during vector store build: {e}")
@@ -62,4 +162,11 @@ def build_vector_store_from_documents():
 
 
 if __name__ == "__main__":
-    build_vector_store_from_documents()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="Sync DOCUMENTS_DIR into the vector store.")
+    arg_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-ingest every document, not only new and changed ones.",
+    )
+    args = arg_parser.parse_args()
+    build_vector_store_from_documents(full_rebuild=args.full)
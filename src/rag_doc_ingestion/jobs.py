@@ -0,0 +1,192 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# finished, but part of the work failed (e.g. some paper downloads)
+PARTIALLY_FAILED = "partially_failed"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the ingestion job queue cannot take another job."""
+
+
+class IngestionJob:
+    """
+    A unit of background ingestion work and its observable state.
+
+    The worker thread changes the state while API requests read it, so every update
+    and every read goes through `_lock`.
+    """
+
+    def __init__(self, key: str, description: str = ""):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.description = description
+        self.status = QUEUED
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update_progress(self, **progress) -> None:
+        with self._lock:
+            self.progress.update(progress)
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+
+    def mark_finished(self, result: Any = None, error: Optional[str] = None) -> None:
+        """
+        Record the outcome; status, result, error and finish time change together.
+
+        A result dict with a non-empty `failed` list marks the job partially failed.
+        """
+        with self._lock:
+            self.result = result
+            self.error = error
+            if error is not None:
+                self.status = FAILED
+            elif isinstance(result, dict) and result.get("failed"):
+                self.status = PARTIALLY_FAILED
+            else:
+                self.status = SUCCEEDED
+            self.finished_at = time.time()
+
+    def get_status(self) -> str:
+        with self._lock:
+            return self.status
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "key": self.key,
+                "description": self.description,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class IngestionJobQueue:
+    """
+    Bounded queue of ingestion jobs served by a small pool of worker threads.
+
+    Jobs are identified by a caller-chosen key; submitting a key that is already
+    queued or running returns the existing job instead of adding a duplicate.
+    Finished jobs are kept for status polling up to `max_history` entries.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 32, max_history: int = 200):
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._active_by_key: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        if len(self._workers) >= self.max_workers:
+            return
+        for i in range(len(self._workers), self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"ingestion-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, key: str, fn: Callable[[IngestionJob], Any], description: str = "") -> IngestionJob:
+        """Queue `fn(job)` under `key`, or return the queued/running job with the same key."""
+        with self._lock:
+            existing = self._active_by_key.get(key)
+            if existing is not None:
+                logger.info(f"Ingestion job for '{key}' already {existing.get_status()}: {existing.id}")
+                return existing
+            job = IngestionJob(key, description)
+            try:
+                self._queue.put_nowait((job, fn))
+            except queue.Full:
+                raise JobQueueFull(f"Ingestion queue is full ({self._queue.maxsize} jobs)")
+            self._jobs[job.id] = job
+            self._active_by_key[key] = job
+            self._prune_history()
+            self._ensure_workers()
+        logger.info(f"Queued ingestion job {job.id} for '{key}'")
+        return job
+
+    def _prune_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.get_status() in (SUCCEEDED, PARTIALLY_FAILED, FAILED)]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job, fn = self._queue.get()
+            job.mark_running()
+            logger.info(f"Running ingestion job {job.id} ({job.description or job.key})")
+            try:
+                job.mark_finished(result=fn(job))
+            except Exception as e:
+                logger.exception(f"Ingestion job {job.id} failed: {e}")
+                job.mark_finished(error=str(e))
+            finally:
+                with self._lock:
+                    if self._active_by_key.get(job.key) is job:
+                        del self._active_by_key[job.key]
+                self._queue.task_done()
+            snapshot = job.to_dict()
+            logger.info(
+                f"Ingestion job {job.id} {snapshot['status']} in "
+                f"{snapshot['finished_at'] - snapshot['started_at']:.2f}s"
+            )
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, statuses: Optional[List[str]] = None) -> List[IngestionJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if statuses:
+            jobs = [job for job in jobs if job.get_status() in statuses]
+        return jobs
+
+
+_job_queue: Optional[IngestionJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> IngestionJobQueue:
+    """Return the process-wide ingestion job queue."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                settings = DocIngestionSettings()
+                _job_queue = IngestionJobQueue(
+                    max_workers=settings.INGEST_JOB_WORKERS,
+                    max_queued=settings.INGEST_JOB_QUEUE_SIZE,
+                    max_history=settings.INGEST_JOB_HISTORY,
+                )
+    return _job_queue
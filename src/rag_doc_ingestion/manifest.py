@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Hash a file's content without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestDiff:
+    """Files grouped by what ingestion has to do with them."""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    entries: Dict[str, dict] = field(default_factory=dict)
+
+
+class IngestionManifest:
+    """
+    Record of the files that are already in the vector store.
+
+    Each entry keeps the file's size, mtime and content hash. Files whose size and mtime
+    are unchanged are skipped without hashing; otherwise the content hash decides.
+    """
+
+    def __init__(self, path: str, files: Dict[str, dict] = None):
+        self.path = path
+        self.files: Dict[str, dict] = files or {}
+
+    @classmethod
+    def load(cls, path: str) -> "IngestionManifest":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, data.get("files", {}))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read ingestion manifest {path}, starting fresh: {e}")
+            return cls(path)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.files}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def diff(self, paths: List[str], force: bool = False) -> ManifestDiff:
+        """
+        Compare the files currently on disk with the manifest.
+
+        With `force`, every file on disk is reported as added or updated, while removed
+        files are still found against the manifest.
+        """
+        result = ManifestDiff()
+        for path in paths:
+            stat = os.stat(path)
+            previous = self.files.get(path)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+            if force:
+                entry["sha256"] = file_sha256(path)
+                result.entries[path] = entry
+                (result.updated if previous else result.added).append(path)
+                continue
+            if previous and previous["size"] == entry["size"] and previous["mtime"] == entry["mtime"]:
+                result.unchanged.append(path)
+                result.entries[path] = previous
+                continue
+            entry["sha256"] = file_sha256(path)
+            result.entries[path] = entry
+            if previous is None:
+                result.added.append(path)
+            elif previous.get("sha256") == entry["sha256"]:
+                # touched but not modified
+                result.unchanged.append(path)
+            else:
+                result.updated.append(path)
+        current = set(paths)
+        result.removed = [p for p in self.files if p not in current]
+        return result
+
+    def apply(self, diff: ManifestDiff) -> None:
+        """Replace the manifest entries with the state described by `diff`."""
+        self.files = dict(diff.entries)
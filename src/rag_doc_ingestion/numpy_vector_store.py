@@ -0,0 +1,467 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+HEADER_FILE = "header.json"
+FLOAT_FILE = "vectors.f32"
+INT8_FILE = "vectors.i8"
+SCALES_FILE = "scales.f32"
+NODES_FILE = "nodes.jsonl"
+
+# rows scored per block; keeps the float32 copy of int8 rows cache-sized
+_SCORE_BLOCK_ROWS = 4096
+# metadata key whose rows are indexed, so paper-scoped queries skip the other papers
+PAPER_ID_KEY = "paper_id"
+
+
+def _matches(metadata: dict, filters: Optional[MetadataFilters]) -> bool:
+    if filters is None or not filters.filters:
+        return True
+    results = []
+    for f in filters.filters:
+        if isinstance(f, MetadataFilters):
+            results.append(_matches(metadata, f))
+            continue
+        value = metadata.get(f.key)
+        if f.operator == FilterOperator.EQ:
+            results.append(value == f.value)
+        elif f.operator == FilterOperator.NE:
+            results.append(value != f.value)
+        elif f.operator == FilterOperator.IN:
+            results.append(value in f.value)
+        elif f.operator == FilterOperator.NIN:
+            results.append(value not in f.value)
+        else:
+            raise ValueError(f"Unsupported metadata filter operator for the numpy vector store: {f.operator}")
+    if filters.condition == FilterCondition.OR:
+        return any(results)
+    return all(results)
+
+
+def _scoped_paper_ids(filters: Optional[MetadataFilters]) -> Optional[List[str]]:
+    """
+    The paper ids a top-level `paper_id` EQ/IN filter restricts the query to.
+
+    Returns None when the filters do not pin paper_id, e.g. under an OR condition.
+    """
+    if filters is None or not filters.filters:
+        return None
+    if filters.condition == FilterCondition.OR and len(filters.filters) > 1:
+        return None
+    for f in filters.filters:
+        if isinstance(f, MetadataFilters) or f.key != PAPER_ID_KEY:
+            continue
+        if f.operator == FilterOperator.EQ:
+            return [f.value]
+        if f.operator == FilterOperator.IN:
+            return list(f.value)
+    return None
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    Flat vector store over memory-mapped NumPy matrices.
+
+    Embeddings are L2-normalised and appended to a float32 matrix and to an int8 copy
+    with per-row scales; node text and metadata go to a JSON-lines sidecar. A header
+    file holds the committed row count and is replaced atomically after each append,
+    so readers only ever map complete rows. Deletes append tombstones to the sidecar.
+    In memory a store keeps only each row's node id and byte offset into the sidecar,
+    plus paper_id and ref_doc_id indexes; text and metadata are read back from the
+    sidecar for the rows a query returns.
+
+    Readers open the matrices read-only with np.memmap, so several worker processes
+    share the same pages through the OS page cache. With `quantize`, a query first
+    scores the int8 matrix and then rescores the best `rescore_factor * top_k` rows
+    exactly against the float32 matrix. Rows are also indexed by `paper_id`, so a
+    query filtered to a few papers only scores those papers' rows.
+    """
+
+    stores_text: bool = True
+    flat_metadata: bool = False
+
+    persist_dir: str
+    quantize: bool = True
+    rescore_factor: int = 4
+
+    _lock: Any = PrivateAttr()
+    _dim: Optional[int] = PrivateAttr(default=None)
+    _count: int = PrivateAttr(default=0)
+    _vectors: Optional[np.ndarray] = PrivateAttr(default=None)
+    _int8: Optional[np.ndarray] = PrivateAttr(default=None)
+    _scales: Optional[np.ndarray] = PrivateAttr(default=None)
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _offsets: Optional[np.ndarray] = PrivateAttr(default=None)
+    _row_by_id: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _live: Optional[np.ndarray] = PrivateAttr(default=None)
+    _rows_by_paper: Dict[str, np.ndarray] = PrivateAttr(default_factory=dict)
+    _rows_by_ref_doc: Dict[str, List[int]] = PrivateAttr(default_factory=dict)
+    _nodes_end: int = PrivateAttr(default=0)
+    _signature: Any = PrivateAttr(default=None)
+
+    def __init__(self, persist_dir: str, quantize: bool = True, rescore_factor: int = 4, **kwargs: Any):
+        super().__init__(persist_dir=persist_dir, quantize=quantize, rescore_factor=rescore_factor, **kwargs)
+        self._lock = threading.RLock()
+        self._load()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_dir, name)
+
+    def _files_signature(self) -> tuple:
+        signature = []
+        for name in (HEADER_FILE, NODES_FILE):
+            try:
+                stat = os.stat(self._path(name))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self) -> bool:
+        """Reload if another writer changed the files since they were loaded; returns True if reloaded."""
+        with self._lock:
+            if self._files_signature() == self._signature:
+                return False
+            self._load()
+            return True
+
+    def _map(self) -> None:
+        """Map the first `_count` rows of the matrices read-only."""
+        self._vectors = self._int8 = self._scales = None
+        if self._count:
+            shape = (self._count, self._dim)
+            self._vectors = np.memmap(self._path(FLOAT_FILE), dtype=np.float32, mode="r", shape=shape)
+            if self.quantize:
+                self._int8 = np.memmap(self._path(INT8_FILE), dtype=np.int8, mode="r", shape=shape)
+                self._scales = np.memmap(self._path(SCALES_FILE), dtype=np.float32, mode="r", shape=(self._count,))
+
+    def _load(self) -> None:
+        """(Re)map the committed rows and replay the metadata sidecar."""
+        header_path = self._path(HEADER_FILE)
+        if os.path.exists(header_path):
+            with open(header_path, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            self._dim, self._count = header["dim"], header["count"]
+        else:
+            self._dim, self._count = None, 0
+        self._map()
+
+        self._ids = []
+        self._row_by_id = {}
+        self._rows_by_paper = {}
+        self._rows_by_ref_doc = {}
+        offsets = []
+        keys = []
+        live = np.zeros(self._count, dtype=bool)
+        # byte offset just past the last line covered by the header
+        self._nodes_end = 0
+        if os.path.exists(self._path(NODES_FILE)):
+            with open(self._path(NODES_FILE), "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # a write in progress; the header does not cover it yet
+                    if "delete" in record:
+                        self._nodes_end += len(line)
+                        row = self._row_by_id.pop(record["delete"], None)
+                        if row is not None:
+                            live[row] = False
+                        continue
+                    if len(self._ids) >= self._count:
+                        break
+                    row = len(self._ids)
+                    offsets.append(self._nodes_end)
+                    keys.append(self._index_keys(record))
+                    self._nodes_end += len(line)
+                    self._ids.append(record["id"])
+                    previous = self._row_by_id.get(record["id"])
+                    if previous is not None:
+                        live[previous] = False
+                    self._row_by_id[record["id"]] = row
+                    live[row] = True
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._live = live
+        self._index_rows(0, keys)
+        self._signature = self._files_signature()
+
+    @staticmethod
+    def _index_keys(record: dict) -> Tuple[Optional[str], Optional[str]]:
+        metadata = record["metadata"]
+        return metadata.get(PAPER_ID_KEY), metadata.get("ref_doc_id") or metadata.get("doc_id")
+
+    def _index_rows(self, start: int, keys: List[Tuple[Optional[str], Optional[str]]]) -> None:
+        """Add rows from `start` on, given their (paper_id, ref_doc_id), to the lookup indexes."""
+        rows_by_paper: Dict[str, List[int]] = {}
+        for row, (paper_id, ref_doc_id) in enumerate(keys, start):
+            if paper_id is not None:
+                rows_by_paper.setdefault(paper_id, []).append(row)
+            if ref_doc_id is not None:
+                self._rows_by_ref_doc.setdefault(ref_doc_id, []).append(row)
+        for paper_id, rows in rows_by_paper.items():
+            new_rows = np.asarray(rows, dtype=np.int64)
+            previous = self._rows_by_paper.get(paper_id)
+            self._rows_by_paper[paper_id] = new_rows if previous is None else np.concatenate([previous, new_rows])
+
+    def _write_header(self) -> None:
+        tmp_path = self._path(HEADER_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self._dim, "count": self._count}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(HEADER_FILE))
+
+    def _discard_uncommitted(self) -> None:
+        """
+        Truncate what an interrupted write left past the committed rows.
+
+        Appends must start at row `_count`; bytes beyond it would shift every later
+        row against its record in the sidecar.
+        """
+        row_bytes = {FLOAT_FILE: 4 * (self._dim or 0), INT8_FILE: self._dim or 0, SCALES_FILE: 4}
+        sizes = {name: self._count * size for name, size in row_bytes.items()}
+        sizes[NODES_FILE] = self._nodes_end
+        for name, size in sizes.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                logger.warning(f"Discarding {os.path.getsize(path) - size} uncommitted bytes from {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def _append_tombstones(self, node_ids: List[str]) -> None:
+        if not node_ids:
+            return
+        self._discard_uncommitted()
+        with open(self._path(NODES_FILE), "a", encoding="utf-8") as f:
+            for node_id in node_ids:
+                f.write(json.dumps({"delete": node_id}) + "\n")
+        self._nodes_end = os.path.getsize(self._path(NODES_FILE))
+        for node_id in node_ids:
+            row = self._row_by_id.pop(node_id, None)
+            if row is not None:
+                self._live[row] = False
+        self._signature = self._files_signature()
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        if not nodes:
+            return []
+        vectors = np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        quantized = np.round(vectors / np.where(scales > 0, scales, 1.0)[:, None]).astype(np.int8)
+
+        with self._lock:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            self._discard_uncommitted()
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's {self._dim}")
+
+            # re-added ids replace their previous rows
+            self._append_tombstones([node.node_id for node in nodes if node.node_id in self._row_by_id])
+            with open(self._path(FLOAT_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path(INT8_FILE), "ab") as f:
+                f.write(quantized.tobytes())
+            with open(self._path(SCALES_FILE), "ab") as f:
+                f.write(scales.astype(np.float32).tobytes())
+            records = [
+                {
+                    "id": node.node_id,
+                    "text": node.get_content(),
+                    "metadata": node_to_metadata_dict(node, remove_text=True, flat_metadata=False),
+                }
+                for node in nodes
+            ]
+            lines = [(json.dumps(record) + "\n").encode("utf-8") for record in records]
+            offsets = self._nodes_end + np.cumsum([0] + [len(line) for line in lines[:-1]], dtype=np.int64)
+            with open(self._path(NODES_FILE), "ab") as f:
+                f.write(b"".join(lines))
+            self._nodes_end = os.path.getsize(self._path(NODES_FILE))
+            self._count += len(nodes)
+            self._write_header()
+
+            start = len(self._ids)
+            for record in records:
+                self._row_by_id[record["id"]] = len(self._ids)
+                self._ids.append(record["id"])
+            self._offsets = np.concatenate([self._offsets, offsets])
+            self._live = np.concatenate([self._live, np.ones(len(records), dtype=bool)])
+            self._index_rows(start, [self._index_keys(record) for record in records])
+            self._map()
+            self._signature = self._files_signature()
+        return [node.node_id for node in nodes]
+
+    def _read_records(self, rows: Iterable[int]) -> List[dict]:
+        """Read the sidecar records of `rows`, in the order given."""
+        records = []
+        with open(self._path(NODES_FILE), "rb") as f:
+            for row in rows:
+                f.seek(int(self._offsets[row]))
+                records.append(json.loads(f.readline()))
+        return records
+
+    @staticmethod
+    def _to_node(record: dict) -> BaseNode:
+        node = metadata_dict_to_node(record["metadata"], text=record["text"])
+        node.embedding = None
+        return node
+
+    def _rows_matching(self, filters: Optional[MetadataFilters]) -> np.ndarray:
+        if filters is None or not filters.filters:
+            return self._live.copy()
+        paper_ids = _scoped_paper_ids(filters)
+        if paper_ids is None:
+            candidates = np.flatnonzero(self._live)
+        else:
+            # tombstoned and replaced rows stay in the index; `_live` masks them out
+            paper_rows = [self._rows_by_paper[p] for p in set(paper_ids) if p in self._rows_by_paper]
+            candidates = np.concatenate(paper_rows) if paper_rows else np.zeros(0, dtype=np.int64)
+            candidates = candidates[self._live[candidates]]
+        allowed = np.zeros(self._count, dtype=bool)
+        if paper_ids is not None and len(filters.filters) == 1:
+            allowed[candidates] = True
+            return allowed
+        for row, record in zip(candidates, self._read_records(candidates)):
+            if _matches(record["metadata"], filters):
+                allowed[row] = True
+        return allowed
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        with self._lock:
+            rows = self._rows_by_ref_doc.get(ref_doc_id, [])
+            self._append_tombstones([self._ids[row] for row in rows if self._live[row]])
+
+    def delete_nodes(
+        self,
+        node_ids: Optional[List[str]] = None,
+        filters: Optional[MetadataFilters] = None,
+        **delete_kwargs: Any,
+    ) -> None:
+        if not node_ids and not filters:
+            return
+        with self._lock:
+            candidates = node_ids if node_ids is not None else list(self._row_by_id)
+            candidates = [node_id for node_id in candidates if node_id in self._row_by_id]
+            if filters is not None:
+                records = self._read_records(self._row_by_id[node_id] for node_id in candidates)
+                candidates = [record["id"] for record in records if _matches(record["metadata"], filters)]
+            self._append_tombstones(candidates)
+
+    def get_nodes(
+        self,
+        node_ids: Optional[List[str]] = None,
+        filters: Optional[MetadataFilters] = None,
+        **kwargs: Any,
+    ) -> List[BaseNode]:
+        with self._lock:
+            candidates = node_ids if node_ids is not None else list(self._row_by_id)
+            rows = [self._row_by_id[node_id] for node_id in candidates if node_id in self._row_by_id]
+            records = self._read_records(rows)
+            return [self._to_node(record) for record in records if _matches(record["metadata"], filters)]
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in (HEADER_FILE, FLOAT_FILE, INT8_FILE, SCALES_FILE, NODES_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._load()
+
+    @staticmethod
+    def _block_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], _SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + _SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + _SCORE_BLOCK_ROWS] = block @ query
+        return scores
+
+    @staticmethod
+    def _row_scores(matrix: np.ndarray, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Score only `rows` (sorted), gathering them from the memory map block by block."""
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for start in range(0, rows.shape[0], _SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[rows[start:start + _SCORE_BLOCK_ROWS]], dtype=np.float32)
+            scores[start:start + _SCORE_BLOCK_ROWS] = block @ query
+        return scores
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        if k >= scores.shape[0]:
+            return np.argsort(-scores)
+        top = np.argpartition(-scores, k)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        with self._lock:
+            allowed = self._rows_matching(query.filters) if self._count else np.zeros(0, dtype=bool)
+            if query.node_ids:
+                allowed &= np.isin(np.arange(self._count), [self._row_by_id.get(i, -1) for i in query.node_ids])
+            n_allowed = int(allowed.sum())
+            if not n_allowed or query.query_embedding is None:
+                return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+            q = np.asarray(query.query_embedding, dtype=np.float32)
+            q /= np.linalg.norm(q) or 1.0
+            k = min(query.similarity_top_k, n_allowed)
+
+            # a scoped query gathers and scores only its rows instead of the whole matrix
+            subset = np.flatnonzero(allowed) if 2 * n_allowed < self._count else None
+
+            if self.quantize and self._int8 is not None:
+                if subset is not None:
+                    approx = self._row_scores(self._int8, subset, q) * self._scales[subset]
+                    candidates = subset[self._top(approx, min(k * self.rescore_factor, n_allowed))]
+                else:
+                    approx = self._block_scores(self._int8, q) * self._scales
+                    approx[~allowed] = -np.inf
+                    candidates = self._top(approx, min(k * self.rescore_factor, n_allowed))
+                candidates = np.sort(candidates)
+                exact = np.asarray(self._vectors[candidates]) @ q
+                order = self._top(exact, k)
+                rows, similarities = candidates[order], exact[order]
+            elif subset is not None:
+                exact = self._row_scores(self._vectors, subset, q)
+                order = self._top(exact, k)
+                rows, similarities = subset[order], exact[order]
+            else:
+                exact = self._block_scores(self._vectors, q)
+                exact[~allowed] = -np.inf
+                rows = self._top(exact, k)
+                similarities = exact[rows]
+
+            nodes = [self._to_node(record) for record in self._read_records(rows)]
+        return VectorStoreQueryResult(
+            nodes=nodes,
+            similarities=[float(s) for s in similarities],
+            ids=[node.node_id for node in nodes],
+        )
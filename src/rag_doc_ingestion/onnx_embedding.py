@@ -0,0 +1,354 @@
+"""
+ONNX Runtime embedding backend (EMBED_BACKEND=onnx) and its parity/throughput check.
+
+The configured sentence-transformers model is exported to ONNX once, optionally with
+int8 dynamic quantization, and run on CPU with ONNX Runtime. Compare it against the
+HuggingFace baseline on a sample of passages before switching:
+
+    python -m src.rag_doc_ingestion.onnx_embedding passages.txt --queries queries.txt
+
+Requires `onnxruntime` for inference, and `torch` (already needed by the HuggingFace
+backend) for the one-time export.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.writer_lock import exclusive_file_lock
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+EXPORT_INFO_FILE = "export.json"
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+_INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("EMBED_BACKEND=onnx needs onnxruntime: pip install onnxruntime") from e
+    return onnxruntime
+
+
+def default_export_dir(settings: DocIngestionSettings) -> str:
+    return settings.EMBED_ONNX_DIR or os.path.join(
+        settings.VECTOR_STORE_DIR, "onnx", settings.EMBED_MODEL_NAME.replace("/", "__")
+    )
+
+
+def _read_export_info(export_dir: str) -> Optional[dict]:
+    """The export's export.json, or None if the export is missing or incomplete."""
+    try:
+        with open(os.path.join(export_dir, EXPORT_INFO_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _export_graph(model_name: str, export_dir: str) -> dict:
+    """Export the transformer graph and tokenizer to `export_dir`; returns the export info."""
+    import torch
+    from llama_index.embeddings.huggingface.utils import (
+        get_query_instruct_for_model_name,
+        get_text_instruct_for_model_name,
+    )
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    pooling = st_model[1].get_pooling_mode_str() if len(st_model) > 1 else "mean"
+
+    sample = tokenizer(["an export sample sentence"], return_tensors="pt")
+    input_names = [name for name in _INPUT_NAMES if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            os.path.join(export_dir, FP32_MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            do_constant_folding=True,
+        )
+    tokenizer.save_pretrained(export_dir)
+    return {
+        "model_name": model_name,
+        "pooling": pooling,
+        "max_length": st_model.max_seq_length,
+        "query_prompt": get_query_instruct_for_model_name(model_name),
+        "text_prompt": get_text_instruct_for_model_name(model_name),
+    }
+
+
+def _quantize_graph(model_path: str, output_path: str) -> None:
+    _require_onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+
+
+def export_onnx_model(model_name: str, export_dir: str, quantize: bool = True) -> dict:
+    """
+    Export `model_name` to ONNX under `export_dir` (skipped if already exported).
+
+    Writes the transformer graph (dynamic batch and sequence axes), its tokenizer and
+    an export.json with the pooling mode, max sequence length and prompts; with
+    `quantize`, also an int8 (dynamic, weight-only) copy of the graph.
+
+    Workers that start at the same time take turns on a flock next to the export dir,
+    and the export is built in a temporary directory that is renamed into place with
+    export.json written last, so a reader never loads a half-written graph.
+    """
+    int8_path = os.path.join(export_dir, INT8_MODEL_FILE)
+    info = _read_export_info(export_dir)
+    if info is not None and (not quantize or os.path.exists(int8_path)):
+        return info
+
+    export_dir = os.path.abspath(export_dir)
+    with exclusive_file_lock(export_dir + ".lock"):
+        # another worker may have finished the export while this one waited
+        info = _read_export_info(export_dir)
+        if info is None:
+            logger.info(f"Exporting embedding model {model_name} to ONNX in {export_dir}")
+            start = time.perf_counter()
+            tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(export_dir)}.", dir=os.path.dirname(export_dir))
+            try:
+                info = _export_graph(model_name, tmp_dir)
+                if quantize:
+                    logger.info(f"Quantizing {model_name} ONNX graph to int8")
+                    _quantize_graph(os.path.join(tmp_dir, FP32_MODEL_FILE), os.path.join(tmp_dir, INT8_MODEL_FILE))
+                with open(os.path.join(tmp_dir, EXPORT_INFO_FILE), "w", encoding="utf-8") as f:
+                    json.dump(info, f, indent=2)
+                # an export interrupted before this change wrote straight into export_dir
+                shutil.rmtree(export_dir, ignore_errors=True)
+                os.replace(tmp_dir, export_dir)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            logger.info(f"Exported {model_name} in {time.perf_counter() - start:.1f}s")
+        elif quantize and not os.path.exists(int8_path):
+            logger.info(f"Quantizing {model_name} ONNX graph to int8")
+            tmp_path = f"{int8_path}.{os.getpid()}.tmp"
+            try:
+                _quantize_graph(os.path.join(export_dir, FP32_MODEL_FILE), tmp_path)
+                os.replace(tmp_path, int8_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return info
+
+
+class OnnxEmbedding(BaseEmbedding):
+    """
+    Sentence embeddings from an exported ONNX graph run with ONNX Runtime on CPU.
+
+    Texts of a call are tokenized once, sorted by length and grouped into batches of at
+    most `max_batch_tokens` padded tokens, so short chunks are not padded to the length
+    of the longest one and long ones run in smaller batches. Results are returned in
+    input order. Pooling, prompts and normalization match the sentence-transformers
+    model the graph was exported from.
+    """
+
+    _session = PrivateAttr()
+    _tokenizer = PrivateAttr()
+    _input_names: List[str] = PrivateAttr()
+    _pooling: str = PrivateAttr()
+    _max_length: int = PrivateAttr()
+    _max_batch_tokens: int = PrivateAttr()
+    _prompts: dict = PrivateAttr()
+
+    def __init__(self, export_dir: str, quantized: bool = True, num_threads: int = 0,
+                 max_batch_tokens: int = 8192, embed_batch_size: int = 256, **kwargs):
+        onnxruntime = _require_onnxruntime()
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(export_dir, EXPORT_INFO_FILE), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        super().__init__(
+            model_name=f"{info['model_name']}:onnx{'-int8' if quantized else ''}",
+            embed_batch_size=embed_batch_size,
+            **kwargs,
+        )
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        # one session, all cores on the matrix multiplications; no operator parallelism
+        options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        model_path = os.path.join(export_dir, INT8_MODEL_FILE if quantized else FP32_MODEL_FILE)
+        self._session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [i.name for i in self._session.get_inputs()]
+        self._tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self._pooling = info["pooling"]
+        self._max_length = info["max_length"]
+        self._max_batch_tokens = max_batch_tokens
+        self._prompts = {"query": info.get("query_prompt") or "", "text": info.get("text_prompt") or ""}
+        logger.info(f"Loaded ONNX embedding model {model_path} ({options.intra_op_num_threads} threads)")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "OnnxEmbedding"
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if "cls" in self._pooling:
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def _batches(self, lengths: List[int]) -> List[List[int]]:
+        """Indices grouped into length-sorted batches within the padded-token budget."""
+        batches, batch, longest = [], [], 0
+        for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+            longest_if_added = max(longest, lengths[i])
+            if batch and longest_if_added * (len(batch) + 1) > self._max_batch_tokens:
+                batches.append(batch)
+                batch, longest_if_added = [], lengths[i]
+            batch.append(i)
+            longest = longest_if_added
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed(self, texts: List[str], prompt_name: Optional[str] = None) -> List[List[float]]:
+        prompt = self._prompts.get(prompt_name or "text", "")
+        encoded = self._tokenizer([prompt + text for text in texts], truncation=True, max_length=self._max_length)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for batch in self._batches(lengths):
+            features = self._tokenizer.pad(
+                {name: [encoded[name][i] for i in batch] for name in encoded.keys()}, return_tensors="np"
+            )
+            feeds = {name: features[name].astype(np.int64) for name in self._input_names}
+            (hidden,) = self._session.run(["last_hidden_state"], feeds)
+            for i, embedding in zip(batch, self._pool(hidden, features["attention_mask"])):
+                embeddings[i] = embedding.tolist()
+        return embeddings
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed([query], prompt_name="query")[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([text], prompt_name="text")[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, prompt_name="text")
+
+
+def load_onnx_embedding(settings: Optional[DocIngestionSettings] = None) -> OnnxEmbedding:
+    """Export the configured model if needed and load it with the EMBED_ONNX_* settings."""
+    settings = settings or DocIngestionSettings()
+    export_dir = default_export_dir(settings)
+    export_onnx_model(settings.EMBED_MODEL_NAME, export_dir, quantize=settings.EMBED_ONNX_QUANTIZE)
+    return OnnxEmbedding(
+        export_dir,
+        quantized=settings.EMBED_ONNX_QUANTIZE,
+        num_threads=settings.EMBED_ONNX_THREADS,
+        max_batch_tokens=settings.EMBED_ONNX_MAX_BATCH_TOKENS,
+    )
+
+
+def _normalized(embeddings) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def parity_check(reference: BaseEmbedding, candidate: BaseEmbedding, passages: List[str],
+                 queries: List[str], top_k: int = 5) -> dict:
+    """
+    Compare `candidate` embeddings with `reference` on the same passages and queries.
+
+    Reports the cosine similarity between the two models' embeddings of each passage and
+    the overlap of each query's top `top_k` passages under both models.
+    """
+    reference_passages = _normalized(reference.get_text_embedding_batch(passages))
+    candidate_passages = _normalized(candidate.get_text_embedding_batch(passages))
+    reference_queries = _normalized([reference.get_query_embedding(q) for q in queries])
+    candidate_queries = _normalized([candidate.get_query_embedding(q) for q in queries])
+
+    cosines = (reference_passages * candidate_passages).sum(axis=1)
+    k = min(top_k, len(passages))
+    reference_top = np.argsort(-(reference_queries @ reference_passages.T), axis=1)[:, :k]
+    candidate_top = np.argsort(-(candidate_queries @ candidate_passages.T), axis=1)[:, :k]
+    overlaps = [len(set(a) & set(b)) / k for a, b in zip(reference_top.tolist(), candidate_top.tolist())]
+    return {
+        "passages": len(passages),
+        "queries": len(queries),
+        "top_k": k,
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_topk_overlap": round(min(overlaps), 3),
+        "mean_topk_overlap": round(float(np.mean(overlaps)), 3),
+    }
+
+
+def measure_throughput(embed_model: BaseEmbedding, passages: List[str], rounds: int = 3) -> float:
+    """Best-of-`rounds` passages per second for document embedding (after one warm-up call)."""
+    embed_model.get_text_embedding_batch(passages[:8])
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        embed_model.get_text_embedding_batch(passages)
+        best = min(best, time.perf_counter() - start)
+    return round(len(passages) / best, 2)
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Compare the ONNX embedding backend with the HuggingFace model.")
+    arg_parser.add_argument("passages", help="Sample passages, one per line.")
+    arg_parser.add_argument("--queries", help="Queries, one per line (default: the first words of each passage).")
+    arg_parser.add_argument("--top-k", type=int, default=5)
+    arg_parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per backend.")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    settings = DocIngestionSettings()
+    passages = _read_lines(args.passages)
+    queries = _read_lines(args.queries) if args.queries else [" ".join(p.split()[:12]) for p in passages]
+
+    baseline = HuggingFaceEmbedding(model_name=settings.EMBED_MODEL_NAME)
+    candidate = load_onnx_embedding(settings)
+    report = parity_check(baseline, candidate, passages, queries, top_k=args.top_k)
+    report["passed"] = (report["min_cosine"] >= settings.EMBED_ONNX_PARITY_MIN_COSINE
+                        and report["mean_topk_overlap"] >= settings.EMBED_ONNX_PARITY_MIN_OVERLAP)
+    report["baseline_passages_per_s"] = measure_throughput(baseline, passages, args.rounds)
+    report["onnx_passages_per_s"] = measure_throughput(candidate, passages, args.rounds)
+    report["speedup"] = round(report["onnx_passages_per_s"] / report["baseline_passages_per_s"], 2)
+    report["backend"] = candidate.model_name
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+_SHORT_ID = re.compile(r"^(?P<id>.+?)(?:v(?P<version>\d+))?$")
+
+
+def parse_short_id(short_id: str) -> Tuple[str, int]:
+    """Split an arXiv short id such as "1706.03762v7" into ("1706.03762", 7)."""
+    match = _SHORT_ID.match(short_id)
+    return match.group("id"), int(match.group("version") or 1)
+
+
+class PaperRegistry:
+    """
+    Persistent record of the arXiv papers already ingested, keyed by arXiv id and version.
+
+    Lets repeat fetches of the same paper skip the download and the embedding build.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " arxiv_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " title TEXT NOT NULL,"
+            " pdf_url TEXT,"
+            " ingested_at REAL NOT NULL,"
+            " PRIMARY KEY (arxiv_id, version)"
+            ")"
+        )
+        self._conn.commit()
+
+    def is_ingested(self, arxiv_id: str, version: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM papers WHERE arxiv_id = ? AND version = ?", (arxiv_id, version)
+            ).fetchone()
+        return row is not None
+
+    def mark_ingested(self, arxiv_id: str, version: int, title: str, pdf_url: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO papers (arxiv_id, version, title, pdf_url, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (arxiv_id, version, title, pdf_url, time.time()),
+            )
+            self._conn.commit()
+
+    def ids_for_titles(self, titles: List[str]) -> List[str]:
+        """arXiv ids of ingested papers whose title matches one of `titles` (case-insensitive)."""
+        wanted = [title.strip().lower() for title in titles if title and title.strip()]
+        if not wanted:
+            return []
+        placeholders = ",".join("?" * len(wanted))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT arxiv_id FROM papers WHERE lower(title) IN ({placeholders})", wanted
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT arxiv_id, version, title, pdf_url, ingested_at FROM papers ORDER BY ingested_at"
+            ).fetchall()
+        return [
+            {"arxiv_id": r[0], "version": r[1], "title": r[2], "pdf_url": r[3], "ingested_at": r[4]}
+            for r in rows
+        ]
@@ -0,0 +1,226 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+from llama_index.core import Document
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# A PDF is given either as a file path or as the raw bytes of the file.
+PdfSource = Union[str, bytes]
+PageText = Tuple[int, str]  # (1-based page number, text)
+SourcePage = Tuple[int, int, str]  # (source index, page number, text)
+
+
+class _SharedPdf(NamedTuple):
+    """In-memory PDF bytes placed in shared memory once, so page-range tasks only send its name."""
+    name: str
+    size: int
+
+
+_NON_CONTENT_METADATA_KEYS = {"source", "filename", "file_path", "file_type", "file_size", "paper_id"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _open_pdf(source: Union[PdfSource, _SharedPdf]):
+    if isinstance(source, _SharedPdf):
+        shm = shared_memory.SharedMemory(name=source.name)
+        try:
+            data = bytes(shm.buf[:source.size])
+        finally:
+            shm.close()
+        return fitz.open(stream=data, filetype="pdf")
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _share(source: bytes) -> Tuple[shared_memory.SharedMemory, _SharedPdf]:
+    shm = shared_memory.SharedMemory(create=True, size=max(len(source), 1))
+    shm.buf[:len(source)] = source
+    return shm, _SharedPdf(shm.name, len(source))
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _extract_page_range(source: Union[PdfSource, _SharedPdf], start: int, end: int) -> List[PageText]:
+    """Extract pages [start, end) of a PDF. Runs inside pool workers."""
+    pages = []
+    with _open_pdf(source) as doc:
+        for page_index in range(start, end):
+            pages.append((page_index + 1, doc[page_index].get_text("text")))
+    return pages
+
+
+def _page_count(source: PdfSource) -> int:
+    with _open_pdf(source) as doc:
+        return doc.page_count
+
+
+def _shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _mp_context():
+    # forked workers would inherit the parent's threads and held locks (server, pipeline, models)
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            _shutdown_pool()
+            logger.info(f"Starting PDF extraction pool with {max_workers} workers.")
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context())
+            _pool_workers = max_workers
+        return _pool
+
+
+atexit.register(_shutdown_pool)
+
+
+def _iter_tasks(sources: List[PdfSource], pages_per_task: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (source index, start, end, page count) page ranges, opening each PDF only when reached."""
+    for source_index, source in enumerate(sources):
+        try:
+            page_count = _page_count(source)
+        except Exception as e:
+            logger.exception(f"Failed to open PDF source #{source_index}: {e}")
+            continue
+        for start in range(0, page_count, pages_per_task):
+            yield source_index, start, min(start + pages_per_task, page_count), page_count
+
+
+def iter_pdf_pages(
+    sources: List[PdfSource],
+    max_workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+) -> Iterator[SourcePage]:
+    """
+    Stream (source index, page number, text) for every page of every PDF in `sources`.
+
+    Work is split by file and by page range and runs in a shared process pool
+    (PDF_EXTRACT_WORKERS, 0 = one per CPU, 1 = inline). Sources may be paths or
+    in-memory bytes; bytes are copied into shared memory once per PDF rather than
+    pickled into every page-range task. Pages come out in source and page order. At
+    most two tasks per worker are in flight, so memory stays bounded however many
+    PDFs are given. A source that cannot be opened is logged and skipped.
+    """
+    settings = DocIngestionSettings()
+    if max_workers is None:
+        max_workers = settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1
+    if pages_per_task is None:
+        pages_per_task = settings.PDF_PAGES_PER_TASK
+
+    tasks = _iter_tasks(sources, pages_per_task)
+    if max_workers <= 1:
+        for source_index, start, end, _ in tasks:
+            try:
+                for page_number, text in _extract_page_range(sources[source_index], start, end):
+                    yield source_index, page_number, text
+            except Exception as e:
+                logger.exception(f"Failed to extract pages {start + 1}-{end} of PDF source #{source_index}: {e}")
+        return
+
+    pool = _get_pool(max_workers)
+    in_flight = deque()
+    # shared copies of in-memory sources, released once their last task is collected
+    shared: Dict[int, Tuple[shared_memory.SharedMemory, _SharedPdf]] = {}
+    try:
+        for source_index, start, end, page_count in tasks:
+            source = sources[source_index]
+            if isinstance(source, (bytes, bytearray)):
+                if source_index not in shared:
+                    shared[source_index] = _share(source)
+                source = shared[source_index][1]
+            future = pool.submit(_extract_page_range, source, start, end)
+            in_flight.append((source_index, start, end, end == page_count, future))
+            if len(in_flight) >= 2 * max_workers:
+                yield from _collect(in_flight.popleft(), shared)
+        while in_flight:
+            yield from _collect(in_flight.popleft(), shared)
+    finally:
+        for future in (task[-1] for task in in_flight):
+            future.cancel()
+        for shm, _ in shared.values():
+            _release(shm)
+
+
+def _collect(task, shared: Dict[int, Tuple[shared_memory.SharedMemory, _SharedPdf]]) -> Iterator[SourcePage]:
+    source_index, start, end, last, future = task
+    try:
+        pages = future.result()
+    except Exception as e:
+        logger.exception(f"Failed to extract pages {start + 1}-{end} of PDF source #{source_index}: {e}")
+        return
+    finally:
+        # tasks are collected in submission order, so the source's last task finishes its use
+        if last and source_index in shared:
+            _release(shared.pop(source_index)[0])
+    for page_number, text in pages:
+        yield source_index, page_number, text
+
+
+def extract_pdf_pages(
+    sources: List[PdfSource],
+    max_workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+) -> List[List[PageText]]:
+    """
+    Extract the text of every page of every PDF in `sources`.
+
+    Returns one list of (page number, text) per source, in page order; a source
+    that cannot be opened yields an empty list. See `iter_pdf_pages`.
+    """
+    results: List[List[PageText]] = [[] for _ in sources]
+    for source_index, page_number, text in iter_pdf_pages(sources, max_workers, pages_per_task):
+        results[source_index].append((page_number, text))
+    return results
+
+
+def iter_pdf_documents(sources: List[Tuple[PdfSource, dict]]) -> Iterator[Document]:
+    """
+    Stream one llama_index Document per non-empty PDF page.
+
+    `sources` pairs each PDF with the metadata its pages should carry; the page
+    number is added as `page_label`.
+    """
+    pages_seen = [0] * len(sources)
+    for source_index, page_number, text in iter_pdf_pages([source for source, _ in sources]):
+        if not text.strip():
+            continue
+        pages_seen[source_index] += 1
+        metadata = dict(sources[source_index][1])
+        metadata["page_label"] = str(page_number)
+        # keep paths and file stats out of embedding and LLM text
+        excluded_keys = [key for key in metadata if key in _NON_CONTENT_METADATA_KEYS]
+        yield Document(
+            text=text,
+            metadata=metadata,
+            excluded_embed_metadata_keys=excluded_keys,
+            excluded_llm_metadata_keys=excluded_keys,
+        )
+    for (_, metadata), count in zip(sources, pages_seen):
+        if not count:
+            logger.warning(f"No text extracted from PDF: {metadata.get('file_name') or metadata.get('source')}")
@@ -0,0 +1,226 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from llama_index.core import Document
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.node_parser import SimpleNodeParser
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from src.observability.metrics import DEDUP_CHUNKS, record_stage
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+from src.rag_doc_ingestion.dedup import DedupIndex, DedupSession
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output.
+_DONE = object()
+
+
+class _StageStats:
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def rate(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class IngestionPipeline:
+    """
+    Staged, bounded-memory ingestion: extract -> chunk -> embed -> upsert.
+
+    Every stage runs in its own thread and the stages are connected by bounded queues,
+    so only a few batches are ever in memory regardless of corpus size. Embeddings are
+    computed in micro-batches and nodes are written to the vector store in bulk batches.
+    Extraction happens lazily while the `documents` iterable is consumed.
+    With a `dedup_index`, chunks that are near-duplicates of stored chunks (or of
+    earlier chunks of the same run) are dropped after chunking and never embedded.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        embed_model: BaseEmbedding,
+        parser: Optional[SimpleNodeParser] = None,
+        queue_size: Optional[int] = None,
+        embed_batch_size: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None,
+        on_upsert: Optional[Callable[[List[BaseNode]], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        dedup_index: Optional[DedupIndex] = None,
+    ):
+        settings = DocIngestionSettings()
+        self.vector_store = vector_store
+        self.embed_model = embed_model
+        self.parser = parser or SimpleNodeParser.from_defaults(chunk_size=1024, chunk_overlap=50)
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.embed_batch_size = embed_batch_size or settings.EMBED_BATCH_SIZE
+        self.upsert_batch_size = upsert_batch_size or settings.UPSERT_BATCH_SIZE
+        self.on_upsert = on_upsert
+        self.on_progress = on_progress
+        self.dedup_index = dedup_index
+        self._dedup: Optional[DedupSession] = None
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._stats = {}
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
+
+    def _run_stage(self, name: str, target: Callable, out_q: Optional[queue.Queue]) -> None:
+        try:
+            target()
+        except BaseException as e:
+            logger.exception(f"Ingestion stage '{name}' failed: {e}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            if out_q is not None:
+                self._put(out_q, _DONE)
+
+    def _extract(self, documents: Iterable[Document], out_q: queue.Queue) -> None:
+        stats = self._stats["extract"]
+        iterator = iter(documents)
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            document = next(iterator, _DONE)
+            stats.busy_seconds += time.perf_counter() - start
+            if document is _DONE:
+                return
+            stats.items += 1
+            if not self._put(out_q, document):
+                return
+
+    def _chunk(self, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        stats = self._stats["chunk"]
+        while True:
+            document = self._get(in_q)
+            if document is _DONE:
+                return
+            start = time.perf_counter()
+            nodes = self.parser.get_nodes_from_documents([document])
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += len(nodes)
+            if self._dedup is not None:
+                dedup_stats = self._stats["dedup"]
+                start = time.perf_counter()
+                nodes = self._dedup.filter(nodes)
+                dedup_stats.busy_seconds += time.perf_counter() - start
+                dedup_stats.items = self._dedup.kept + self._dedup.skipped
+            for node in nodes:
+                if not self._put(out_q, node):
+                    return
+
+    def _embed_batch(self, batch: List[BaseNode], out_q: queue.Queue) -> bool:
+        stats = self._stats["embed"]
+        start = time.perf_counter()
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        embeddings = self.embed_model.get_text_embedding_batch(texts)
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+        stats.busy_seconds += time.perf_counter() - start
+        stats.items += len(batch)
+        return self._put(out_q, batch)
+
+    def _embed(self, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        batch: List[BaseNode] = []
+        while True:
+            node = self._get(in_q)
+            if node is _DONE:
+                break
+            batch.append(node)
+            if len(batch) >= self.embed_batch_size:
+                if not self._embed_batch(batch, out_q):
+                    return
+                batch = []
+        if batch and not self._stop.is_set():
+            self._embed_batch(batch, out_q)
+
+    def _upsert_batch(self, batch: List[BaseNode]) -> None:
+        stats = self._stats["upsert"]
+        start = time.perf_counter()
+        self.vector_store.add(batch)
+        if self._dedup is not None:
+            self._dedup.commit(batch)
+        if self.on_upsert is not None:
+            self.on_upsert(batch)
+        stats.busy_seconds += time.perf_counter() - start
+        stats.items += len(batch)
+        if self.on_progress is not None:
+            self.on_progress({s.unit: s.items for s in self._stats.values()})
+
+    def _upsert(self, in_q: queue.Queue) -> None:
+        batch: List[BaseNode] = []
+        while True:
+            nodes = self._get(in_q)
+            if nodes is _DONE:
+                break
+            batch.extend(nodes)
+            if len(batch) >= self.upsert_batch_size:
+                self._upsert_batch(batch)
+                batch = []
+        if batch and not self._stop.is_set():
+            self._upsert_batch(batch)
+
+    def run(self, documents: Iterable[Document]) -> dict:
+        """Ingest `documents` and return per-stage counts and throughput."""
+        self._stop.clear()
+        self._errors = []
+        self._stats = {
+            "extract": _StageStats("pages"),
+            "chunk": _StageStats("chunks"),
+            "embed": _StageStats("embeddings"),
+            "upsert": _StageStats("upserts"),
+        }
+        self._dedup = self.dedup_index.session() if self.dedup_index is not None else None
+        if self._dedup is not None:
+            self._stats["dedup"] = _StageStats("dedup_checks")
+        docs_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        nodes_q: queue.Queue = queue.Queue(maxsize=self.queue_size * self.embed_batch_size)
+        embedded_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=("extract", lambda: self._extract(documents, docs_q), docs_q)),
+            threading.Thread(target=self._run_stage, args=("chunk", lambda: self._chunk(docs_q, nodes_q), nodes_q)),
+            threading.Thread(target=self._run_stage, args=("embed", lambda: self._embed(nodes_q, embedded_q), embedded_q)),
+            threading.Thread(target=self._run_stage, args=("upsert", lambda: self._upsert(embedded_q), None)),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+        report = {"elapsed_seconds": round(time.perf_counter() - start, 3)}
+        for name, stats in self._stats.items():
+            record_stage(f"ingest_{name}", stats.busy_seconds)
+            report[stats.unit] = stats.items
+            report[f"{stats.unit}_per_s"] = round(stats.rate(), 2)
+        if self._dedup is not None:
+            DEDUP_CHUNKS.inc(self._dedup.kept, result="kept")
+            DEDUP_CHUNKS.inc(self._dedup.skipped, result="skipped")
+            report["embeddings_saved"] = self._dedup.skipped
+        logger.info(f"Ingestion pipeline finished: {report}")
+        return report
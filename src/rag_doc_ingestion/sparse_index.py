@@ -0,0 +1,223 @@
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# words, numbers and compound terms such as "resnet-50", "bert_base" or "3.5"
+_TOKEN = re.compile(r"[a-z0-9]+(?:[_\-.][a-z0-9]+)*")
+_TOKEN_PARTS = re.compile(r"[_\-.]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms for the sparse index; compound terms are also indexed by their parts."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        terms.append(token)
+        parts = _TOKEN_PARTS.split(token)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part and part not in _STOPWORDS)
+    return terms
+
+
+class SparseIndex:
+    """
+    BM25 inverted index over the chunks in the vector store, persisted in SQLite.
+
+    Terms and chunks are mapped to integer ids so a posting is three integers. The index
+    is written by the ingestion pipeline next to the vector store upserts and chunks are
+    deleted by file path alongside the vector store deletes, so both stay in sync.
+
+    Scores are summed inside SQLite. Query terms found in more than `max_df_ratio` of
+    the chunks add little to BM25 but make up most of the postings, so they are skipped
+    unless every query term is that common, in which case only the rarest is scored.
+    """
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75, max_df_ratio: float = 0.5):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS terms (
+                term_id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL UNIQUE,
+                df INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                node_id TEXT NOT NULL UNIQUE,
+                file_path TEXT,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS docs_file_path ON docs (file_path);
+            CREATE TABLE IF NOT EXISTS postings (
+                term_id INTEGER NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term_id, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+            """
+        )
+        # indexes created before chunks carried a paper id get the column added
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}
+        if "paper_id" not in columns:
+            self._conn.execute("ALTER TABLE docs ADD COLUMN paper_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS docs_paper_id ON docs (paper_id)")
+        self._conn.commit()
+
+    def _delete_docs(self, doc_ids: Sequence[int]) -> None:
+        for doc_id in doc_ids:
+            self._conn.execute(
+                "UPDATE terms SET df = df - 1 WHERE term_id IN (SELECT term_id FROM postings WHERE doc_id = ?)",
+                (doc_id,),
+            )
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+
+    def add_nodes(self, nodes: List[BaseNode]) -> None:
+        """Index (or re-index) the given chunks."""
+        if not nodes:
+            return
+        node_terms = [Counter(tokenize(node.get_content(metadata_mode=MetadataMode.EMBED))) for node in nodes]
+        doc_freq = Counter()
+        for terms in node_terms:
+            doc_freq.update(terms.keys())
+        with self._lock, self._conn:
+            node_ids = [node.node_id for node in nodes]
+            existing = []
+            for i in range(0, len(node_ids), 500):
+                chunk = node_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                existing.extend(row[0] for row in self._conn.execute(
+                    f"SELECT doc_id FROM docs WHERE node_id IN ({placeholders})", chunk
+                ))
+            self._delete_docs(existing)
+
+            self._conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                list(doc_freq.items()),
+            )
+            term_ids = self._term_ids(list(doc_freq))
+            postings = []
+            for node, terms in zip(nodes, node_terms):
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (node_id, file_path, paper_id, length) VALUES (?, ?, ?, ?)",
+                    (node.node_id, node.metadata.get("file_path"), node.metadata.get("paper_id"),
+                     sum(terms.values())),
+                )
+                postings.extend((term_ids[term], cursor.lastrowid, tf) for term, tf in terms.items())
+            self._conn.executemany("INSERT INTO postings (term_id, doc_id, tf) VALUES (?, ?, ?)", postings)
+
+    def delete_file(self, file_path: str) -> int:
+        """Remove every chunk that came from `file_path`; returns the number removed."""
+        with self._lock, self._conn:
+            doc_ids = [row[0] for row in self._conn.execute("SELECT doc_id FROM docs WHERE file_path = ?", (file_path,))]
+            self._delete_docs(doc_ids)
+        return len(doc_ids)
+
+    def _term_ids(self, terms: List[str]) -> Dict[str, int]:
+        ids = {}
+        # stay well under SQLite's bound-parameter limit
+        for i in range(0, len(terms), 500):
+            chunk = terms[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for term_id, term in self._conn.execute(
+                f"SELECT term_id, term FROM terms WHERE term IN ({placeholders})", chunk
+            ):
+                ids[term] = term_id
+        return ids
+
+    def search(self, query: str, top_k: int = 10,
+               paper_ids: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Return up to `top_k` (node_id, BM25 score) pairs, best first.
+
+        With `paper_ids`, only chunks of those papers are scored (term statistics stay
+        corpus-wide).
+        """
+        start = time.perf_counter()
+        query_terms = sorted(set(tokenize(query)))
+        if not query_terms:
+            return []
+        with self._lock:
+            doc_count, total_length = self._conn.execute("SELECT COUNT(*), TOTAL(length) FROM docs").fetchone()
+            if not doc_count:
+                return []
+            avg_length = total_length / doc_count
+            placeholders = ",".join("?" * len(query_terms))
+            term_stats = self._conn.execute(
+                f"SELECT term_id, df FROM terms WHERE term IN ({placeholders}) AND df > 0", query_terms
+            ).fetchall()
+            if not term_stats:
+                return []
+            scored = [(term_id, df) for term_id, df in term_stats if df <= self.max_df_ratio * doc_count]
+            if not scored:
+                scored = [min(term_stats, key=lambda stat: stat[1])]
+            idf = [
+                (term_id, math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5)))
+                for term_id, df in scored
+            ]
+
+            sql = (
+                f"WITH q (term_id, idf) AS (VALUES {','.join(['(?, ?)'] * len(idf))}) "
+                f"SELECT d.node_id, SUM(q.idf * p.tf * ? / (p.tf + ? * (1.0 - ? + ? * d.length / ?))) AS score "
+                f"FROM q JOIN postings p ON p.term_id = q.term_id JOIN docs d ON d.doc_id = p.doc_id"
+            )
+            params = [value for pair in idf for value in pair]
+            params.extend([self.k1 + 1.0, self.k1, self.b, self.b, avg_length])
+            if paper_ids:
+                sql += f" WHERE d.paper_id IN ({','.join('?' * len(paper_ids))})"
+                params.extend(paper_ids)
+            sql += " GROUP BY p.doc_id ORDER BY score DESC, p.doc_id LIMIT ?"
+            params.append(top_k)
+            best = self._conn.execute(sql, params).fetchall()
+        logger.debug(
+            f"Sparse search scored {len(scored)} of {len(term_stats)} terms "
+            f"in {(time.perf_counter() - start) * 1000:.2f}ms"
+        )
+        return [(node_id, score) for node_id, score in best]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+_sparse_index: Optional[SparseIndex] = None
+_sparse_index_lock = threading.Lock()
+
+
+def get_sparse_index() -> SparseIndex:
+    """Return the process-wide sparse index stored next to the vector store."""
+    global _sparse_index
+    if _sparse_index is None:
+        with _sparse_index_lock:
+            if _sparse_index is None:
+                settings = DocIngestionSettings()
+                path = settings.SPARSE_INDEX_PATH or os.path.join(settings.VECTOR_STORE_DIR, "sparse_index.sqlite3")
+                logger.info(f"Using sparse index at: {path}")
+                _sparse_index = SparseIndex(path, max_df_ratio=settings.SPARSE_MAX_DF_RATIO)
+    return _sparse_index
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Iterable, Optional, Set
+
+# Marker file written next to the vector store whenever ingestion changes it.
+VERSION_FILE_NAME = ".store_version"
+# JSON-lines log of the papers each version changed, oldest first.
+CHANGES_FILE_NAME = ".store_changes.jsonl"
+# versions kept in the change log; readers further behind treat every paper as changed
+_MAX_CHANGES = 1000
+
+# Versions written by this process; readers only need fresh storage handles for
+# versions written elsewhere.
+_local_versions = set()
+_local_versions_lock = threading.Lock()
+
+
+def _version_path(vector_store_dir: str) -> str:
+    return os.path.join(vector_store_dir, VERSION_FILE_NAME)
+
+
+def read_store_version(vector_store_dir: str) -> str:
+    """Return the current store version, or an empty string if nothing was ingested yet."""
+    try:
+        with open(_version_path(vector_store_dir), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def _read_changes(vector_store_dir: str) -> list:
+    with open(os.path.join(vector_store_dir, CHANGES_FILE_NAME), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_change(vector_store_dir: str, version: str, paper_ids: Optional[Iterable[str]]) -> None:
+    try:
+        changes = _read_changes(vector_store_dir)
+    except (FileNotFoundError, json.JSONDecodeError):
+        changes = []
+    changes.append({"version": version, "paper_ids": sorted(set(paper_ids)) if paper_ids is not None else None})
+    path = os.path.join(vector_store_dir, CHANGES_FILE_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for change in changes[-_MAX_CHANGES:]:
+            f.write(json.dumps(change) + "\n")
+    os.replace(tmp_path, path)
+
+
+def bump_store_version(vector_store_dir: str, paper_ids: Optional[Iterable[str]] = None) -> str:
+    """
+    Record that the vector store changed so long-lived readers can refresh.
+
+    Callers hold the store writer lock. `paper_ids` names the papers whose chunks were
+    added or removed and goes to the change log, so caches can keep entries about other
+    papers; without it the change counts as touching every paper.
+    """
+    os.makedirs(vector_store_dir, exist_ok=True)
+    version = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    # logged before the marker moves, so a reader that sees the version finds its change
+    _append_change(vector_store_dir, version, paper_ids)
+    path = _version_path(vector_store_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, path)
+    with _local_versions_lock:
+        _local_versions.add(version)
+    return version
+
+
+def changed_papers(vector_store_dir: str, since_version: str, version: str) -> Optional[Set[str]]:
+    """
+    Papers changed after `since_version`, up to and including `version`.
+
+    Returns None when the change log cannot tell (a version older than the log, or a
+    change recorded without paper ids), i.e. any paper may have changed.
+    """
+    if since_version == version:
+        return set()
+    try:
+        changes = _read_changes(vector_store_dir)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    versions = [change["version"] for change in changes]
+    if since_version not in versions or version not in versions:
+        return None
+    changed = set()
+    for change in changes[versions.index(since_version) + 1:versions.index(version) + 1]:
+        if change["paper_ids"] is None:
+            return None
+        changed.update(change["paper_ids"])
+    return changed
+
+
+def written_by_this_process(version: str) -> bool:
+    """Whether `version` was bumped by this process (its storage handles are current)."""
+    with _local_versions_lock:
+        return version in _local_versions
+
+
+class StoreVersionWatcher:
+    """
+    Cheap, throttled view of the store version for request paths.
+
+    The marker file is stat'ed at most once per `interval` seconds and only re-read
+    when it changed, so a reader in another worker sees an ingestion within about
+    `interval` seconds. Bumps made by this process are seen immediately.
+    """
+
+    def __init__(self, vector_store_dir: str, interval: float = 1.0):
+        self.path = _version_path(vector_store_dir)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._version = ""
+        self._signature = None
+        self._checked_at = float("-inf")
+        self._local_count = -1
+
+    def current(self) -> str:
+        with _local_versions_lock:
+            local_count = len(_local_versions)
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.interval and local_count == self._local_count:
+                return self._version
+            try:
+                st = os.stat(self.path)
+                # os.replace gives the marker a new inode on every bump
+                signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                signature = None
+            if signature != self._signature:
+                self._version = read_store_version(os.path.dirname(self.path)) if signature else ""
+                self._signature = signature
+            self._checked_at = now
+            self._local_count = local_count
+            return self._version
@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from llama_index.core.vector_stores.types import BasePydanticVectorStore, MetadataFilter, MetadataFilters
+
+from src.rag_doc_ingestion.config.doc_ingestion_settings import DocIngestionSettings
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+CHROMA_BACKEND = "chroma"
+NUMPY_BACKEND = "numpy"
+
+# one NumpyVectorStore per directory and process, so in-process writers share a lock
+_numpy_stores: Dict[str, BasePydanticVectorStore] = {}
+_numpy_stores_lock = threading.Lock()
+
+
+def get_vector_store(settings: Optional[DocIngestionSettings] = None, fresh: bool = False) -> BasePydanticVectorStore:
+    """
+    Open the vector store selected by VECTOR_BACKEND for VECTOR_STORE_DIR / COLLECTION_NAME.
+
+    "chroma" opens the collection through a chromadb PersistentClient; "numpy" returns the
+    process's memory-mapped NumpyVectorStore under <VECTOR_STORE_DIR>/numpy_store/<COLLECTION_NAME>.
+    With `fresh`, chroma drops its cached in-process system so data written by another
+    process is loaded from disk; the numpy store always re-maps files that changed.
+    """
+    settings = settings or DocIngestionSettings()
+    backend = settings.VECTOR_BACKEND.lower()
+
+    if backend == NUMPY_BACKEND:
+        from src.rag_doc_ingestion.numpy_vector_store import NumpyVectorStore
+
+        persist_dir = os.path.abspath(os.path.join(settings.VECTOR_STORE_DIR, "numpy_store", settings.COLLECTION_NAME))
+        with _numpy_stores_lock:
+            store = _numpy_stores.get(persist_dir)
+            if store is None:
+                logger.info(f"Opening numpy vector store at: {persist_dir}")
+                store = NumpyVectorStore(
+                    persist_dir=persist_dir,
+                    quantize=settings.NUMPY_STORE_QUANTIZE,
+                    rescore_factor=settings.NUMPY_STORE_RESCORE_FACTOR,
+                )
+                _numpy_stores[persist_dir] = store
+        # pick up rows written by other processes
+        store.refresh()
+        return store
+
+    if backend == CHROMA_BACKEND:
+        import chromadb
+        from llama_index.vector_stores.chroma import ChromaVectorStore
+
+        if fresh:
+            # chromadb shares one system per path within a process; drop it so the
+            # client reopens the files another process has written since
+            from chromadb.api.client import SharedSystemClient
+
+            SharedSystemClient.clear_system_cache()
+        logger.info(f"Initializing ChromaDB persistent client at: {settings.VECTOR_STORE_DIR}")
+        db = chromadb.PersistentClient(path=settings.VECTOR_STORE_DIR)
+        # Create or retrieve the vector collection
+        chroma_collection = db.get_or_create_collection(name=settings.COLLECTION_NAME)
+        logger.info(f"Creating Chroma vector store with collection name: {settings.COLLECTION_NAME}")
+        return ChromaVectorStore(chroma_collection=chroma_collection)
+
+    raise ValueError(f"Unknown VECTOR_BACKEND '{settings.VECTOR_BACKEND}' (expected 'chroma' or 'numpy')")
+
+
+def delete_file_chunks(vector_store: BasePydanticVectorStore, file_path: str) -> None:
+    """Delete every chunk that was ingested from `file_path`."""
+    if vector_store.class_name() == "ChromaVectorStore":
+        # the collection is the store's client; a plain where-delete needs no id list
+        vector_store.client.delete(where={"file_path": file_path})
+        return
+    vector_store.delete_nodes(filters=MetadataFilters(filters=[MetadataFilter(key="file_path", value=file_path)]))
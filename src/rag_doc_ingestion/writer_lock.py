@@ -0,0 +1,120 @@
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+from src.observability.metrics import span
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+LOCK_FILE_NAME = ".writer.lock"
+_POLL_SECONDS = 0.1
+
+
+class StoreLockTimeout(RuntimeError):
+    """Raised when the store writer lock could not be acquired in time."""
+
+
+# Held by the thread that owns the writer lock in this process; re-entrant so an
+# ingestion step can take the lock and call helpers that take it again.
+_process_lock = threading.RLock()
+_depth = 0
+_lock_file = None
+
+
+def _flock(path: str, deadline: float, what: str):
+    """Open `path` and take an exclusive flock on it, polling until `deadline`."""
+    lock_file = open(path, "a+")
+    if fcntl is not None:
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    lock_file.close()
+                    raise StoreLockTimeout(f"Timed out waiting for the {what} at {path}")
+                time.sleep(_POLL_SECONDS)
+    return lock_file
+
+
+def _acquire_file_lock(path: str, deadline: float) -> None:
+    global _lock_file
+    lock_file = _flock(path, deadline, "store writer lock")
+    # record the owner to make a stuck writer easy to identify
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(f"pid={os.getpid()} host={socket.gethostname()} since={time.time():.0f}\n")
+    lock_file.flush()
+    _lock_file = lock_file
+
+
+def _release_file_lock() -> None:
+    global _lock_file
+    if fcntl is not None:
+        fcntl.flock(_lock_file.fileno(), fcntl.LOCK_UN)
+    _lock_file.close()
+    _lock_file = None
+
+
+@contextmanager
+def store_writer_lock(vector_store_dir: str, timeout: Optional[float] = None):
+    """
+    Hold the single-writer lock of the store under `vector_store_dir`.
+
+    Every write to the vector store, sparse index and ingestion manifest goes through
+    this lock, so uvicorn workers and replicas sharing the directory take turns. Across
+    processes it is an exclusive flock on <vector_store_dir>/.writer.lock (use a
+    filesystem with working flock; NFS often has none). Within a process it is
+    re-entrant. Raises StoreLockTimeout after `timeout` seconds (None waits forever).
+    """
+    global _depth
+    deadline = time.monotonic() + timeout if timeout is not None else float("inf")
+    with span("store_write_lock_wait"):
+        if not _process_lock.acquire(timeout=timeout if timeout is not None else -1):
+            raise StoreLockTimeout(f"Timed out waiting for the store writer lock in {vector_store_dir}")
+        try:
+            if _depth == 0:
+                os.makedirs(vector_store_dir, exist_ok=True)
+                _acquire_file_lock(os.path.join(vector_store_dir, LOCK_FILE_NAME), deadline)
+                logger.info(f"Acquired store writer lock for {vector_store_dir}")
+        except BaseException:
+            _process_lock.release()
+            raise
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            _release_file_lock()
+            logger.info(f"Released store writer lock for {vector_store_dir}")
+        _process_lock.release()
+
+
+@contextmanager
+def exclusive_file_lock(path: str, timeout: Optional[float] = None):
+    """
+    Hold an exclusive flock on `path` (created if missing) for one-off work such as a
+    model export that several workers may start at once. Unlike `store_writer_lock` it
+    is not re-entrant; where flock is available every holder, in this process or
+    another, takes turns.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else float("inf")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lock_file = _flock(path, deadline, "lock")
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        lock_file.close()
@@ -1,7 +1,7 @@
 #!/bin/bash
 set -e
 
-# 1. Run document ingestion (one-time)
+# 1. Run document ingestion (incremental: only new or changed files are embedded)
 python -m src.rag_doc_ingestion.ingest_docs
 
 # 2. Start backend API in background
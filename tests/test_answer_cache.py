@@ -0,0 +1,46 @@
+from src.backend_src.services.answer_cache import SemanticAnswerCache
+from src.rag_doc_ingestion.store_version import bump_store_version, changed_papers, read_store_version
+
+EMBEDDING = [1.0, 0.0, 0.0]
+
+
+def test_change_log_names_the_papers_changed_between_versions(tmp_path):
+    store_dir = str(tmp_path)
+    first = bump_store_version(store_dir, paper_ids=["a.pdf"])
+    second = bump_store_version(store_dir, paper_ids=["b.pdf"])
+    third = bump_store_version(store_dir, paper_ids=["c.pdf", "b.pdf"])
+    assert read_store_version(store_dir) == third
+
+    assert changed_papers(store_dir, first, third) == {"b.pdf", "c.pdf"}
+    assert changed_papers(store_dir, second, second) == set()
+    assert changed_papers(store_dir, "", first) is None  # older than the log
+
+    # a change without paper ids may have touched anything
+    fourth = bump_store_version(store_dir)
+    assert changed_papers(store_dir, third, fourth) is None
+
+
+def test_ingestion_only_invalidates_entries_about_changed_papers(tmp_path):
+    store_dir = str(tmp_path)
+    cache = SemanticAnswerCache(changed_papers=lambda since, version: changed_papers(store_dir, since, version))
+    version = bump_store_version(store_dir, paper_ids=["a.pdf", "b.pdf"])
+    cache.store(EMBEDDING, "about-a", version, {"answer": "a"}, paper_ids=["a.pdf"])
+    cache.store(EMBEDDING, "about-b", version, {"answer": "b"}, paper_ids=["b.pdf"])
+    cache.store(EMBEDDING, "global", version, {"answer": "global"})
+
+    version = bump_store_version(store_dir, paper_ids=["b.pdf"])
+    assert cache.lookup(EMBEDDING, "about-a", version) == {"answer": "a"}
+    assert cache.lookup(EMBEDDING, "about-b", version) is None
+    assert cache.lookup(EMBEDDING, "global", version) is None
+    assert cache.stats()["revalidations"] == 1
+    assert cache.stats()["invalidations"] == 2
+
+    version = bump_store_version(store_dir)
+    assert cache.lookup(EMBEDDING, "about-a", version) is None
+
+
+def test_without_a_change_log_every_version_change_invalidates():
+    cache = SemanticAnswerCache()
+    cache.store(EMBEDDING, "about-a", "v1", {"answer": "a"}, paper_ids=["a.pdf"])
+    assert cache.lookup(EMBEDDING, "about-a", "v1") == {"answer": "a"}
+    assert cache.lookup(EMBEDDING, "about-a", "v2") is None
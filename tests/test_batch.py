@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from llama_index.core import Document
+from llama_index.core.node_parser import SimpleNodeParser
+from llama_index.core.schema import NodeWithScore, TextNode
+
+
+@pytest.fixture
+def batch_module(monkeypatch, tmp_path):
+    for name, value in {
+        "GROQ_API_KEY": "test",
+        "MODEL_NAME": "groq/llama-3.3-70b-versatile",
+        "MODEL_TEMPERATURE": "0",
+        "DOCUMENTS_DIR": str(tmp_path / "docs"),
+        "VECTOR_STORE_DIR": str(tmp_path / "store"),
+        "COLLECTION_NAME": "test",
+    }.items():
+        monkeypatch.setenv(name, value)
+    from src.agents_src.retrieval import batch
+    return batch
+
+
+def _page_chunks():
+    page = Document(text=" ".join(f"Sentence number {i} of the page." for i in range(80)),
+                    metadata={"file_name": "a.pdf", "page_label": "1"})
+    return page, SimpleNodeParser.from_defaults(chunk_size=64, chunk_overlap=16).get_nodes_from_documents([page])
+
+
+def test_overlapping_chunks_of_a_page_are_joined():
+    from src.agents_src.retrieval.context import merge_overlapping_chunks
+
+    page, chunks = _page_chunks()
+    other = TextNode(id_="other", text="An unrelated chunk.", metadata={"file_name": "b.pdf"})
+    hits = [
+        NodeWithScore(node=chunks[1], score=0.9),
+        NodeWithScore(node=other, score=0.8),
+        NodeWithScore(node=chunks[0], score=0.7),
+        NodeWithScore(node=chunks[4], score=0.6),
+        NodeWithScore(node=TextNode(id_="copy", text=chunks[4].text), score=0.5),
+    ]
+    merged = merge_overlapping_chunks(hits)
+
+    assert [hit.score for hit in merged] == [0.9, 0.8, 0.6]
+    joined = merged[0].node
+    assert joined.text == page.text[chunks[0].start_char_idx:chunks[1].end_char_idx]
+    assert joined.metadata["file_name"] == "a.pdf"
+    # the retrieved nodes themselves are left untouched
+    assert chunks[1].start_char_idx > 0
+    assert merged[2].node is chunks[4]
+
+
+def test_batch_summary_reports_tokens_saved(batch_module):
+    _, chunks = _page_chunks()
+    synthesized = []
+
+    def synthesize(query_bundle, nodes):
+        synthesized.append(nodes)
+        return SimpleNamespace(response="answer")
+
+    engine = SimpleNamespace(retrieve_batch=lambda questions: (
+        SimpleNamespace(synthesize=synthesize),
+        [[NodeWithScore(node=chunks[0], score=0.9), NodeWithScore(node=chunks[1], score=0.8)]],
+    ))
+    *answers, summary = batch_module.answer_batch(["question?"], max_concurrency=1, engine=engine)
+
+    assert answers[0]["source_files"] == ["a.pdf"]
+    assert len(synthesized[0]) == 1
+    assert summary["summary"]["context_tokens_saved"] > 0
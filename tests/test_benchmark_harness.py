@@ -0,0 +1,30 @@
+from benchmarks import harness
+from benchmarks.harness import Benchmark, compare
+
+
+def _report(**benchmarks):
+    return {"benchmarks": benchmarks}
+
+
+def test_later_components_do_not_inherit_the_peak_rss(monkeypatch):
+    # the process-wide peak as a heavy and then a light component run
+    peaks = iter([100.0, 400.0, 400.0, 400.5])
+    monkeypatch.setattr(harness, "peak_rss_mb", lambda: next(peaks))
+
+    heavy = Benchmark("heavy", "items")
+    with heavy.measure():
+        pass
+    light = Benchmark("light", "items")
+    with light.measure():
+        pass
+
+    assert heavy.result()["peak_rss_growth_mb"] == 300.0
+    assert light.result()["peak_rss_growth_mb"] == 0.5
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = _report(embed={"p50_ms": 10.0, "p95_ms": 20.0, "throughput_per_s": 100.0, "peak_rss_growth_mb": 2.0})
+    current = _report(embed={"p50_ms": 13.0, "p95_ms": 21.0, "throughput_per_s": 80.0, "peak_rss_growth_mb": 6.0})
+    regressions = {row["metric"] for row in compare(current, baseline, tolerance=0.15) if row["regression"]}
+    # +4 MiB of RSS growth is below the noise floor even though it is +200%
+    assert regressions == {"p50_ms", "throughput_per_s"}
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+from llama_index.core import Document
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from src.rag_doc_ingestion.dedup import DedupIndex, MinHasher
+from src.rag_doc_ingestion.numpy_vector_store import NumpyVectorStore
+
+WORDS = ("attention transformer encoder decoder layer token embedding gradient loss optimizer batch dataset "
+         "benchmark baseline ablation accuracy latency memory retrieval index query vector sparse dense").split()
+
+
+def _text(seed: int, words: int = 60) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+class _OneChunkParser:
+    """One node per document, so the tests control chunk boundaries."""
+
+    def get_nodes_from_documents(self, documents):
+        return [
+            TextNode(id_=f"{document.metadata['file_path']}#0", text=document.text, metadata=dict(document.metadata))
+            for document in documents
+        ]
+
+
+def _document(file_path: str, text: str) -> Document:
+    return Document(text=text, metadata={"file_path": file_path, "paper_id": file_path})
+
+
+class _FailingStore:
+    def add(self, nodes, **kwargs):
+        raise RuntimeError("vector store unavailable")
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setenv("DOCUMENTS_DIR", str(tmp_path / "docs"))
+    monkeypatch.setenv("VECTOR_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("COLLECTION_NAME", "test")
+    from src.rag_doc_ingestion.pipeline import IngestionPipeline
+
+    def make(vector_store, dedup_index):
+        return IngestionPipeline(
+            vector_store=vector_store,
+            embed_model=MockEmbedding(embed_dim=8),
+            parser=_OneChunkParser(),
+            embed_batch_size=2,
+            upsert_batch_size=2,
+            dedup_index=dedup_index,
+        )
+    return make
+
+
+def test_signatures_estimate_similarity():
+    hasher = MinHasher()
+    text = _text(1)
+    assert hasher.signature("too short to deduplicate") is None
+    assert (hasher.signature(text) == hasher.signature(text + " ")).all()
+    assert (hasher.signature(text) != hasher.signature(_text(2))).mean() > 0.8
+
+
+def test_pipeline_skips_near_duplicates_within_and_across_runs(make_pipeline, tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    store = NumpyVectorStore(persist_dir=str(tmp_path / "numpy"))
+    original = _text(1)
+
+    report = make_pipeline(store, index).run([
+        _document("a.pdf", original),
+        _document("b.pdf", original.replace("attention", "Attention", 1)),  # same words after lowercasing
+        _document("c.pdf", _text(2)),
+    ])
+    assert report["embeddings_saved"] == 1
+    assert sorted(node.node_id for node in store.get_nodes()) == ["a.pdf#0", "c.pdf#0"]
+    assert index.stats()["indexed_chunks"] == 2
+
+    # a later run is checked against the persisted index
+    report = make_pipeline(store, index).run([_document("d.pdf", original)])
+    assert report["embeddings_saved"] == 1
+    assert index.stats()["embeddings_saved"] == 2
+    assert sorted(index.paper_aliases(["b.pdf", "d.pdf"])) == ["a.pdf"]
+
+
+def test_nothing_is_indexed_when_the_upsert_fails(make_pipeline, tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    original = _text(1)
+    with pytest.raises(RuntimeError):
+        make_pipeline(_FailingStore(), index).run([_document("a.pdf", original), _document("b.pdf", original)])
+    assert index.stats()["indexed_chunks"] == 0
+    assert index.stats()["embeddings_saved"] == 0
+
+    # the chunk is kept on the next attempt instead of being skipped against a chunk that was never stored
+    store = NumpyVectorStore(persist_dir=str(tmp_path / "numpy"))
+    report = make_pipeline(store, index).run([_document("a.pdf", original)])
+    assert report["embeddings_saved"] == 0
+    assert [node.node_id for node in store.get_nodes()] == ["a.pdf#0"]
+
+
+def test_delete_file_reports_files_whose_kept_copies_are_gone(make_pipeline, tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    store = NumpyVectorStore(persist_dir=str(tmp_path / "numpy"))
+    original = _text(1)
+    make_pipeline(store, index).run([
+        _document("a.pdf", original),
+        _document("b.pdf", original),
+        _document("c.pdf", _text(2)),
+    ])
+
+    assert index.delete_file("c.pdf") == set()
+    assert index.delete_file("a.pdf") == {"b.pdf"}
+    assert index.stats()["indexed_chunks"] == 0
+    assert index.stats()["embeddings_saved"] == 0
+    assert index.paper_aliases(["b.pdf"]) == []
+
+    # re-ingesting the orphaned file keeps its chunk now that the original is gone
+    report = make_pipeline(store, index).run([_document("b.pdf", original)])
+    assert report["embeddings_saved"] == 0
+    assert index.stats()["indexed_chunks"] == 1
+
+
+def test_changed_parameters_clear_the_index(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    index = DedupIndex(path)
+    signature = index.hasher.signature(_text(1))
+    index.add([("n1", "a.pdf", "a.pdf", signature, index.band_keys(signature))], [])
+    assert DedupIndex(path).stats()["indexed_chunks"] == 1
+    assert DedupIndex(path, num_perm=64).stats()["indexed_chunks"] == 0
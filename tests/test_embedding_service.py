@@ -0,0 +1,82 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from src.rag_doc_ingestion.embedding_service import MicroBatcher
+
+
+class _RecordingEmbedding(MockEmbedding):
+    """Embeds text i as [i, ...] and records every model call; `gate` holds the first call."""
+
+    def __init__(self, **kwargs):
+        super().__init__(embed_dim=4, **kwargs)
+        self._calls = []
+        self._gate = threading.Event()
+
+    def _get_text_embeddings(self, texts):
+        return self._record("text", texts)
+
+    def _get_query_embedding(self, query):
+        return self._record("query", [query])[0]
+
+    def _record(self, kind, texts):
+        if not self._calls:
+            self._gate.wait(5)
+        self._calls.append((kind, len(texts)))
+        return [[float(text.split()[-1])] * 4 for text in texts]
+
+
+@pytest.fixture
+def model():
+    return _RecordingEmbedding()
+
+
+def test_large_requests_are_split_into_batches(model):
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=1)
+    model._gate.set()
+    try:
+        embeddings = batcher.submit([f"chunk {i}" for i in range(10)]).result(timeout=5)
+    finally:
+        batcher.close()
+    assert embeddings[:, 0].tolist() == list(range(10))
+    assert max(size for _, size in model._calls) <= 4
+    stats = batcher.stats()
+    assert stats["split_requests"] == 1
+    assert stats["parts"] == 3
+
+
+def test_queries_are_served_before_queued_text(model):
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=1)
+    try:
+        first = batcher.submit(["chunk 0"])
+        time.sleep(0.05)  # the batcher is now blocked on the first model call
+        bulk = batcher.submit([f"chunk {i}" for i in range(12)])
+        query = batcher.submit(["query 7"], kind="query")
+        model._gate.set()
+        assert query.result(timeout=5)[0, 0] == 7.0
+        first.result(timeout=5)
+        bulk.result(timeout=5)
+    finally:
+        batcher.close()
+    assert model._calls[:2] == [("text", 1), ("query", 1)]
+    assert batcher.stats()["query_parts"] == 1
+
+
+def test_a_failed_part_fails_the_whole_request(model, monkeypatch):
+    batcher = MicroBatcher(model, max_batch_size=2, max_wait_ms=1)
+    model._gate.set()
+
+    def embed(texts, kind):
+        if "chunk 3" in texts:
+            raise RuntimeError("model failed")
+        return np.zeros((len(texts), 4))
+
+    monkeypatch.setattr(batcher, "_embed", embed)
+    try:
+        with pytest.raises(RuntimeError, match="model failed"):
+            batcher.submit([f"chunk {i}" for i in range(6)]).result(timeout=5)
+    finally:
+        batcher.close()
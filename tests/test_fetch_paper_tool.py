@@ -0,0 +1,61 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from src.rag_doc_ingestion.jobs import PARTIALLY_FAILED, IngestionJob
+
+
+@pytest.fixture
+def fetch_module(monkeypatch, tmp_path):
+    for name, value in {
+        "GROQ_API_KEY": "test",
+        "MODEL_NAME": "groq/llama-3.3-70b-versatile",
+        "MODEL_TEMPERATURE": "0",
+        "DOCUMENTS_DIR": str(tmp_path / "docs"),
+        "VECTOR_STORE_DIR": str(tmp_path / "store"),
+        "COLLECTION_NAME": "test",
+    }.items():
+        monkeypatch.setenv(name, value)
+    pytest.importorskip("crewai")
+    pytest.importorskip("arxiv")
+    module = importlib.import_module("src.agents_src.tools.fetch_paper_tool")
+    monkeypatch.setattr(module.settings, "VECTOR_STORE_DIR", str(tmp_path / "store"))
+    return module
+
+
+class _Registry:
+    def __init__(self):
+        self.ingested = set()
+
+    def is_ingested(self, arxiv_id, version):
+        return (arxiv_id, version) in self.ingested
+
+    def mark_ingested(self, arxiv_id, version, title, pdf_url):
+        self.ingested.add((arxiv_id, version))
+
+
+def _paper(short_id, title):
+    return SimpleNamespace(get_short_id=lambda: short_id, title=title, pdf_url=f"https://arxiv.org/pdf/{short_id}")
+
+
+def test_failed_downloads_are_reported_and_not_registered(fetch_module, monkeypatch):
+    registry = _Registry()
+    ingested = []
+    downloader = SimpleNamespace(download_many=lambda urls: [b"%PDF-1.4", ConnectionError("reset by peer")])
+    monkeypatch.setattr(fetch_module, "get_paper_registry", lambda: registry)
+    monkeypatch.setattr(fetch_module, "get_downloader", lambda: downloader)
+    monkeypatch.setattr(fetch_module, "build_vector_store_from_documents",
+                        lambda pdf_blobs, on_progress=None: ingested.extend(pdf_blobs) or 0)
+
+    job = IngestionJob("2401.00001v1,2401.00002v1")
+    result = fetch_module.download_and_ingest([_paper("2401.00001v1", "Kept"), _paper("2401.00002v1", "Lost")], job)
+    job.mark_finished(result=result)
+
+    assert result["papers"] == ["Kept"]
+    assert result["failed"] == ["Lost"]
+    assert [blob[0] for blob in ingested] == ["Kept.pdf"]
+    assert [arxiv_id for arxiv_id, _ in registry.ingested] == ["2401.00001"]
+    snapshot = job.to_dict()
+    assert snapshot["status"] == PARTIALLY_FAILED
+    assert snapshot["progress"]["failed"] == ["Lost"]
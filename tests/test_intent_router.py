@@ -0,0 +1,67 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def router_module(monkeypatch, tmp_path):
+    for name, value in {
+        "GROQ_API_KEY": "test",
+        "MODEL_NAME": "groq/llama-3.3-70b-versatile",
+        "MODEL_TEMPERATURE": "0",
+        "DOCUMENTS_DIR": str(tmp_path / "docs"),
+        "VECTOR_STORE_DIR": str(tmp_path / "store"),
+        "COLLECTION_NAME": "test",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+    }.items():
+        monkeypatch.setenv(name, value)
+    pytest.importorskip("crewai")
+    pytest.importorskip("arxiv")
+    return importlib.import_module("src.agents_src.intent_router")
+
+
+@pytest.fixture
+def router(router_module, monkeypatch):
+    router = router_module.IntentRouter(confidence_threshold=0.8)
+    # a classifier that is sure every message is a fetch request, so only the rules decide
+    monkeypatch.setattr(router, "_classify", lambda text: (1.0, 0.0))
+    return router
+
+
+@pytest.mark.parametrize("query, title, question", [
+    ("Fetch the paper Attention Is All You Need", "Attention Is All You Need", None),
+    ('Download the paper "Deep Residual Learning" and explain the results',
+     "Deep Residual Learning", "explain the results"),
+    ("fetch the paper 'Attention Is All You Need'", "Attention Is All You Need", None),
+    ("download the arxiv paper on diffusion models", "diffusion models", None),
+])
+def test_explicit_fetch_requests(router, query, title, question):
+    decision = router.decide(query)
+    assert decision.label == "fetch"
+    assert decision.confidence >= 0.8
+    assert decision.fetch_title == title
+    assert decision.question == question
+
+
+@pytest.mark.parametrize("query", [
+    "get the paper's key findings",
+    "find the authors' results in the paper",
+    "add the paper's limitations to the summary",
+    "download the paper's figures",
+])
+def test_questions_about_papers_go_to_the_crew(router, query):
+    decision = router.decide(query)
+    assert decision.fetch_title is None
+    assert decision.confidence < 0.8
+    assert router.route(query, []) is None
+
+
+def test_router_fetch_searches_all_categories(router_module, router, monkeypatch):
+    intents = []
+    monkeypatch.setattr(router_module, "fetch_papers", lambda intent: intents.append(intent) or ["Paper"])
+    monkeypatch.setattr(router_module, "emit_progress", lambda *args, **kwargs: None)
+
+    intent = router.route("Fetch the paper Attention Is All You Need", [])
+    assert intent.fetch and intent.papers == ["Paper"]
+    assert intents[0].category is None
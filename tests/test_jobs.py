@@ -0,0 +1,47 @@
+import threading
+
+from src.rag_doc_ingestion.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, IngestionJobQueue
+
+
+def _wait(queue):
+    queue._queue.join()
+
+
+def test_jobs_run_and_report_their_outcome():
+    queue = IngestionJobQueue(max_workers=1)
+    ok = queue.submit("ok", lambda job: {"papers": 1})
+    failed = queue.submit("failed", lambda job: 1 / 0)
+    _wait(queue)
+
+    assert ok.to_dict()["status"] == SUCCEEDED
+    assert ok.to_dict()["result"] == {"papers": 1}
+    snapshot = failed.to_dict()
+    assert snapshot["status"] == FAILED
+    assert "division by zero" in snapshot["error"]
+    assert snapshot["finished_at"] >= snapshot["started_at"]
+    assert [job.id for job in queue.list([FAILED])] == [failed.id]
+
+
+def test_same_key_is_collapsed_while_active():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(job):
+        started.set()
+        job.update_progress(stage="downloading")
+        release.wait(5)
+
+    queue = IngestionJobQueue(max_workers=1)
+    first = queue.submit("2401.00001", blocking)
+    started.wait(5)
+    assert first.get_status() == RUNNING
+    assert queue.submit("2401.00001", blocking) is first
+    assert first.to_dict()["progress"] == {"stage": "downloading"}
+
+    release.set()
+    _wait(queue)
+    assert first.get_status() == SUCCEEDED
+    second = queue.submit("2401.00001", lambda job: None)
+    assert second is not first
+    assert second.get_status() in (QUEUED, RUNNING, SUCCEEDED)
+    _wait(queue)
@@ -0,0 +1,117 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents_src.llm.llm_cache import LLMResponseCache, prompt_key
+
+PARAMS = {"model": "groq/llama-3.3-70b-versatile", "temperature": 0.0}
+
+
+@pytest.fixture
+def agent_env(monkeypatch, tmp_path):
+    for name, value in {
+        "GROQ_API_KEY": "test",
+        "MODEL_NAME": "groq/llama-3.3-70b-versatile",
+        "MODEL_TEMPERATURE": "0",
+        "DOCUMENTS_DIR": str(tmp_path / "docs"),
+        "VECTOR_STORE_DIR": str(tmp_path / "store"),
+        "COLLECTION_NAME": "test",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+
+def test_prompt_key_normalizes_whitespace_and_string_prompts():
+    messages = [{"role": "system", "content": "You are\n  a helper. "}, {"role": "user", "content": "hi"}]
+    same = [{"role": "system", "content": "You are a helper."}, {"role": "user", "content": "hi"}]
+    assert prompt_key(PARAMS, messages) == prompt_key(PARAMS, same)
+    assert prompt_key(PARAMS, "hi") == prompt_key(PARAMS, [{"role": "user", "content": "hi"}])
+
+
+def test_prompt_key_depends_on_parameters_and_tools():
+    base = prompt_key(PARAMS, "hi")
+    assert prompt_key({**PARAMS, "temperature": 0.5}, "hi") != base
+    assert prompt_key({**PARAMS, "model": "groq/other"}, "hi") != base
+    assert prompt_key(PARAMS, "hi", tools=[{"name": "rag_query_tool"}]) != base
+    # unset parameters do not change the key
+    assert prompt_key({**PARAMS, "seed": None}, "hi") == base
+
+
+def test_cache_round_trip_and_per_agent_stats(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    assert cache.get("k1", "qa") is None
+    cache.put("k1", "qa", "m", "answer")
+    assert cache.get("k1", "qa") == "answer"
+    cache.record_bypass("intent")
+
+    reopened = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    assert reopened.get("k1", "qa") == "answer"
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["agents"]["qa"] == {"hits": 1, "misses": 1, "stores": 1, "bypassed": 0, "hit_rate": 0.5}
+    assert stats["agents"]["intent"]["bypassed"] == 1
+
+
+def test_cache_evicts_least_recently_used_beyond_max_bytes(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"), max_bytes=20)
+    cache.put("a", "qa", "m", "x" * 8)
+    cache.put("b", "qa", "m", "y" * 8)
+    assert cache.get("a", "qa") is not None  # "b" is now the least recently used
+    cache.put("c", "qa", "m", "z" * 8)
+    assert cache.get("b", "qa") is None
+    assert cache.get("a", "qa") is not None
+    assert cache.get("c", "qa") is not None
+    assert cache.stats()["size_bytes"] <= 20
+
+
+def test_replay_crew_turn_with_tool_call(agent_env, monkeypatch, tmp_path):
+    crewai = pytest.importorskip("crewai")
+    from src.agents_src.llm.get_llm import CachedLLM
+    from src.agents_src.llm.llm_cache import LLMCacheMiss
+
+    rag_qa_tool = importlib.import_module("src.agents_src.tools.rag_qa_tool")
+    engine = SimpleNamespace(query=lambda query: SimpleNamespace(
+        response="Attention weighs every token against the others.",
+        metadata={"n1": {"file_name": "b.pdf"}, "n2": {"file_name": "a.pdf"}},
+    ))
+    monkeypatch.setattr(rag_qa_tool, "get_retrieval_engine", lambda: engine)
+
+    script = [
+        'Thought: I should search the documents.\n'
+        'Action: rag_query_tool\n'
+        'Action Input: {"query": "What is attention?"}',
+        "Thought: I now know the final answer\n"
+        "Final Answer: Attention weighs every token against the others (a.pdf, b.pdf).",
+    ]
+    recorded = []
+
+    def scripted_call(self, messages, *args, **kwargs):
+        recorded.append(messages)
+        return script[min(len(recorded), len(script)) - 1]
+
+    def run_turn(llm):
+        agent = crewai.Agent(role="Question Answer Agent", goal="Answer questions", backstory="Analyst",
+                             llm=llm, tools=[rag_qa_tool.rag_query_tool])
+        task = crewai.Task(description="What is attention?", expected_output="An answer", agent=agent)
+        return crewai.Crew(agents=[agent], tasks=[task]).kickoff().raw
+
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    model = "groq/llama-3.3-70b-versatile"
+
+    monkeypatch.setattr(crewai.LLM, "call", scripted_call)
+    recorded_answer = run_turn(CachedLLM(agent_name="qa", cache=cache, model=model, temperature=0.0))
+    assert len(recorded) == 2
+
+    def no_network(self, *args, **kwargs):
+        raise AssertionError("replay mode called the LLM API")
+
+    monkeypatch.setattr(crewai.LLM, "call", no_network)
+    replayed_answer = run_turn(CachedLLM(agent_name="qa", cache=cache, replay=True, model=model, temperature=0.0))
+    assert replayed_answer == recorded_answer
+    assert cache.stats()["agents"]["qa"]["hits"] == 2
+
+    with pytest.raises(LLMCacheMiss):
+        CachedLLM(agent_name="qa", cache=cache, replay=True, model=model, temperature=0.0).call("unrecorded")
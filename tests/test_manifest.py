@@ -0,0 +1,52 @@
+import os
+
+from src.rag_doc_ingestion.manifest import IngestionManifest
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _synced_manifest(tmp_path, paths):
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    manifest.apply(manifest.diff(paths))
+    manifest.save()
+    return IngestionManifest.load(str(tmp_path / "manifest.json"))
+
+
+def test_diff_classifies_files(tmp_path):
+    kept = _write(tmp_path / "kept.txt", "kept")
+    touched = _write(tmp_path / "touched.txt", "touched")
+    changed = _write(tmp_path / "changed.txt", "changed")
+    removed = _write(tmp_path / "removed.txt", "removed")
+    manifest = _synced_manifest(tmp_path, [kept, touched, changed, removed])
+
+    os.utime(touched, (1, 1))  # new mtime, same content
+    _write(tmp_path / "changed.txt", "changed, now longer")
+    os.remove(removed)
+    added = _write(tmp_path / "added.txt", "added")
+
+    diff = manifest.diff([kept, touched, changed, added])
+    assert diff.added == [added]
+    assert diff.updated == [changed]
+    assert sorted(diff.unchanged) == sorted([kept, touched])
+    assert diff.removed == [removed]
+
+
+def test_forced_diff_reingests_everything_and_still_finds_removed_files(tmp_path):
+    kept = _write(tmp_path / "kept.txt", "kept")
+    removed = _write(tmp_path / "removed.txt", "removed")
+    manifest = _synced_manifest(tmp_path, [kept, removed])
+
+    os.remove(removed)
+    added = _write(tmp_path / "added.txt", "added")
+
+    diff = manifest.diff([kept, added], force=True)
+    assert diff.added == [added]
+    assert diff.updated == [kept]
+    assert diff.unchanged == []
+    assert diff.removed == [removed]
+
+    manifest.apply(diff)
+    assert sorted(manifest.files) == sorted([kept, added])
@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy as np
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import (
+    FilterOperator, MetadataFilter, MetadataFilters, VectorStoreQuery,
+)
+
+from src.rag_doc_ingestion.numpy_vector_store import (
+    FLOAT_FILE, INT8_FILE, NODES_FILE, SCALES_FILE, NumpyVectorStore,
+)
+
+DIM = 8
+
+
+def _node(node_id: str, axis: int, ref_doc_id: str = "doc", paper_id: str = None) -> TextNode:
+    embedding = [0.0] * DIM
+    embedding[axis] = 1.0
+    return TextNode(
+        id_=node_id,
+        text=f"text {node_id}",
+        embedding=embedding,
+        metadata={"paper_id": paper_id} if paper_id else {},
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=ref_doc_id)},
+    )
+
+
+def _top_id(store: NumpyVectorStore, axis: int) -> str:
+    embedding = [0.0] * DIM
+    embedding[axis] = 1.0
+    result = store.query(VectorStoreQuery(query_embedding=embedding, similarity_top_k=1))
+    return result.ids[0] if result.ids else None
+
+
+def test_add_query_delete(tmp_path):
+    store = NumpyVectorStore(persist_dir=str(tmp_path))
+    store.add([_node("a", 0), _node("b", 1, ref_doc_id="other"), _node("c", 2)])
+
+    assert _top_id(store, 1) == "b"
+    store.delete("other")
+    assert _top_id(store, 1) != "b"
+    store.delete_nodes(["c"])
+    assert [n.node_id for n in store.get_nodes()] == ["a"]
+
+    # re-adding an id replaces its previous row
+    store.add([_node("a", 3)])
+    assert _top_id(store, 3) == "a"
+    assert len(store.get_nodes()) == 1
+
+    reopened = NumpyVectorStore(persist_dir=str(tmp_path))
+    assert _top_id(reopened, 3) == "a"
+    assert [n.node_id for n in reopened.get_nodes()] == ["a"]
+    assert reopened.get_nodes(["a"])[0].get_content() == "text a"
+    reopened.delete("doc")
+    assert reopened.get_nodes() == []
+
+
+def test_exact_scores_without_quantization(tmp_path):
+    store = NumpyVectorStore(persist_dir=str(tmp_path), quantize=False)
+    store.add([_node("a", 0), _node("b", 1)])
+    result = store.query(VectorStoreQuery(query_embedding=[1.0] + [0.0] * (DIM - 1), similarity_top_k=2))
+    assert result.ids == ["a", "b"]
+    assert np.isclose(result.similarities[0], 1.0)
+
+
+def test_reopen_after_partial_write(tmp_path):
+    store = NumpyVectorStore(persist_dir=str(tmp_path))
+    store.add([_node("a", 0), _node("b", 1)])
+
+    # an add interrupted before the header was replaced: rows and records past `count`
+    with open(tmp_path / FLOAT_FILE, "ab") as f:
+        f.write(np.zeros(DIM, dtype=np.float32).tobytes())
+    with open(tmp_path / INT8_FILE, "ab") as f:
+        f.write(np.zeros(DIM, dtype=np.int8).tobytes())
+    with open(tmp_path / SCALES_FILE, "ab") as f:
+        f.write(np.zeros(1, dtype=np.float32).tobytes())
+    with open(tmp_path / NODES_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "torn", "text": "", "metadata": {}}) + "\n")
+        f.write('{"id": "half')
+
+    reopened = NumpyVectorStore(persist_dir=str(tmp_path))
+    assert sorted(n.node_id for n in reopened.get_nodes()) == ["a", "b"]
+
+    reopened.add([_node("b", 2), _node("c", 3)])
+    assert _top_id(reopened, 2) == "b"
+    assert _top_id(reopened, 3) == "c"
+    assert os.path.getsize(tmp_path / FLOAT_FILE) == 4 * DIM * 4
+
+    again = NumpyVectorStore(persist_dir=str(tmp_path))
+    assert sorted(n.node_id for n in again.get_nodes()) == ["a", "b", "c"]
+    assert _top_id(again, 2) == "b"
+
+
+def test_scoped_query_only_scores_the_papers_rows(tmp_path):
+    store = NumpyVectorStore(persist_dir=str(tmp_path))
+    store.add([_node(f"x{i}", i % DIM, paper_id="x.pdf") for i in range(8)])
+    store.add([_node("p1", 0, paper_id="p.pdf"), _node("p2", 1, paper_id="p.pdf"), _node("q1", 0, paper_id="q.pdf")])
+    scoped = MetadataFilters(filters=[MetadataFilter(key="paper_id", value=["p.pdf", "q.pdf"], operator=FilterOperator.IN)])
+
+    result = store.query(VectorStoreQuery(query_embedding=[1.0] + [0.0] * (DIM - 1), similarity_top_k=5, filters=scoped))
+    assert sorted(result.ids[:2]) == ["p1", "q1"]
+    assert sorted(result.ids) == ["p1", "p2", "q1"]
+
+    store.delete_nodes(["q1"])
+    store.add([_node("p1", 2, paper_id="p.pdf")])
+    for reader in (store, NumpyVectorStore(persist_dir=str(tmp_path))):
+        result = reader.query(VectorStoreQuery(query_embedding=[0.0, 0.0, 1.0] + [0.0] * (DIM - 3),
+                                               similarity_top_k=5, filters=scoped))
+        assert result.ids[0] == "p1"
+        assert sorted(result.ids) == ["p1", "p2"]
+
+    both = MetadataFilters(filters=[scoped.filters[0], MetadataFilter(key="paper_id", value="q.pdf")])
+    assert store.query(VectorStoreQuery(query_embedding=[1.0] + [0.0] * (DIM - 1), similarity_top_k=5,
+                                        filters=both)).ids == []
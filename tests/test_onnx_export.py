@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.rag_doc_ingestion import onnx_embedding
+from src.rag_doc_ingestion.onnx_embedding import EXPORT_INFO_FILE, FP32_MODEL_FILE, INT8_MODEL_FILE, export_onnx_model
+
+
+def test_concurrent_exports_run_once_and_publish_a_complete_dir(monkeypatch, tmp_path):
+    exports = []
+
+    def slow_export(model_name, export_dir):
+        exports.append(export_dir)
+        # nothing is visible at the final path while the graph is being written
+        assert not os.path.exists(tmp_path / "model")
+        with open(os.path.join(export_dir, FP32_MODEL_FILE), "wb") as f:
+            f.write(b"graph")
+        time.sleep(0.2)
+        return {"model_name": model_name, "pooling": "mean", "max_length": 8}
+
+    def fake_quantize(model_path, output_path):
+        with open(output_path, "wb") as f:
+            f.write(b"int8 graph")
+
+    monkeypatch.setattr(onnx_embedding, "_export_graph", slow_export)
+    monkeypatch.setattr(onnx_embedding, "_quantize_graph", fake_quantize)
+    export_dir = str(tmp_path / "model")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(export_onnx_model("m", export_dir))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(exports) == 1
+    assert [info["model_name"] for info in results] == ["m", "m", "m"]
+    assert sorted(os.listdir(export_dir)) == sorted([EXPORT_INFO_FILE, FP32_MODEL_FILE, INT8_MODEL_FILE])
+    # the temporary export dir was renamed into place
+    assert sorted(os.listdir(tmp_path)) == ["model", "model.lock"]
+
+
+def test_failed_export_leaves_nothing_behind(monkeypatch, tmp_path):
+    def failing_export(model_name, export_dir):
+        with open(os.path.join(export_dir, FP32_MODEL_FILE), "wb") as f:
+            f.write(b"half a graph")
+        raise RuntimeError("export failed")
+
+    monkeypatch.setattr(onnx_embedding, "_export_graph", failing_export)
+    with pytest.raises(RuntimeError):
+        export_onnx_model("m", str(tmp_path / "model"), quantize=False)
+    assert sorted(os.listdir(tmp_path)) == ["model.lock"]
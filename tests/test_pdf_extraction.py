@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from src.rag_doc_ingestion.pdf_extraction import extract_pdf_pages  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def ingestion_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DOCUMENTS_DIR", str(tmp_path / "docs"))
+    monkeypatch.setenv("VECTOR_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("COLLECTION_NAME", "test")
+
+
+def _pdf_bytes(name: str, pages: int) -> bytes:
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        doc.new_page().insert_text((72, 72), f"{name} page {page_number}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _shared_segments():
+    # SharedMemory names its segments psm_*
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+
+def test_pool_extracts_paths_and_bytes_in_page_order(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(_pdf_bytes("alpha", 3))
+    before = _shared_segments()
+
+    results = extract_pdf_pages([str(path), _pdf_bytes("beta", 5), b"not a pdf"], max_workers=2, pages_per_task=2)
+
+    assert [(number, text.strip()) for number, text in results[0]] == [(n, f"alpha page {n}") for n in (1, 2, 3)]
+    assert [(number, text.strip()) for number, text in results[1]] == [(n, f"beta page {n}") for n in range(1, 6)]
+    assert results[2] == []
+    # the shared copy of the in-memory PDF is released once its pages are extracted
+    assert _shared_segments() <= before
@@ -0,0 +1,44 @@
+import time
+
+from src.backend_src.services.sessions import SessionStore
+
+
+def _turn(question: str, answer: str) -> list:
+    return [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+
+
+def test_sessions_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a, worker_b = SessionStore(path), SessionStore(path)
+
+    session = worker_a.create()
+    on_b = worker_b.get(session.id)
+    assert on_b is not None
+
+    worker_a.record_turn(session, _turn("first?", "First."), papers=["a.pdf"])
+    # b recorded its turn against a stale copy; a's turn is kept
+    worker_b.record_turn(on_b, _turn("second?", "Second."), papers=["b.pdf"])
+    assert [m["content"] for m in on_b.messages] == ["first?", "First.", "second?", "Second."]
+    assert on_b.papers == ["a.pdf", "b.pdf"]
+
+    reloaded = worker_a.get(session.id)
+    assert worker_a.history(reloaded) == worker_b.history(on_b)
+    assert worker_a.stats()["active_sessions"] == 1
+
+    assert worker_b.delete(session.id)
+    assert worker_a.get(session.id) is None
+
+
+def test_history_is_compacted_and_idle_sessions_expire(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"), max_history_tokens=30, min_recent_messages=2,
+                         idle_ttl_seconds=0.2)
+    session = store.create()
+    for i in range(4):
+        store.record_turn(session, _turn(f"Question number {i} about attention heads?", f"Answer {i}. More detail."))
+    history = store.history(store.get(session.id))
+    assert history[0]["role"] == "system"
+    assert history[-1]["content"] == "Answer 3. More detail."
+
+    time.sleep(0.3)
+    assert store.get(session.id) is None
+    assert store.stats()["evicted_idle"] == 1
@@ -0,0 +1,81 @@
+import random
+import time
+
+from llama_index.core.schema import TextNode
+
+from src.rag_doc_ingestion.sparse_index import SparseIndex, tokenize
+
+
+def _node(node_id: str, text: str, file_path: str) -> TextNode:
+    return TextNode(id_=node_id, text=text, metadata={"file_path": file_path, "paper_id": file_path})
+
+
+def _doc_freq(index: SparseIndex, term: str) -> int:
+    row = index._conn.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+    return row[0] if row else 0
+
+
+def test_tokenize_keeps_compound_terms_and_their_parts():
+    assert tokenize("The ResNet-50 model and BERT_base") == ["resnet-50", "resnet", "50", "model", "bert_base", "bert", "base"]
+
+
+def test_search_ranks_exact_terms(tmp_path):
+    index = SparseIndex(str(tmp_path / "sparse.sqlite3"))
+    index.add_nodes([
+        _node("a1", "resnet-50 results on imagenet", "a.pdf"),
+        _node("b1", "transformer results on translation", "b.pdf"),
+    ])
+    assert [node_id for node_id, _ in index.search("resnet-50")] == ["a1"]
+    assert [node_id for node_id, _ in index.search("results", paper_ids=["b.pdf"])] == ["b1"]
+
+
+def test_delete_file_updates_document_counts(tmp_path):
+    index = SparseIndex(str(tmp_path / "sparse.sqlite3"))
+    index.add_nodes([
+        _node("a1", "attention mechanism", "a.pdf"),
+        _node("a2", "attention heads", "a.pdf"),
+        _node("b1", "attention convolution", "b.pdf"),
+    ])
+    assert len(index) == 3
+    assert _doc_freq(index, "attention") == 3
+
+    assert index.delete_file("a.pdf") == 2
+    assert len(index) == 1
+    assert _doc_freq(index, "attention") == 1
+    assert _doc_freq(index, "heads") == 0
+    assert [node_id for node_id, _ in index.search("attention heads")] == ["b1"]
+    assert index.delete_file("a.pdf") == 0
+
+
+def test_reindexing_a_node_does_not_double_count(tmp_path):
+    index = SparseIndex(str(tmp_path / "sparse.sqlite3"))
+    index.add_nodes([_node("a1", "attention mechanism", "a.pdf")])
+    index.add_nodes([_node("a1", "attention heads", "a.pdf")])
+    assert len(index) == 1
+    assert _doc_freq(index, "attention") == 1
+    assert _doc_freq(index, "mechanism") == 0
+    assert _doc_freq(index, "heads") == 1
+
+
+def test_common_terms_do_not_slow_down_search(tmp_path):
+    index = SparseIndex(str(tmp_path / "sparse.sqlite3"))
+    common = "model training results network learning dataset".split()
+    rng = random.Random(0)
+    nodes = [
+        _node(f"n{i}", " ".join(common + [f"term{rng.randrange(2000)}" for _ in range(4)]), f"p{i // 20}.pdf")
+        for i in range(20000)
+    ]
+    index.add_nodes(nodes)
+    index.add_nodes([_node("rare", "model training with ablation", "rare.pdf")])
+
+    elapsed = []
+    for query in ("model training results on the dataset with ablation", "learning network results"):
+        start = time.perf_counter()
+        hits = index.search(query, top_k=10)
+        elapsed.append(time.perf_counter() - start)
+        assert hits
+    # only the rare term is scored, then only the rarest of the common ones
+    assert [node_id for node_id, _ in index.search("model training results with ablation")] == ["rare"]
+    assert len(index.search("learning network results", top_k=10)) == 10
+    # every query term but one is in every chunk; scoring all their postings took about 200ms
+    assert max(elapsed) < 0.05